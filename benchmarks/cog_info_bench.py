@@ -0,0 +1,80 @@
+"""
+Benchmark of the build-time COG info prefetch against a local TiTiler stand-in.
+
+Serves ``/cog/info.geojson`` for any COG url with an artificial latency
+(bounds derived from the url, 3 uint16 bands) and runs
+earthdaily_timeseries_handler with ``PrefetchCogInfo`` for N time entries
+    - one request at a time
+    - with the default concurrency
+    - again with the responses in the persistent cache
+The results are checked by tests/test_cog_info.py.
+
+    python benchmarks/cog_info_bench.py [number_of_entries] [latency_ms]
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pystac import Catalog, Collection, Extent, SpatialExtent, TemporalExtent
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_ins import serve, titiler_stand_in  # noqa: E402
+from custom_handlers import earthdaily_timeseries_handler  # noqa: E402
+from custom_handlers.http_cache import CACHE_DIR_ENV  # noqa: E402
+
+
+def run_handler(endpoint, count, concurrency):
+    catalog = Catalog(id="bench", description="bench")
+    collection = Collection(
+        id="bench", description="bench",
+        extent=Extent(SpatialExtent([[-180, -90, 180, 90]]), TemporalExtent([[None, None]])),
+    )
+    catalog.add_child(collection)
+    endpoint_config = {
+        "EndPoint": endpoint,
+        "S3Bucket": "bucket",
+        "PrefetchCogInfo": True,
+        "MaxConcurrency": concurrency,
+        "TimeEntries": [
+            {"Time": f"2020-01-{index // 86400 + 1:02d}T{index // 3600 % 24:02d}:"
+                     f"{index // 60 % 60:02d}:{index % 60:02d}Z",
+             "S3Key": f"scenes/{index}/RGB.tif"}
+            for index in range(count)
+        ],
+    }
+    start = time.perf_counter()
+    earthdaily_timeseries_handler.process(
+        collection, {"id": "bench"}, endpoint_config, {"Name": "bench"}
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    server = serve(titiler_stand_in(latency=latency))
+    endpoint = server.url
+    print(f"{count} COGs, {latency * 1000:.0f} ms latency")
+    cache_dir = tempfile.mkdtemp()
+    # registered first so it runs after the caches wrote their counters
+    atexit.register(shutil.rmtree, cache_dir, True)
+    os.environ[CACHE_DIR_ENV] = cache_dir
+    try:
+        sequential = run_handler(endpoint, count, 1)
+        os.environ[CACHE_DIR_ENV] = os.path.join(cache_dir, "concurrent")
+        concurrent = run_handler(endpoint, count, 8)
+        cached = run_handler(endpoint, count, 8)
+    finally:
+        server.shutdown()
+    print(f"one request at a time: {sequential:.2f} s")
+    print(f"concurrent:            {concurrent:.2f} s ({sequential / concurrent:.1f}x)")
+    print(f"cached:                {cached:.2f} s ({sequential / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Menu data of a catalog from the collection JSON and from the summary.
+
+Writes a catalog of N collections with ``links`` item links each, the way
+the generator lays them out, then reports what a client downloads and
+parses to build the theme/tag menus
+    - every collection.json listed in catalog.json
+    - collections-summary.json
+Both must give the same themes, tags, agency and extents.
+
+    python benchmarks/collection_summary_bench.py [number_of_collections] [links]
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_tools.collection_summary import SUMMARY_NAME, write_summary  # noqa: E402
+
+THEMES = ["air", "agriculture", "biomass", "cryosphere", "economy", "oceans", "water"]
+
+
+def write_catalog(catalog_root, count, links):
+    random.seed(1)
+    catalog = {"type": "Catalog", "id": "bench", "stac_version": "1.0.0",
+               "description": "bench", "links": []}
+    for index in range(count):
+        collection_id = f"collection_{index:03d}"
+        directory = os.path.join(catalog_root, collection_id)
+        os.makedirs(directory)
+        collection = {
+            "type": "Collection", "id": collection_id, "stac_version": "1.0.0",
+            "title": f"Collection {index}", "description": "lorem ipsum " * 40,
+            "themes": random.sample(THEMES, 2), "tags": [f"tag{index % 13}"],
+            "agency": ["ESA"], "satellite": ["Sentinel-2"], "sensor": ["MSI"],
+            "license": "proprietary",
+            "extent": {"spatial": {"bbox": [[-10.0, 35.0, 30.0, 60.0]]},
+                       "temporal": {"interval": [["2019-01-01T00:00:00Z", "2023-01-01T00:00:00Z"]]}},
+            "links": [{"rel": "item", "href": f"./{collection_id}/2020/item_{item}.json",
+                       "type": "application/json", "datetime": "2020-01-01T00:00:00Z"}
+                      for item in range(links)],
+        }
+        with open(os.path.join(directory, "collection.json"), "w") as file:
+            json.dump(collection, file, indent=2)
+        catalog["links"].append({"rel": "child", "href": f"./{collection_id}/collection.json",
+                                 "type": "application/json"})
+    with open(os.path.join(catalog_root, "catalog.json"), "w") as file:
+        json.dump(catalog, file, indent=2)
+
+
+def menu(collection, bbox, interval):
+    return (collection["themes"], collection["tags"], collection["agency"], bbox, interval)
+
+
+def load(paths):
+    start = time.perf_counter()
+    size = 0
+    documents = []
+    for path in paths:
+        with open(path, "rb") as file:
+            content = file.read()
+        size += len(content)
+        documents.append(json.loads(content))
+    return documents, size, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    links = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    catalog_root = tempfile.mkdtemp()
+    try:
+        write_catalog(catalog_root, count, links)
+        start = time.perf_counter()
+        counts = write_summary(catalog_root)
+        print(f"{count} collections, summary {counts['bytes'] / 1e3:.1f} kB "
+              f"written in {time.perf_counter() - start:.2f} s")
+
+        paths = [os.path.join(catalog_root, f"collection_{index:03d}", "collection.json")
+                 for index in range(count)]
+        collections, full_size, full_time = load(paths)
+        (summary,), summary_size, summary_time = load([os.path.join(catalog_root, SUMMARY_NAME)])
+        expected = {collection["id"]: menu(collection, collection["extent"]["spatial"]["bbox"],
+                                           collection["extent"]["temporal"]["interval"])
+                    for collection in collections}
+        found = {entry["id"]: menu(entry, entry["extent"]["spatial"], entry["extent"]["temporal"])
+                 for entry in summary["collections"]}
+        assert found == expected
+
+        print(f"{count:4} collection.json:    {full_size / 1e6:7.3f} MB  "
+              f"parse {full_time * 1000:7.1f} ms")
+        print(f"   1 {SUMMARY_NAME}: {summary_size / 1e6:7.3f} MB  "
+              f"parse {summary_time * 1000:7.1f} ms  ({full_size / summary_size:.0f}x smaller)")
+    finally:
+        shutil.rmtree(catalog_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
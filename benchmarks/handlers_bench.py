@@ -0,0 +1,406 @@
+"""
+Scaling benchmark of the custom handlers on synthetic collection configs.
+
+Generates resources with N TimeEntries (10 to 100k by default), each with
+many band assets and a mix of xyz, wms and incomplete links, and runs the
+handlers' ``process``/``execute`` functions on them offline (custom_endpoint
+reads a STAC fixture served from localhost). Every handler and size runs in
+a fresh interpreter and records
+    - the best wall time of ``--repeat`` runs and the resulting entries/s
+    - the peak RSS growth of the process while the handler ran
+    - the peak traced memory and the memory blocks still allocated afterwards
+      (from an extra run under tracemalloc)
+    - the items and links of the returned collection
+and the scaling exponent of the time between consecutive sizes (1 is linear).
+Sizes whose time, extrapolated from the previous sizes, exceeds ``--budget``
+seconds are reported as skipped.
+
+Results are written as JSON (``--output``) and can be compared with the
+results of another commit (``--compare``), the benchmark exits with an error
+when a handler got slower or bigger than ``--threshold`` times the baseline.
+
+    python benchmarks/handlers_bench.py [--sizes 10 100 ...] [--handlers NAME ...]
+        [--bands 8] [--links 4] [--stream] [--repeat 1] [--budget 60]
+        [--output results.json] [--compare baseline.json] [--threshold 1.25]
+"""
+
+import argparse
+import functools
+import gc
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from pystac import Catalog, Collection, Extent, Item, Link, SpatialExtent, TemporalExtent
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_tools.profiling import collection_counts  # noqa: E402
+from custom_handlers.catalog_output import BUILD_DIR_ENV  # noqa: E402
+
+SIZES = [10, 100, 1000, 10000, 100000]
+BBOX = [-114.8, 32.4, -114.4, 32.8]
+START = datetime(2000, 1, 1, tzinfo=timezone.utc)
+# compared between two result files
+METRICS = ("seconds", "rss_growth", "traced_peak")
+
+
+def _link(kind: str, index: int, position: int) -> dict:
+    url = f"https://tiles.example.com/{index}/{position}/{{z}}/{{x}}/{{y}}.png"
+    if kind == "xyz":
+        return {"Relation": "xyz", "URL": url, "Type": "image/png", "Title": f"Layer {position}"}
+    if kind == "xyz_default":
+        return {"Relation": "xyz", "URL": url}
+    if kind == "wms":
+        return {"Relation": "wms", "URL": "https://wms.example.com/", "Title": "WMS"}
+    # xyz without url, skipped by the handlers
+    return {"Relation": "xyz", "Title": "Incomplete"}
+
+
+LINK_KINDS = ("xyz", "wms", "xyz_default", "incomplete")
+
+
+def time_entries(count: int, bands: int, links: int) -> list[dict]:
+    entries = []
+    for index in range(count):
+        key = f"scenes/{index:06d}"
+        entries.append({
+            "Time": (START + timedelta(hours=index)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "S3Key": f"{key}/RGB.tif",
+            "Assets": [
+                {
+                    "Identifier": f"B{band:02d}",
+                    "File": f"https://data.example.com/{key}/B{band:02d}.tif",
+                }
+                for band in range(1, bands + 1)
+            ],
+            "Links": [
+                _link(LINK_KINDS[(index + position) % len(LINK_KINDS)], index, position)
+                for position in range(links)
+            ],
+        })
+    return entries
+
+
+def endpoint_config(count: int, bands: int, links: int) -> dict:
+    return {
+        "Name": "Custom-Endpoint",
+        "EndPoint": "https://titiler.example.com",
+        "S3Bucket": "synthetic-bucket",
+        "Bbox": BBOX,
+        "Bands": list(range(1, min(bands, 3) + 1)),
+        "Rescale": [0, 3000],
+        "TimeEntries": time_entries(count, bands, links),
+    }
+
+
+def new_collection(catalog_config: dict) -> Collection:
+    """Collection added to a catalog like eodash_catalog does before calling a handler"""
+    catalog = Catalog(id=catalog_config["id"], description="synthetic")
+    collection = Collection(
+        id="synthetic",
+        description="synthetic",
+        extent=Extent(SpatialExtent([BBOX]), TemporalExtent([[START, None]])),
+    )
+    catalog.add_child(collection)
+    return collection
+
+
+def existing_items(collection: Collection, config: dict) -> Collection:
+    """Items created by the standard TimeEntries processing, for the link-only handlers"""
+    root = collection.get_root()
+    for entry in config["TimeEntries"]:
+        item = Item(
+            id=entry["Time"],
+            geometry=None,
+            bbox=None,
+            datetime=datetime.fromisoformat(entry["Time"].replace("Z", "+00:00")),
+            properties={},
+        )
+        # add_item scans the collection links, linking directly keeps the setup linear
+        item.set_root(root)
+        item.set_parent(collection)
+        collection.add_link(Link.item(item))
+    return collection
+
+
+class StacFixture:
+    """Daily STAC catalog of stac_traversal_bench served from localhost"""
+
+    def __init__(self, days: int):
+        from benchmarks.stac_traversal_bench import write_fixture
+        from benchmarks.stand_ins import SlowHandler, serve
+
+        self._directory = tempfile.TemporaryDirectory()
+        self.dates = write_fixture(self._directory.name, days, 1)
+        self.server = serve(functools.partial(SlowHandler, directory=self._directory.name))
+        self.url = f"{self.server.url}/catalog.json"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self._directory.cleanup()
+
+
+def custom_endpoint_config(count: int, bands: int, links: int) -> tuple[dict, StacFixture]:
+    fixture = StacFixture(count)
+    return {"STAC_Url": fixture.url, "Subset_Dates": fixture.dates}, fixture
+
+
+# handler name -> function, whether the collection needs the standard items,
+# largest size, config factory
+HANDLERS = {
+    "earthdaily_timeseries_handler": ("custom_handlers.earthdaily_timeseries_handler.process",
+                                      False, None, endpoint_config),
+    "yaml_timeseries_titiler_handler": ("custom_handlers.yaml_timeseries_titiler_handler.process",
+                                        False, None, endpoint_config),
+    "timeseries_with_xyz_handler": ("custom_handlers.timeseries_with_xyz_handler.process",
+                                    False, None, endpoint_config),
+    "yaml_links_processor": ("custom_handlers.yaml_links_processor.process",
+                             False, None, endpoint_config),
+    "timeseries_collection_handler": ("custom_handlers.timeseries_collection_handler.process",
+                                      False, None, endpoint_config),
+    "hybrid_timeseries_handler": ("custom_handlers.hybrid_timeseries_handler.process",
+                                  True, None, endpoint_config),
+    "minimal_xyz_processor": ("custom_handlers.minimal_xyz_processor.process",
+                              True, None, endpoint_config),
+    # one fixture catalog per day, larger fixtures mostly measure the disk
+    "custom_endpoint": ("custom_handlers.custom_endpoint.execute",
+                        False, 10000, custom_endpoint_config),
+}
+
+
+def _import(function_path: str):
+    module_name, _, function_name = function_path.rpartition(".")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _max_rss() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_case(name: str, count: int, options: dict) -> dict:
+    """Run one handler on ``count`` synthetic entries, in a fresh interpreter"""
+    function_path, needs_items, _, make_config = HANDLERS[name]
+    handler = _import(function_path)
+    config = make_config(count, options["bands"], options["links"])
+    fixture = None
+    if isinstance(config, tuple):
+        config, fixture = config
+    with tempfile.TemporaryDirectory() as build_dir:
+        # handlers writing extra files write them there
+        os.environ[BUILD_DIR_ENV] = build_dir
+        catalog_config = {"id": "synthetic", "title": "Template Catalog"}
+        collection_config = {"Name": "synthetic", "Title": "Synthetic"}
+        if options["stream"]:
+            config["StreamItems"] = True
+
+        def prepare():
+            collection = new_collection(catalog_config)
+            return existing_items(collection, config) if needs_items else collection
+
+        def call(collection):
+            return handler(collection, catalog_config, config, collection_config)
+
+        try:
+            times = []
+            rss_before = _max_rss()
+            for _ in range(options["repeat"]):
+                collection = prepare()
+                gc.collect()
+                start = time.perf_counter()
+                result = call(collection)
+                times.append(time.perf_counter() - start)
+                items, links = collection_counts(result)
+            rss_growth = _max_rss() - rss_before
+            del collection, result
+
+            traced_peak = blocks = None
+            if options["trace"]:
+                collection = prepare()
+                gc.collect()
+                blocks_before = sys.getallocatedblocks()
+                tracemalloc.start()
+                result = call(collection)
+                traced_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                blocks = sys.getallocatedblocks() - blocks_before
+        finally:
+            if fixture:
+                fixture.close()
+    seconds = min(times)
+    return {
+        "handler": name,
+        "entries": count,
+        "seconds": round(seconds, 6),
+        "entries_per_second": round(count / seconds, 1) if seconds else None,
+        "peak_rss": _max_rss(),
+        "rss_growth": rss_growth,
+        "traced_peak": traced_peak,
+        "allocated_blocks": blocks,
+        "items": items,
+        "links": links,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _scaling(previous: dict, result: dict) -> float | None:
+    """Exponent of the time growth between two sizes, 1 is linear"""
+    if not previous.get("seconds") or not result.get("seconds"):
+        return None
+    return round(
+        math.log(result["seconds"] / previous["seconds"])
+        / math.log(result["entries"] / previous["entries"]), 2
+    )
+
+
+def _expected_seconds(result: dict, count: int) -> float:
+    """Time of the next size extrapolated with the measured scaling, at least linear"""
+    exponent = max(result.get("scaling") or 1, 1)
+    return result.get("seconds", 0) * (count / result["entries"]) ** exponent
+
+
+def benchmark(options: argparse.Namespace) -> list[dict]:
+    case_options = {
+        "bands": options.bands,
+        "links": options.links,
+        "stream": options.stream,
+        "repeat": options.repeat,
+        "trace": not options.no_trace,
+    }
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name in options.handlers:
+        max_entries = HANDLERS[name][2]
+        previous = None
+        for count in options.sizes:
+            over_budget = previous and _expected_seconds(previous, count) > options.budget
+            if over_budget or (max_entries and count > max_entries):
+                results.append({"handler": name, "entries": count, "skipped": True})
+                print(f"{name:32} {count:7d}  skipped")
+                continue
+            # RSS is only meaningful in a fresh process per case
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                try:
+                    result = executor.submit(run_case, name, count, case_options).result()
+                except Exception as error:
+                    result = {"handler": name, "entries": count, "error": repr(error)}
+            if previous:
+                result["scaling"] = _scaling(previous, result)
+            results.append(result)
+            print_result(result)
+            if "seconds" in result:
+                previous = result
+    return results
+
+
+def print_result(result: dict) -> None:
+    label = f"{result['handler']:32} {result['entries']:7d}"
+    if "error" in result:
+        print(f"{label}  error {result['error']}")
+        return
+    traced = (
+        f"{result['traced_peak'] / 1e6:9.1f} MB traced"
+        if result["traced_peak"] is not None else ""
+    )
+    print(
+        f"{label} {result['seconds']:9.3f} s {result['entries_per_second'] or 0:11.0f} entries/s "
+        f"{result['rss_growth'] / 1e6:8.1f} MB rss {traced}"
+        + (f"  scaling {result['scaling']}" if result.get("scaling") is not None else "")
+    )
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Cases whose metrics grew more than ``threshold`` times compared to ``baseline``"""
+    previous = {
+        (result["handler"], result["entries"]): result for result in baseline["results"]
+    }
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for result in results:
+        before = previous.get((result["handler"], result["entries"]))
+        if not before or "seconds" not in result or "seconds" not in before:
+            continue
+        ratios = []
+        for metric in METRICS:
+            if result.get(metric) and before.get(metric):
+                ratio = result[metric] / before[metric]
+                ratios.append(f"{metric} {ratio:5.2f}x")
+                # sub-millisecond timings and tiny memory growth are noise
+                significant = max(result[metric], before[metric]) > (
+                    0.01 if metric == "seconds" else 1e6
+                )
+                if ratio > threshold and significant:
+                    regressions.append(
+                        f"{result['handler']} {result['entries']}: {metric} {ratio:.2f}x"
+                    )
+        print(f"  {result['handler']:32} {result['entries']:7d}  {'  '.join(ratios)}")
+    return regressions
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the custom handlers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--handlers", nargs="+", default=list(HANDLERS), choices=list(HANDLERS))
+    parser.add_argument("--bands", type=int, default=8, help="band assets per time entry")
+    parser.add_argument("--links", type=int, default=4, help="links per time entry")
+    parser.add_argument("--stream", action="store_true", help="set StreamItems on the resources")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, the best is kept")
+    parser.add_argument("--budget", type=float, default=60,
+                        help="sizes expected to take longer than this are skipped")
+    parser.add_argument("--no-trace", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", "-o", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="results JSON of another commit")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio to the baseline reported as regression")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    options = parse_args(args)
+    results = benchmark(options)
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bands": options.bands,
+            "links": options.links,
+            "stream": options.stream,
+        },
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if options.compare:
+        with open(options.compare) as file:
+            regressions = compare(results, json.load(file), options.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
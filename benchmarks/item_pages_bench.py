@@ -0,0 +1,106 @@
+"""
+First view of a large collection with and without item pages.
+
+Writes the items of item_records_bench for N time entries the way the
+generator does with ``StreamItems``, once with every item link in
+collection.json and once with the item links split into pages of
+``page_size`` while the catalog is saved, and reports what a client
+downloads and parses before it can show the latest items
+    - collection.json with every item link
+    - collection.json and the newest page
+The pages must hold every item link once, newest first.
+
+    python benchmarks/item_pages_bench.py [number_of_entries] [page_size]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pystac import Catalog, CatalogType, Collection, Extent, SpatialExtent, TemporalExtent
+from pystac.layout import TemplateLayoutStrategy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.item_records_bench import BBOX, records  # noqa: E402
+from custom_handlers.item_pages import INDEX_FIELD  # noqa: E402
+from custom_handlers.item_writer import item_sink  # noqa: E402
+
+
+def write_catalog(catalog_root, count, page_size=None):
+    catalog = Catalog(id="bench", description="bench")
+    collection = Collection(
+        id="bench", description="bench",
+        extent=Extent(SpatialExtent([BBOX]), TemporalExtent([[None, None]])),
+    )
+    catalog.add_child(collection)
+    endpoint_config = {"StreamItems": True, "ItemPageSize": page_size}
+    start = time.perf_counter()
+    items = item_sink(collection, endpoint_config)
+    for record in records(count):
+        items.add(record)
+    items.close()
+    catalog.normalize_hrefs(
+        catalog_root, strategy=TemplateLayoutStrategy(item_template="${collection}/${year}")
+    )
+    catalog.save(CatalogType.RELATIVE_PUBLISHED)
+    return time.perf_counter() - start
+
+
+def first_view(paths):
+    start = time.perf_counter()
+    size = 0
+    for path in paths:
+        with open(path, "rb") as file:
+            content = file.read()
+        size += len(content)
+        json.loads(content)
+    return size, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    build_dir = tempfile.mkdtemp()
+    try:
+        full_duration = write_catalog(os.path.join(build_dir, "full"), count)
+        full = os.path.join(build_dir, "full", "bench", "collection.json")
+        duration = write_catalog(os.path.join(build_dir, "paged"), count, page_size)
+        collection_dir = os.path.join(build_dir, "paged", "bench")
+        collection_path = os.path.join(collection_dir, "collection.json")
+
+        with open(full) as file:
+            expected = [link["href"] for link in json.load(file)["links"] if link["rel"] == "item"]
+        with open(collection_path) as file:
+            index = json.load(file)[INDEX_FIELD]
+        hrefs = []
+        for entry in index:
+            with open(os.path.join(collection_dir, entry["href"])) as file:
+                page = json.load(file)
+            assert page["type"] == "FeatureCollection"
+            hrefs += [link["href"] for link in page["links"] if link["rel"] == "item"]
+        assert sorted(hrefs) == sorted(expected) and len(hrefs) == count
+        assert [entry["interval"] for entry in index] == sorted(
+            (entry["interval"] for entry in index), reverse=True
+        )
+
+        print(
+            f"{count} items, {len(index)} pages of {page_size}, "
+            f"saved in {full_duration:.2f} s, {duration:.2f} s with pages"
+        )
+        full_size, full_time = first_view([full])
+        paged_size, paged_time = first_view(
+            [collection_path, os.path.join(collection_dir, "items-0001.json")]
+        )
+        print(f"every item link:      {full_size / 1e6:7.3f} MB  parse {full_time * 1000:7.1f} ms")
+        print(f"collection + newest:  {paged_size / 1e6:7.3f} MB  parse {paged_time * 1000:7.1f} ms"
+              f"  ({full_size / paged_size:.0f}x smaller)")
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Memory benchmark of the items created for high-volume TimeEntries.
+
+Builds the items of earthdaily_timeseries_handler for N time entries as
+    - pystac items with their own geometry and assets (previous handlers)
+    - pystac items created from records, sharing the resource footprint
+    - ItemRecords only
+and reports the traced peak memory and the time spent for each variant.
+All variants must serialize to the same STAC JSON.
+
+    python benchmarks/item_records_bench.py [number_of_entries]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from pystac import Asset, Item, Link
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_handlers.earthdaily_timeseries_handler import (  # noqa: E402
+    DATA,
+    METADATA,
+    OVERVIEW,
+    THUMBNAIL,
+    WEB_MERCATOR,
+    XYZ_LINK_FIELDS,
+)
+from custom_handlers.item_records import (  # noqa: E402
+    AssetRecord,
+    ItemRecord,
+    LinkRecord,
+    footprint,
+)
+from custom_handlers.titiler_urls import TitilerUrlTemplate, s3_href  # noqa: E402
+
+BBOX = [-114.8, 32.4, -114.4, 32.8]
+TEMPLATE = TitilerUrlTemplate(
+    "https://titiler.example.com", bands=[1, 2, 3], rescale=[-50, 350], reproject="bilinear"
+)
+
+
+def entries(count):
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    for index in range(count):
+        dt = start + timedelta(hours=index)
+        s3_url = s3_href("bucket", f"scenes/{index}/RGB.tif")
+        yield f"item_{index}", dt, s3_url, TEMPLATE.urls(s3_url)
+
+
+def pystac_items(count):
+    items = []
+    for item_id, dt, s3_url, urls in entries(count):
+        item = Item(
+            id=item_id,
+            geometry={
+                "type": "Polygon",
+                "coordinates": [[
+                    [BBOX[0], BBOX[1]], [BBOX[2], BBOX[1]], [BBOX[2], BBOX[3]],
+                    [BBOX[0], BBOX[3]], [BBOX[0], BBOX[1]],
+                ]],
+            },
+            bbox=BBOX,
+            datetime=dt,
+            properties={},
+        )
+        item.add_asset("rgb_composite", Asset(href=s3_url, media_type="image/tiff",
+                                              title="RGB Composite", roles=["data"]))
+        item.add_asset("data", Asset(href=urls.tile, media_type="image/png", roles=["data"],
+                                     extra_fields={"proj:epsg": 3857}))
+        item.add_asset("info", Asset(href=urls.info, media_type="application/json",
+                                     roles=["metadata"]))
+        item.add_asset("preview", Asset(href=urls.preview, media_type="image/png",
+                                        roles=["overview"]))
+        item.add_asset("thumbnail", Asset(href=urls.thumbnail, media_type="image/png",
+                                          roles=["thumbnail"]))
+        item.add_link(Link(rel="xyz", target=urls.tile, media_type="image/png",
+                           title="TiTiler RGB tiles",
+                           extra_fields={"role": ["data"], "proj:epsg": 4326}))
+        items.append(item)
+    return items
+
+
+def records(count):
+    shape = footprint(BBOX)
+    return [
+        ItemRecord(
+            id=item_id,
+            datetime=dt,
+            footprint=shape,
+            assets=(
+                AssetRecord("rgb_composite", s3_url, "image/tiff", "RGB Composite", DATA),
+                AssetRecord("data", urls.tile, "image/png", roles=DATA,
+                            extra_fields=WEB_MERCATOR),
+                AssetRecord("info", urls.info, "application/json", roles=METADATA),
+                AssetRecord("preview", urls.preview, "image/png", roles=OVERVIEW),
+                AssetRecord("thumbnail", urls.thumbnail, "image/png", roles=THUMBNAIL),
+            ),
+            links=(LinkRecord("xyz", urls.tile, "image/png", "TiTiler RGB tiles",
+                              XYZ_LINK_FIELDS),),
+        )
+        for item_id, dt, s3_url, urls in entries(count)
+    ]
+
+
+def record_items(count):
+    return [record.to_item() for record in records(count)]
+
+
+def measure(function, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(count)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    sample = min(count, 10)
+    expected = [item.to_dict() for item in pystac_items(sample)]
+    assert [record.to_dict() for record in records(sample)] == expected
+    assert [item.to_dict() for item in record_items(sample)] == expected
+
+    print(f"{count} items")
+    baseline = None
+    for name, function in [
+        ("pystac items", pystac_items),
+        ("pystac items from records", record_items),
+        ("item records", records),
+    ]:
+        result, duration, peak = measure(function, count)
+        del result
+        baseline = baseline or peak
+        print(
+            f"{name:26} {peak / 1e6:8.1f} MB peak  {peak / count:7.0f} B/item  "
+            f"{duration:6.2f} s  ({baseline / peak:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Memory benchmark of the item sinks used by the time series handlers.
+
+Adds the records of item_records_bench to a collection and saves the catalog
+    - through CollectionItemSink, as pystac items added to the collection
+    - through StreamingItemWriter, items are spooled to disk as they are produced
+and reports the traced peak memory and the time spent for each variant.
+Both variants must write the same files.
+
+    python benchmarks/item_writer_bench.py [number_of_entries]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pystac import Catalog, CatalogType, Collection, Extent, SpatialExtent, TemporalExtent
+from pystac.layout import TemplateLayoutStrategy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.item_records_bench import BBOX, records  # noqa: E402
+from custom_handlers.item_writer import CollectionItemSink, StreamingItemWriter  # noqa: E402
+
+
+def write_catalog(make_sink, catalog_root, count):
+    catalog = Catalog(id="bench", description="bench")
+    collection = Collection(
+        id="bench",
+        description="bench",
+        extent=Extent(SpatialExtent([BBOX]), TemporalExtent([[None, None]])),
+    )
+    catalog.add_child(collection)
+    sink = make_sink(collection)
+    for record in records(count):
+        sink.add(record)
+    sink.close()
+    catalog.normalize_hrefs(
+        catalog_root, strategy=TemplateLayoutStrategy(item_template="${collection}/${year}")
+    )
+    catalog.save(CatalogType.RELATIVE_PUBLISHED)
+
+
+def measure(make_sink, catalog_root, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    write_catalog(make_sink, catalog_root, count)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def read_tree(root):
+    # self hrefs hold the temporary build dir
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path) as file:
+                files[os.path.relpath(path, root)] = file.read().replace(root, "")
+    return files
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{count} items")
+    expected = None
+    baseline = None
+    for name, make_sink in [
+        ("pystac items", CollectionItemSink),
+        ("streamed items", StreamingItemWriter),
+    ]:
+        with tempfile.TemporaryDirectory() as build_dir:
+            catalog_root = os.path.join(build_dir, "bench")
+            duration, peak = measure(make_sink, catalog_root, count)
+            files = read_tree(catalog_root)
+        expected = expected or files
+        assert files == expected, name
+        baseline = baseline or peak
+        print(
+            f"{name:16} {peak / 1e6:8.1f} MB peak  {duration:6.2f} s  "
+            f"({baseline / peak:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
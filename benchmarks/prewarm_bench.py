@@ -0,0 +1,70 @@
+"""
+Benchmark of the tile pre-warming against a local TiTiler stand-in.
+
+Writes the items of earthdaily_timeseries_handler for N time entries with
+their xyz links pointing at a stand-in that renders a tile it has not seen
+before in ``cold_ms`` and serves a rendered tile in ``warm_ms``. Requests
+the tiles of the items for a zoom range
+    - as the first users would, without pre-warming
+    - pre-warmed, then again as the users would
+and reports the p50/p95 latency of each pass. The results are checked by
+tests/test_prewarm.py.
+
+    python benchmarks/prewarm_bench.py [number_of_entries] [cold_ms] [warm_ms]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.item_records_bench import records  # noqa: E402
+from benchmarks.stand_ins import serve, titiler_stand_in  # noqa: E402
+from build_tools.prewarm import plan_tiles, prewarm, print_report, zoom_range  # noqa: E402
+
+ZOOMS = zoom_range("9-12")
+
+
+def write_items(directory, count, endpoint):
+    os.makedirs(directory)
+    for record in records(count):
+        item = record.to_dict(collection_id="bench")
+        for link in item["links"]:
+            if link["rel"] == "xyz":
+                link["href"] = link["href"].replace("https://titiler.example.com", endpoint)
+        with open(os.path.join(directory, f"{item['id']}.json"), "w") as file:
+            json.dump(item, file)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    stand_in = titiler_stand_in(
+        cold=float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.2,
+        warm=float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.005,
+    )
+    server = serve(stand_in)
+    endpoint = server.url
+    directory = tempfile.mkdtemp()
+    try:
+        write_items(os.path.join(directory, "items"), count, endpoint)
+        urls = plan_tiles(directory, ZOOMS)
+        print(f"{count} items, {len(urls)} tiles at zoom {ZOOMS.start}-{ZOOMS.stop - 1}, "
+              f"{stand_in.cold * 1000:.0f} ms cold, {stand_in.warm * 1000:.0f} ms warm")
+        print("-- first users without pre-warming")
+        print_report(prewarm(urls, rate=0))
+        # a new deploy, every tile is cold again
+        stand_in.rendered.clear()
+        print("-- pre-warming, 8 workers, 100 requests/s")
+        print_report(prewarm(urls, workers=8, rate=100))
+        print("-- first users after pre-warming")
+        print_report(prewarm(urls, rate=0))
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
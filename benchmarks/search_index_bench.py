@@ -0,0 +1,122 @@
+"""
+Benchmark of the static search index against crawling the item JSON.
+
+Writes N items with random footprints and dates into 20 collections,
+builds ``search-index.bin`` and runs bbox/date queries
+    - crawling and filtering every item JSON
+    - on the index loaded with SearchIndex
+Both must return the same items. Also reports how many bytes a client
+range-reading the index needs for a one-week query: the header, the
+``start`` rows found by binary search and the matching rows of the
+other columns.
+
+    python benchmarks/search_index_bench.py [number_of_items]
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_tools.search_index import (  # noqa: E402
+    INDEX_NAME,
+    PREAMBLE,
+    SearchIndex,
+    _timestamp,
+    scan_items,
+    write_index,
+)
+
+QUERIES = [
+    ([-115.0, 32.0, -114.0, 33.0], "2021-03-01T00:00:00Z", "2021-03-31T23:59:59Z"),
+    ([0.0, 40.0, 20.0, 55.0], "2020-01-01T00:00:00Z", "2022-12-31T23:59:59Z"),
+    ([-180.0, -90.0, 180.0, 90.0], "2022-06-01T00:00:00Z", "2022-06-07T23:59:59Z"),
+]
+
+
+def write_items(catalog_root, count):
+    random.seed(1)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    for index in range(count):
+        collection_id = f"collection_{index % 20:02d}"
+        west, south = random.uniform(-180, 175), random.uniform(-85, 80)
+        size = random.uniform(0.01, 5)
+        dt = start + timedelta(seconds=random.randrange(3 * 365 * 86400))
+        directory = os.path.join(catalog_root, collection_id, collection_id, str(dt.year))
+        os.makedirs(directory, exist_ok=True)
+        item = {
+            "type": "Feature",
+            "id": f"item_{index}",
+            "collection": collection_id,
+            "bbox": [west, south, west + size, south + size],
+            "properties": {"datetime": dt.strftime("%Y-%m-%dT%H:%M:%SZ")},
+            "links": [],
+            "assets": {},
+        }
+        with open(os.path.join(directory, f"item_{index}.json"), "w") as file:
+            json.dump(item, file)
+
+
+def crawl(catalog_root, bbox, start, end):
+    west, south, east, north = bbox
+    low, high = _timestamp(start), _timestamp(end)
+    matches = set()
+    for item_id, collection_id, item_start, item_end, *item_bbox in scan_items(catalog_root):
+        if item_end < low or item_start > high:
+            continue
+        if (item_bbox[0] > east or item_bbox[2] < west
+                or item_bbox[1] > north or item_bbox[3] < south):
+            continue
+        matches.add((collection_id, item_id))
+    return matches
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    catalog_root = tempfile.mkdtemp()
+    try:
+        write_items(catalog_root, count)
+        start = time.perf_counter()
+        counts = write_index(catalog_root)
+        print(f"{count} items, index {counts['bytes'] / 1e6:.2f} MB "
+              f"written in {time.perf_counter() - start:.2f} s")
+        path = os.path.join(catalog_root, INDEX_NAME)
+        start = time.perf_counter()
+        index = SearchIndex.open(path)
+        print(f"index loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for bbox, date_start, date_end in QUERIES:
+            begin = time.perf_counter()
+            expected = crawl(catalog_root, bbox, date_start, date_end)
+            crawled = time.perf_counter() - begin
+            begin = time.perf_counter()
+            rows = index.search(bbox, date_start, date_end)
+            found = set(index.items(rows))
+            searched = time.perf_counter() - begin
+            assert found == expected, (len(found), len(expected))
+            print(f"{str(bbox):32} {date_start[:10]}..{date_end[:10]} {len(found):6} items  "
+                  f"crawl {crawled:6.2f} s  index {searched * 1000:7.2f} ms")
+
+        # a browser reads the header, then only the rows of the date range
+        _, _, header_length = PREAMBLE.unpack_from(open(path, "rb").read(PREAMBLE.size))
+        starts = index.columns["start"]
+        low = np.searchsorted(starts, datetime(2022, 6, 1, tzinfo=timezone.utc).timestamp())
+        high = np.searchsorted(starts, datetime(2022, 6, 8, tzinfo=timezone.utc).timestamp())
+        row_bytes = 8 + 8 + 4 * 4 + 2 + 4
+        probes = int(np.ceil(np.log2(len(index)))) * 8
+        ranged = PREAMBLE.size + header_length + probes + int(high - low) * row_bytes
+        print(f"one week range-read: {ranged / 1e3:.1f} kB of {counts['bytes'] / 1e3:.1f} kB "
+              f"(ids of the matches not included)")
+    finally:
+        shutil.rmtree(catalog_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Size and time of the catalog output formats.
+
+Serializes the items of earthdaily_timeseries_handler (long TiTiler urls
+in assets and links) and a collection linking all of them
+    - indented by pystac (orjson when installed, else json)
+    - indented by json
+    - compact through build_tools.serialization (orjson, sorted keys)
+    - compact through json (the fallback without orjson)
+and reports the output size, the serialization time and the time json
+needs to parse the output again.
+
+    python benchmarks/serialization_bench.py [number_of_entries]
+"""
+
+import json
+import os
+import sys
+import time
+
+from pystac import StacIO
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.item_records_bench import records  # noqa: E402
+from build_tools.serialization import dumps  # noqa: E402
+
+
+def documents(count):
+    items = [record.to_dict(collection_id="bench") for record in records(count)]
+    collection = {
+        "type": "Collection",
+        "id": "bench",
+        "links": [
+            {"rel": "item", "href": f"./bench/{item['id']}.json", "type": "application/geo+json"}
+            for item in items
+        ],
+    }
+    return items + [collection]
+
+
+def compact_json(document):
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def measure(serialize, docs):
+    start = time.perf_counter()
+    texts = [serialize(document) for document in docs]
+    duration = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts:
+        json.loads(text)
+    parse = time.perf_counter() - start
+    return sum(len(text.encode()) for text in texts), duration, parse, texts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = documents(count)
+    stac_io = StacIO.default()
+    print(f"{count} items")
+    baseline = None
+    for name, serialize in [
+        ("pystac indented", stac_io.json_dumps),
+        ("json indented", lambda document: dumps(document)),
+        ("compact", lambda document: dumps(document, compact=True)),
+        ("compact json", compact_json),
+    ]:
+        size, duration, parse, texts = measure(serialize, docs)
+        assert [json.loads(text) for text in texts[:10]] == docs[:10]
+        baseline = baseline or (size, duration)
+        print(
+            f"{name:16} {size / 1e6:8.2f} MB ({size / baseline[0]:4.0%})  "
+            f"write {duration:6.3f} s ({baseline[1] / duration:4.1f}x)  parse {parse:6.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of the daily STAC catalog traversal used by custom_endpoint.
+
+Writes a static {year}/{year-month}/{year-month-day} STAC fixture to a
+temporary directory, serves it over HTTP with an artificial per-request
+latency and compares the previous sequential pystac traversal with the
+concurrent StacReader. The results are checked by tests/test_stac_traversal.py.
+
+    python benchmarks/stac_traversal_bench.py [days] [items_per_day] [latency_ms]
+"""
+
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from pystac import Catalog
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stand_ins import SlowHandler, serve  # noqa: E402
+from custom_handlers.stac_traversal import daily_catalog_items  # noqa: E402
+
+
+def _catalog(catalog_id, links):
+    return {
+        "type": "Catalog",
+        "stac_version": "1.0.0",
+        "id": catalog_id,
+        "description": catalog_id,
+        "links": links,
+    }
+
+
+def _write(path, document):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(document, file)
+
+
+def write_fixture(root, days, items_per_day):
+    """Static catalog with ``items_per_day`` items for ``days`` days from 2025-01-01"""
+    dates = [date(2025, 1, 1) + timedelta(days=offset) for offset in range(days)]
+    tree: dict = {}
+    for day in dates:
+        tree.setdefault(str(day.year), {}).setdefault(day.strftime("%Y-%m"), []).append(day)
+    _write(f"{root}/catalog.json", _catalog("root", [
+        {"rel": "child", "href": f"./{year}/catalog.json"} for year in tree
+    ]))
+    for year, months in tree.items():
+        _write(f"{root}/{year}/catalog.json", _catalog(year, [
+            {"rel": "child", "href": f"./{month}/catalog.json"} for month in months
+        ]))
+        for month, month_days in months.items():
+            _write(f"{root}/{year}/{month}/catalog.json", _catalog(month, [
+                {"rel": "child", "href": f"./{day.isoformat()}/catalog.json"}
+                for day in month_days
+            ]))
+            for day in month_days:
+                day_dir = f"{root}/{year}/{month}/{day.isoformat()}"
+                item_ids = [f"{day.isoformat()}-{index}" for index in range(items_per_day)]
+                _write(f"{day_dir}/catalog.json", _catalog(day.isoformat(), [
+                    {"rel": "item", "href": f"./{item_id}.json"} for item_id in item_ids
+                ]))
+                for item_id in item_ids:
+                    _write(f"{day_dir}/{item_id}.json", {
+                        "type": "Feature",
+                        "stac_version": "1.0.0",
+                        "id": item_id,
+                        "geometry": {"type": "Point", "coordinates": [0, 0]},
+                        "bbox": [0, 0, 0, 0],
+                        "properties": {"datetime": f"{day.isoformat()}T00:00:00Z"},
+                        "links": [],
+                        "assets": {},
+                    })
+    return [day.isoformat() for day in dates]
+
+
+def sequential_items(root_href, dates):
+    api = Catalog.from_file(root_href)
+    items = []
+    for date_entry in dates:
+        year, month, day = date_entry.split("-")
+        catalog = (
+            api.get_child(year)
+            .get_child(f"{year}-{month}")
+            .get_child(f"{year}-{month}-{day}")
+        )
+        items.extend(catalog.get_items())
+    return items
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    items_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    with tempfile.TemporaryDirectory() as root:
+        dates = write_fixture(root, days, items_per_day)
+        SlowHandler.latency = latency
+        server = serve(functools.partial(SlowHandler, directory=root))
+        root_href = f"{server.url}/catalog.json"
+        try:
+            start = time.perf_counter()
+            sequential_items(root_href, dates)
+            sequential = time.perf_counter() - start
+            start = time.perf_counter()
+            daily_catalog_items(root_href, dates)
+            concurrent = time.perf_counter() - start
+        finally:
+            server.shutdown()
+    print(f"{days} days x {items_per_day} items, {latency * 1000:.0f} ms latency")
+    print(f"sequential pystac: {sequential:.2f} s")
+    print(f"concurrent reader: {concurrent:.2f} s ({sequential / concurrent:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
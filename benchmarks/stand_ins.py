@@ -0,0 +1,144 @@
+"""
+Local stand-ins of the remote services, shared by the benchmarks and the tests.
+
+``serve`` runs a handler on a free local port. ``SlowHandler`` serves a
+directory, ``TitilerStandIn`` the TiTiler endpoints the build calls:
+    - ``/cog/info.geojson``, bounds derived from the COG url and 3 uint16 bands
+    - ``/cog/preview.*``, a PNG header followed by the query
+    - ``/cog/tiles/...``, a tile not requested before takes ``cold`` seconds,
+      a rendered one ``warm`` seconds
+    - HEAD of ``/cogs/<path>``, answered with the ETag of the path in
+      ``etags`` (``304`` when it matches ``If-None-Match``)
+Every request waits ``latency`` seconds first. ``titiler_stand_in`` gives a
+handler class with state (request counts, rendered tiles, ETags) of its own.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class FixtureServer(ThreadingHTTPServer):
+    # the default backlog of 5 drops connections of concurrent clients
+    request_queue_size = 128
+
+
+def serve(handler) -> FixtureServer:
+    """Serve ``handler`` from a daemon thread, ``server.url`` is its address"""
+    server = FixtureServer(("127.0.0.1", 0), handler)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def cog_bounds(cog_url: str) -> list:
+    offset = int(hashlib.sha256(cog_url.encode()).hexdigest()[:4], 16) / 65536
+    return [-115 + offset, 32 + offset, -114.5 + offset, 32.5 + offset]
+
+
+def cog_info_feature(cog_url: str) -> dict:
+    west, south, east, north = cog_bounds(cog_url)
+    return {
+        "type": "Feature",
+        "bbox": [west, south, east, north],
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[west, south], [east, south], [east, north],
+                             [west, north], [west, south]]],
+        },
+        "properties": {
+            "dtype": "uint16",
+            "count": 3,
+            "nodata_type": "Nodata",
+            "nodata_value": 0.0,
+            "band_descriptions": [["b1", ""], ["b2", ""], ["b3", ""]],
+        },
+    }
+
+
+class TitilerStandIn(BaseHTTPRequestHandler):
+    latency = 0.0
+    cold = 0.0
+    warm = 0.0
+    lock = threading.Lock()
+    # requests by endpoint: info, preview, tiles and head
+    requests: Counter = Counter()
+    rendered: set = set()
+    etags: dict = {}
+
+    def _count(self, endpoint: str) -> None:
+        with self.lock:
+            self.requests[endpoint] += 1
+
+    def do_HEAD(self):
+        time.sleep(self.latency)
+        path = urllib.parse.urlparse(self.path).path
+        if not path.startswith("/cogs/"):
+            self.send_error(404)
+            return
+        self._count("head")
+        etag = self.etags.get(path, '"1"')
+        self.send_response(304 if self.headers.get("If-None-Match") == etag else 200)
+        self.send_header("Content-Type", "image/tiff")
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path == "/cog/info.geojson":
+            self._count("info")
+            cog_url = urllib.parse.parse_qs(parsed.query)["url"][0]
+            body = json.dumps(cog_info_feature(cog_url)).encode()
+            content_type = "application/geo+json"
+        elif parsed.path.startswith("/cog/preview."):
+            self._count("preview")
+            body = PNG_SIGNATURE + parsed.query.encode()
+            content_type = "image/png"
+        elif parsed.path.startswith("/cog/tiles/"):
+            self._count("tiles")
+            with self.lock:
+                known = self.path in self.rendered
+                self.rendered.add(self.path)
+            time.sleep(self.warm if known else self.cold)
+            body = PNG_SIGNATURE + bytes(1024)
+            content_type = "image/png"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def titiler_stand_in(**settings) -> type:
+    """TitilerStandIn class with state of its own and the class attributes ``settings``"""
+    return type("TitilerStandIn", (TitilerStandIn,), {
+        "lock": threading.Lock(),
+        "requests": Counter(),
+        "rendered": set(),
+        "etags": {},
+        **settings,
+    })
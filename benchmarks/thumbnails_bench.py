@@ -0,0 +1,91 @@
+"""
+Benchmark of the build-time thumbnails against a local TiTiler stand-in.
+
+Writes the items of earthdaily_timeseries_handler for N time entries into a
+catalog directory, with their COGs served by the stand-in, serves
+``/cog/preview.png`` with an artificial latency and materializes the
+thumbnails
+    - one thumbnail at a time
+    - with the default number of workers
+    - again on the materialized output (every thumbnail reused)
+The results are checked by tests/test_thumbnails.py.
+
+    python benchmarks/thumbnails_bench.py [number_of_entries] [latency_ms]
+"""
+
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.parse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.item_records_bench import records  # noqa: E402
+from benchmarks.stand_ins import serve, titiler_stand_in  # noqa: E402
+from build_tools.thumbnails import (  # noqa: E402
+    DEFAULT_WORKERS,
+    THUMBNAIL_DIR,
+    materialize_catalog,
+)
+from custom_handlers.http_cache import CACHE_DIR_ENV  # noqa: E402
+from custom_handlers.titiler_urls import TitilerUrlTemplate  # noqa: E402
+
+
+def write_catalog(directory, count, endpoint):
+    template = TitilerUrlTemplate(endpoint, bands=[1, 2, 3], rescale=[-50, 350],
+                                  reproject="bilinear")
+    with open(os.path.join(directory, "catalog.json"), "w") as file:
+        json.dump({"type": "Catalog", "id": "bench", "links": []}, file)
+    items = os.path.join(directory, "bench", "bench", "bench", "2020")
+    os.makedirs(items)
+    for record in records(count):
+        item = record.to_dict(collection_id="bench")
+        thumbnail = item["assets"]["thumbnail"]
+        cog_url = urllib.parse.parse_qs(urllib.parse.urlparse(thumbnail["href"]).query)["url"][0]
+        thumbnail["href"] = template.urls(cog_url.replace("s3://", f"{endpoint}/cogs/")).thumbnail
+        with open(os.path.join(items, f"{item['id']}.json"), "w") as file:
+            json.dump(item, file)
+    return items
+
+
+def run(directory, workers):
+    start = time.perf_counter()
+    materialize_catalog(directory, workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    stand_in = titiler_stand_in(latency=float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05)
+    server = serve(stand_in)
+    endpoint = server.url
+    print(f"{count} thumbnails, {stand_in.latency * 1000:.0f} ms latency")
+    directory = tempfile.mkdtemp()
+    cache_dir = tempfile.mkdtemp()
+    # registered first so it runs after the cache wrote its counters
+    atexit.register(shutil.rmtree, cache_dir, True)
+    os.environ[CACHE_DIR_ENV] = cache_dir
+    try:
+        write_catalog(directory, count, endpoint)
+        sequential = run(directory, 1)
+        shutil.rmtree(os.path.join(directory, THUMBNAIL_DIR))
+        shutil.rmtree(os.path.join(directory, "bench"))
+        write_catalog(directory, count, endpoint)
+        concurrent = run(directory, DEFAULT_WORKERS)
+        reused = run(directory, DEFAULT_WORKERS)
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"one thumbnail at a time: {sequential:.2f} s")
+    print(f"{DEFAULT_WORKERS} workers:               {concurrent:.2f} s "
+          f"({sequential / concurrent:.1f}x)")
+    print(f"materialized output:     {reused:.2f} s")
+    print(f"requests:                {dict(stand_in.requests)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Size of collection.json with the compact time dimension.
+
+Runs timeseries_collection_handler, timeseries_with_xyz_handler and
+yaml_links_processor for N daily TimeEntries with TiTiler xyz links (COG paths containing the date, then
+COG paths with scene ids unrelated to the date, a few dates missing)
+with and without ``CompactTimeDimension`` and reports the size of the
+collection JSON. tests/test_time_dimension.py checks that
+expand_time_dimension gives back the collection written without the option.
+
+    python benchmarks/time_dimension_bench.py [number_of_entries]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pystac import Catalog, Collection, Extent, SpatialExtent, StacIO, TemporalExtent
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_handlers import (  # noqa: E402
+    timeseries_collection_handler,
+    timeseries_with_xyz_handler,
+    yaml_links_processor,
+)
+from custom_handlers.titiler_urls import TitilerUrlTemplate, s3_href  # noqa: E402
+
+TEMPLATE = TitilerUrlTemplate(
+    "https://titiler.example.com", bands=[1, 2, 3], rescale=[-50, 350], reproject="bilinear"
+)
+
+
+def time_entries(count, dated_paths):
+    entries = []
+    start = datetime(2020, 1, 1)
+    for index in range(count):
+        if index % 97 == 50:
+            continue
+        time_str = (start + timedelta(days=index)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        key = f"{time_str[:10]}/RGB.tif" if dated_paths else f"S2_{index * 7919 % 100000:05d}.tif"
+        entries.append({
+            "Time": time_str,
+            "Links": [{"Relation": "xyz", "URL": TEMPLATE.urls(s3_href("bucket", key)).tile}],
+        })
+    return entries
+
+
+def run(handler, entries, compact):
+    catalog = Catalog(id="bench", description="bench")
+    collection = Collection(
+        id="bench", description="bench",
+        extent=Extent(SpatialExtent([[-180, -90, 180, 90]]), TemporalExtent([[None, None]])),
+    )
+    catalog.add_child(collection)
+    endpoint_config = {"TimeEntries": entries, "CompactTimeDimension": compact}
+    start = time.perf_counter()
+    handler.process(collection, {"id": "bench"}, endpoint_config, {"Name": "bench"})
+    duration = time.perf_counter() - start
+    document = collection.to_dict(include_self_link=False, transform_hrefs=False)
+    return document, duration
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    stac_io = StacIO.default()
+    for handler in (timeseries_collection_handler, timeseries_with_xyz_handler,
+                    yaml_links_processor):
+        for dated_paths in (True, False):
+            entries = time_entries(count, dated_paths)
+            full, full_time = run(handler, entries, False)
+            compact, compact_time = run(handler, entries, True)
+            full_size = len(stac_io.json_dumps(full).encode())
+            compact_size = len(stac_io.json_dumps(compact).encode())
+            print(
+                f"{handler.__name__.rpartition('.')[2]:30} "
+                f"{'dated paths' if dated_paths else 'scene ids':11} {len(entries)} dates: "
+                f"{full_size / 1e6:6.2f} MB -> {compact_size / 1e6:6.3f} MB "
+                f"({compact_size / full_size:5.1%}), "
+                f"{full_time:.2f} s -> {compact_time:.2f} s"
+            )
+            if handler is yaml_links_processor:
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for building TiTiler urls per time entry.
+
+Compares the per-item url construction previously done inline in
+earthdaily_timeseries_handler with the compiled TitilerUrlTemplate.
+
+    python benchmarks/titiler_urls_bench.py [number_of_entries]
+"""
+
+import os
+import sys
+import time
+import urllib.parse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_handlers.titiler_urls import TitilerUrlTemplate, s3_href  # noqa: E402
+
+ENDPOINT = "https://titiler.example.com"
+BUCKET = "earthdaily-prod-marketing-platform"
+BANDS = [1, 2, 3]
+RESCALE = [-50, 350]
+REPROJECT = "bilinear"
+
+
+def legacy_urls(keys):
+    result = []
+    for s3_key in keys:
+        s3_url = f"s3://{BUCKET}/{s3_key}"
+        titiler_url = f"{ENDPOINT}/cog/tiles/{{z}}/{{x}}/{{y}}.png"
+        encoded_s3_url = urllib.parse.quote(s3_url, safe="")
+        params = [f"url={encoded_s3_url}"]
+        for band in BANDS:
+            params.append(f"bidx={band}")
+        rescale_str = f"{RESCALE[0]}%2C{RESCALE[1]}"
+        for _ in BANDS:
+            params.append(f"rescale={rescale_str}")
+        if REPROJECT:
+            params.append(f"reproject={REPROJECT}")
+        full_url = f"{titiler_url}?{'&'.join(params)}"
+        info_url = f"{ENDPOINT}/cog/info?{'&'.join(params[1:])}&url={encoded_s3_url}"
+        preview_url = f"{ENDPOINT}/cog/preview?{'&'.join(params[1:])}&url={encoded_s3_url}"
+        thumbnail_url = (
+            f"{ENDPOINT}/cog/preview.png?{'&'.join(params[1:])}&url={encoded_s3_url}&max_size=512"
+        )
+        result.append((full_url, info_url, preview_url, thumbnail_url))
+    return result
+
+
+def template_urls(keys):
+    template = TitilerUrlTemplate(ENDPOINT, bands=BANDS, rescale=RESCALE, reproject=REPROJECT)
+    return template.batch([s3_href(BUCKET, s3_key) for s3_key in keys])
+
+
+def measure(func, keys, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(keys)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    keys = [
+        f"aircraftdetection/YUMA-2/{i:06d}/VENUS-XS_{i:06d}_L2A_YUMA-2_C_V2-2_SRE_RGB.tif"
+        for i in range(count)
+    ]
+    legacy = measure(legacy_urls, keys)
+    compiled = measure(template_urls, keys)
+    print(f"entries:  {count}")
+    print(f"legacy:   {legacy / count * 1e6:8.3f} us/item")
+    print(f"template: {compiled / count * 1e6:8.3f} us/item")
+    print(f"speedup:  {legacy / compiled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Incremental catalog build.
+
+Wraps ``eodash_catalog`` and only regenerates the catalog entries whose
+content hash (see build_tools.cache) changed since the last build. Changed
+entries are generated into a temporary directory and merged into the
+existing output, unchanged entries are reused as they are. The manifest,
+the build report and the profile are kept in ``--statepath`` (default
+``.cache/build``) so they are not published with the output.
+
+    python -m build_tools.build [--force] [--only NAME ...] [--catalog ID] [--workers N]
+                                [--outputpath DIR] [--statepath DIR]
+                                [--profile [--profile-top N]] [--compact]
+                                [--thumbnails [--thumbnail-format png|webp]] [--search-index]
+                                [--collection-summary]
+                                [--compress [--compress-threshold BYTES]]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from build_tools.cache import (
+    MANIFEST_VERSION,
+    catalog_digest,
+    entry_digest,
+    load_manifest,
+    save_manifest,
+)
+from build_tools.collection_summary import SUMMARY_NAME, write_summaries
+from build_tools.compress import DEFAULT_THRESHOLD, compress_tree, print_report
+from build_tools.config import (
+    CATALOGS_PATH,
+    COLLECTIONS_PATH,
+    INDICATORS_PATH,
+    STATE_PATH,
+    catalog_files,
+    read_config,
+    resolve_entry,
+)
+from build_tools.profiling import (
+    PROFILE_DIR_ENV,
+    PROFILE_NAME,
+    collect_profile,
+    print_profile,
+    write_profile,
+)
+from build_tools.search_index import INDEX_NAME, build_indexes
+from build_tools.serialization import COMPACT_ENV, dumps, use_compact_output
+from build_tools.thumbnails import DEFAULT_WORKERS as THUMBNAIL_WORKERS
+from build_tools.thumbnails import FORMATS, materialize_thumbnails
+from build_tools.thumbnails import print_report as print_thumbnails
+from custom_handlers.http_cache import collect_stats, write_stats
+from custom_handlers.catalog_output import BUILD_DIR_ENV
+
+LOGGER = logging.getLogger(__name__)
+
+
+def run_generator(catalog_id: str, output_path: str, names: list[str], options) -> None:
+    # options applied inside the generator need the runner taking eodash_catalog's arguments
+    generator = (
+        [sys.executable, "-m", "build_tools.generator"] if options.profile_dir or options.compact
+        else ["eodash_catalog"]
+    )
+    command = [
+        *generator,
+        "--catalog", catalog_id,
+        "--catalogspath", options.catalogspath,
+        "--collectionspath", options.collectionspath,
+        "--indicatorspath", options.indicatorspath,
+        "--outputpath", output_path,
+        *names,
+    ]
+    LOGGER.info(f"Running {' '.join(command)}")
+    # handlers write their extra files next to the generated catalog
+    env = {**os.environ, BUILD_DIR_ENV: output_path}
+    if options.profile_dir:
+        env[PROFILE_DIR_ENV] = options.profile_dir
+    if options.compact:
+        env[COMPACT_ENV] = "1"
+    subprocess.run(command, check=True, env=env)
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _child_links(catalog: dict | None) -> dict:
+    if not catalog:
+        return {}
+    return {
+        link.get("id"): link for link in catalog.get("links", []) if link.get("rel") == "child"
+    }
+
+
+def _link_dir(link: dict) -> str:
+    # child links look like ./<collection id>/collection.json
+    return os.path.dirname(os.path.normpath(link["href"]))
+
+
+def merge_catalog(catalog_root: str, generated_roots: list[str], rebuilt_ids: set,
+                  ordered_ids: list, compact: bool = False) -> None:
+    """Merge the freshly generated entries into the existing catalog output"""
+    previous = _read_json(os.path.join(catalog_root, "catalog.json"))
+    generated = None
+    generated_links = {}
+    entry_dirs = {}
+    for generated_root in generated_roots:
+        catalog = _read_json(os.path.join(generated_root, "catalog.json"))
+        if catalog is None:
+            raise RuntimeError(f"Generator did not write {generated_root}/catalog.json")
+        generated = generated or catalog
+        links = _child_links(catalog)
+        for collection_id, link in links.items():
+            generated_links[collection_id] = (generated_root, link)
+        entry_dirs[generated_root] = {_link_dir(link) for link in links.values()}
+    previous_links = _child_links(previous)
+
+    for collection_id, link in previous_links.items():
+        replaced = collection_id in rebuilt_ids and collection_id in generated_links
+        if replaced or collection_id not in ordered_ids:
+            shutil.rmtree(os.path.join(catalog_root, _link_dir(link)), ignore_errors=True)
+    for collection_id in rebuilt_ids:
+        if collection_id not in generated_links:
+            LOGGER.warning(f"{collection_id} was not generated, keeping the previous output")
+            continue
+        generated_root, link = generated_links[collection_id]
+        shutil.copytree(
+            os.path.join(generated_root, _link_dir(link)),
+            os.path.join(catalog_root, _link_dir(link)),
+            dirs_exist_ok=True,
+        )
+    # folders the handlers wrote next to the entries, e.g. data/
+    for generated_root, names in entry_dirs.items():
+        for name in os.listdir(generated_root):
+            path = os.path.join(generated_root, name)
+            if os.path.isdir(path) and name not in names:
+                shutil.copytree(path, os.path.join(catalog_root, name), dirs_exist_ok=True)
+
+    children = []
+    for collection_id in ordered_ids:
+        if collection_id in rebuilt_ids and collection_id in generated_links:
+            children.append(generated_links[collection_id][1])
+        elif collection_id in previous_links:
+            children.append(previous_links[collection_id])
+    other_links = [link for link in generated["links"] if link.get("rel") != "child"]
+    leading = [link for link in other_links if link.get("rel") != "self"]
+    trailing = [link for link in other_links if link.get("rel") == "self"]
+    generated["links"] = leading + children + trailing
+    os.makedirs(catalog_root, exist_ok=True)
+    with open(os.path.join(catalog_root, "catalog.json"), "w", encoding="utf-8") as file:
+        file.write(dumps(generated, compact))
+
+
+def generate(catalog_id: str, names: list[str], generated_path: str, options) -> list[str]:
+    """Run the generator for ``names`` and return the generated catalog roots.
+
+    With more than one worker every entry is generated by its own generator
+    process into its own directory, entries of a catalog do not depend on
+    each other so the merged output is the same as the one of a serial run.
+    """
+    if options.workers <= 1 or len(names) == 1:
+        run_generator(catalog_id, generated_path, names, options)
+        return [os.path.join(generated_path, catalog_id)]
+    outputs = [os.path.join(generated_path, str(index)) for index in range(len(names))]
+    with ThreadPoolExecutor(max_workers=options.workers) as executor:
+        jobs = [
+            executor.submit(run_generator, catalog_id, output, [name], options)
+            for name, output in zip(names, outputs)
+        ]
+        # wait for every job before raising so no generator keeps writing
+        errors = [job.exception() for job in jobs]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [os.path.join(output, catalog_id) for output in outputs]
+
+
+def build_catalog(catalog_file: str, options, manifest: dict) -> dict:
+    """Build one catalog, returns a summary of rebuilt, reused and removed entries"""
+    catalog_config = read_config(catalog_file)
+    catalog_id = catalog_config["id"]
+    catalog_root = os.path.join(options.outputpath, catalog_id)
+    catalog_hash = catalog_digest(catalog_file, options.compact)
+    previous = manifest["catalogs"].get(catalog_id, {}).get("entries", {})
+    has_output = os.path.isfile(os.path.join(catalog_root, "catalog.json"))
+
+    entries = {}
+    for name in catalog_config["collections"]:
+        entry_file = resolve_entry(name, options.collectionspath, options.indicatorspath)
+        if entry_file is None:
+            LOGGER.warning(f"Neither collection nor indicator found for {name}")
+            continue
+        entries[name] = {
+            "id": read_config(entry_file)["Name"],
+            "hash": entry_digest(
+                name, catalog_hash, options.collectionspath, options.indicatorspath
+            ),
+        }
+
+    if options.only:
+        stale = [name for name in entries if name in options.only]
+    elif options.force or not has_output:
+        stale = list(entries)
+    else:
+        stale = [
+            name for name, entry in entries.items()
+            if previous.get(name, {}).get("hash") != entry["hash"]
+        ]
+    removed = [name for name in previous if name not in entries]
+    # entries left out by --only that were never built are not in the output
+    missing = [
+        name for name in entries
+        if name not in stale and (not has_output or name not in previous)
+    ]
+    for name in missing:
+        LOGGER.warning(f"{name} has no previous output, build it without --only")
+    summary = {
+        "catalog": catalog_id,
+        "rebuilt": stale,
+        "reused": [name for name in entries if name not in stale and name not in missing],
+        "missing": missing,
+        "removed": removed,
+    }
+    if not stale and not removed:
+        return summary
+
+    with tempfile.TemporaryDirectory(prefix="catalog_build_") as generated_path:
+        if stale:
+            generated_roots = generate(catalog_id, stale, generated_path, options)
+        else:
+            # only removals, rewrite the catalog from the previous output
+            generated_roots = [os.path.join(generated_path, catalog_id)]
+            os.makedirs(generated_roots[0])
+            shutil.copy(os.path.join(catalog_root, "catalog.json"), generated_roots[0])
+        merge_catalog(
+            catalog_root,
+            generated_roots,
+            {entries[name]["id"] for name in stale},
+            [entry["id"] for entry in entries.values()],
+            options.compact,
+        )
+
+    kept = {name: previous[name] for name in entries if name in previous and name not in stale}
+    kept.update({name: entries[name] for name in stale})
+    manifest["catalogs"][catalog_id] = {"entries": kept}
+    return summary
+
+
+REPORT_NAME = ".build_report.json"
+
+
+def print_summary(summaries: list[dict], http_cache: dict, duration: float) -> None:
+    for summary in summaries:
+        print(f"Catalog {summary['catalog']}:")
+        for key in ("rebuilt", "reused", "missing", "removed"):
+            names = ", ".join(summary[key]) or "-"
+            print(f"  {key:8} {len(summary[key]):3d}  {names}")
+    if http_cache["hits"] or http_cache["misses"]:
+        print(
+            f"HTTP cache: {http_cache['hits']} hits, {http_cache['misses']} misses, "
+            f"{http_cache['bytes_from_cache'] / 1e6:.1f} MB served from cache"
+        )
+    print(f"Build finished in {duration:.1f}s")
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Incrementally build the STAC catalogs")
+    parser.add_argument("--catalog", default=None, help="id of the catalog to build")
+    parser.add_argument("--catalogspath", default=CATALOGS_PATH)
+    parser.add_argument("--collectionspath", default=COLLECTIONS_PATH)
+    parser.add_argument("--indicatorspath", default=INDICATORS_PATH)
+    parser.add_argument("--outputpath", "-o", default="build")
+    parser.add_argument("--statepath", default=STATE_PATH,
+                        help="folder of the build manifests, report and profile")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every entry regardless of the cache")
+    parser.add_argument("--only", nargs="+", default=None, metavar="NAME",
+                        help="rebuild only these catalog entries")
+    parser.add_argument("--workers", "-j", type=int, default=1,
+                        help="number of generator processes building entries in parallel")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"profile the custom handlers and write {PROFILE_NAME}")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of collections listed in the profile summary")
+    parser.add_argument("--compact", action="store_true",
+                        help="write minified JSON with sorted keys")
+    parser.add_argument("--thumbnails", action="store_true",
+                        help="render the TiTiler thumbnails into static files of the build")
+    parser.add_argument("--thumbnail-format", choices=list(FORMATS), default="png")
+    parser.add_argument("--thumbnail-workers", type=int, default=THUMBNAIL_WORKERS, metavar="N",
+                        help="thumbnails rendered at the same time")
+    parser.add_argument("--search-index", action="store_true",
+                        help=f"write the spatio-temporal item index {INDEX_NAME} of every catalog")
+    parser.add_argument("--collection-summary", action="store_true",
+                        help=f"write {SUMMARY_NAME} with the menu fields of every collection")
+    parser.add_argument("--compress", action="store_true",
+                        help="write .gz/.br sidecars of the JSON and GeoJSON output")
+    parser.add_argument("--compress-threshold", type=int, default=DEFAULT_THRESHOLD,
+                        metavar="BYTES", help="smallest file size that gets sidecars")
+    parser.set_defaults(profile_dir=None)
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    options = parse_args(args)
+    if options.compact:
+        # the thumbnails stage rewrites items in this process
+        use_compact_output()
+    selected = [
+        catalog_file for catalog_file in catalog_files(options.catalogspath)
+        if not options.catalog
+        or os.path.splitext(os.path.basename(catalog_file))[0] == options.catalog
+    ]
+    if options.only:
+        known = {
+            name for catalog_file in selected
+            for name in read_config(catalog_file)["collections"]
+        }
+        unknown = [name for name in options.only if name not in known]
+        if unknown:
+            raise SystemExit(f"--only: {', '.join(unknown)} not in the built catalogs")
+    start = time.time()
+    manifest = load_manifest(options.statepath)
+    manifest["version"] = MANIFEST_VERSION
+    summaries = []
+    with tempfile.TemporaryDirectory(prefix="catalog_profile_") as profile_dir:
+        if options.profile:
+            options.profile_dir = profile_dir
+        for catalog_file in selected:
+            summaries.append(build_catalog(catalog_file, options, manifest))
+            save_manifest(options.statepath, manifest)
+        profile = (
+            write_profile(options.statepath, collect_profile(profile_dir))
+            if options.profile else None
+        )
+    thumbnails = (
+        materialize_thumbnails(
+            options.outputpath, options.thumbnail_format, options.thumbnail_workers
+        )
+        if options.thumbnails else None
+    )
+    search_index = (
+        build_indexes(options.outputpath, options.compact) if options.search_index else None
+    )
+    summary = (
+        write_summaries(options.outputpath, options.compact)
+        if options.collection_summary else None
+    )
+    # after the profile and the thumbnails so the final JSON gets its sidecars
+    compression = (
+        compress_tree(
+            options.outputpath, options.compress_threshold, state_path=options.statepath
+        )
+        if options.compress else None
+    )
+    duration = time.time() - start
+    # counters written by the handlers using the persistent HTTP cache, and
+    # by the thumbnails stage in this process
+    write_stats()
+    http_cache = collect_stats()
+    report = {"catalogs": summaries, "http_cache": http_cache, "duration": round(duration, 3)}
+    if thumbnails:
+        report["thumbnails"] = thumbnails
+    if search_index:
+        report["search_index"] = search_index
+    if summary:
+        report["collection_summary"] = summary
+    if compression:
+        report["compression"] = compression
+    os.makedirs(options.statepath, exist_ok=True)
+    with open(os.path.join(options.statepath, REPORT_NAME), "w") as file:
+        json.dump(report, file, indent=2)
+    print_summary(summaries, http_cache, duration)
+    if thumbnails:
+        print_thumbnails(thumbnails)
+    if compression:
+        print_report(compression)
+    if profile:
+        print_profile(profile, options.profile_top)
+
+
+if __name__ == "__main__":
+    main()
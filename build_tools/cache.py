@@ -0,0 +1,111 @@
+"""
+Content hashes of the catalog entries and the manifest of the last build.
+
+The hash of an entry covers its configuration file, the configurations of
+the collections of an indicator, the source of every custom handler module
+they reference (including the local modules those import), the local files
+referenced from the configurations and the catalog configuration itself.
+"""
+
+import hashlib
+import json
+import os
+from importlib import metadata
+
+from build_tools.config import (
+    handler_modules,
+    local_references,
+    module_closure,
+    read_config,
+    resolve_entry,
+)
+from build_tools.serialization import SERIALIZER
+
+MANIFEST_NAME = ".build_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _generator_version() -> str:
+    try:
+        return metadata.version("eodash_catalog")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_inputs(name: str, collections_path: str, indicators_path: str) -> list[str]:
+    """All local files a catalog entry is built from"""
+    entry_file = resolve_entry(name, collections_path, indicators_path)
+    if entry_file is None:
+        return []
+    files = {entry_file}
+    configs = [read_config(entry_file)]
+    for collection in configs[0].get("Collections", []) or []:
+        collection_file = resolve_entry(collection, collections_path, collections_path)
+        if collection_file:
+            files.add(collection_file)
+            configs.append(read_config(collection_file))
+    for config in configs:
+        for subcollection in config.get("Subcollections", []) or []:
+            subcollection_file = resolve_entry(
+                subcollection.get("Collection", ""), collections_path, collections_path
+            )
+            if subcollection_file:
+                files.add(subcollection_file)
+                configs.append(read_config(subcollection_file))
+    for config in configs:
+        files.update(module_closure(handler_modules(config)))
+        files.update(local_references(config))
+    return sorted(files)
+
+
+def catalog_digest(catalog_file: str, compact: bool = False) -> str:
+    """Hash of the catalog settings shared by all of its entries and of the output format"""
+    catalog_config = read_config(catalog_file)
+    # the list of entries does not change how a single entry is built
+    catalog_config.pop("collections", None)
+    digest = hashlib.sha256(json.dumps(catalog_config, sort_keys=True).encode())
+    for path in local_references(catalog_config):
+        digest.update(path.encode())
+        digest.update(_file_digest(path).encode())
+    digest.update(_generator_version().encode())
+    if compact:
+        digest.update(f"compact {SERIALIZER}".encode())
+    return digest.hexdigest()
+
+
+def entry_digest(name: str, catalog_hash: str, collections_path: str,
+                 indicators_path: str) -> str | None:
+    inputs = entry_inputs(name, collections_path, indicators_path)
+    if not inputs:
+        return None
+    digest = hashlib.sha256(catalog_hash.encode())
+    for path in inputs:
+        digest.update(path.encode())
+        digest.update(_file_digest(path).encode())
+    return digest.hexdigest()
+
+
+def load_manifest(state_path: str) -> dict:
+    path = os.path.join(state_path, MANIFEST_NAME)
+    try:
+        with open(path) as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": MANIFEST_VERSION, "catalogs": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "catalogs": {}}
+    return manifest
+
+
+def save_manifest(state_path: str, manifest: dict) -> None:
+    os.makedirs(state_path, exist_ok=True)
+    with open(os.path.join(state_path, MANIFEST_NAME), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
@@ -0,0 +1,104 @@
+"""
+Collection summary of every catalog of the build output.
+
+eodash fills its theme and tag menus from fields of the collections, which
+means fetching every collection.json of the catalog. ``write_summary``
+writes ``<catalog>/collections-summary.json`` instead, linked from
+catalog.json, with per collection its href, title, themes, tags, agency,
+data sources and extents, plus the ids of the collections of every theme,
+tag, agency, satellite and sensor. The menu then needs one request.
+
+    python -m build_tools.collection_summary [OUTPUT] [--compact]
+"""
+
+import argparse
+import json
+import os
+import posixpath
+
+from build_tools.search_index import link_from_catalog
+from build_tools.serialization import dumps
+
+SUMMARY_NAME = "collections-summary.json"
+SUMMARY_REL = "collection-summary"
+# collection fields eodash_catalog writes from the collection configuration
+FIELDS = (
+    "title", "subtitle", "description", "themes", "tags", "agency",
+    "satellite", "sensor", "insituSources", "otherSources",
+)
+FACETS = ("themes", "tags", "agency", "satellite", "sensor")
+
+
+def _summary(collection: dict, href: str) -> dict:
+    summary = {"id": collection["id"], "href": href}
+    for field in FIELDS:
+        if collection.get(field):
+            summary[field] = collection[field]
+    extent = collection.get("extent") or {}
+    summary["extent"] = {
+        "spatial": (extent.get("spatial") or {}).get("bbox"),
+        "temporal": (extent.get("temporal") or {}).get("interval"),
+    }
+    return summary
+
+
+def write_summary(catalog_root: str, compact: bool = False) -> dict:
+    """Write the summary of the child collections of ``catalog_root``"""
+    with open(os.path.join(catalog_root, "catalog.json"), encoding="utf-8") as file:
+        catalog = json.load(file)
+    collections = []
+    for link in catalog["links"]:
+        if link.get("rel") != "child":
+            continue
+        path = os.path.join(catalog_root, os.path.normpath(link["href"]))
+        if not os.path.isfile(path):
+            continue
+        with open(path, encoding="utf-8") as file:
+            collections.append(_summary(json.load(file), posixpath.normpath(link["href"])))
+    facets = {field: {} for field in FACETS}
+    for summary in collections:
+        for field in FACETS:
+            values = summary.get(field) or []
+            for value in [values] if isinstance(values, str) else values:
+                facets[field].setdefault(value, []).append(summary["id"])
+    document = {
+        "catalog": catalog["id"],
+        "collections": collections,
+        "facets": {field: dict(sorted(values.items())) for field, values in facets.items()},
+    }
+    path = os.path.join(catalog_root, SUMMARY_NAME)
+    content = dumps(document, compact=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+    link_from_catalog(catalog_root, {
+        "rel": SUMMARY_REL,
+        "href": f"./{SUMMARY_NAME}",
+        "type": "application/json",
+        "title": "Summary of the collections",
+    }, compact)
+    return {"collections": len(collections), "bytes": len(content.encode())}
+
+
+def write_summaries(output_path: str, compact: bool = False) -> dict:
+    """Write the collection summary of every catalog in the build output"""
+    report = {}
+    for name in sorted(os.listdir(output_path)):
+        catalog_root = os.path.join(output_path, name)
+        if os.path.isfile(os.path.join(catalog_root, "catalog.json")):
+            report[name] = write_summary(catalog_root, compact)
+    return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Summary of the collections of the catalogs")
+    parser.add_argument("output", nargs="?", default="build")
+    parser.add_argument("--compact", action="store_true",
+                        help="the output was built with --compact")
+    options = parser.parse_args(args)
+    for catalog_id, counts in write_summaries(options.output, options.compact).items():
+        print(f"Collection summary {catalog_id}: {counts['collections']} collections, "
+              f"{counts['bytes'] / 1e3:.1f} kB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Precompressed sidecars of the build output.
+
+Writes ``<file>.gz`` and ``<file>.br`` next to every JSON and GeoJSON file
+of the output that is larger than a threshold, so static servers able to
+serve precompressed files (``http-server -g -b``, nginx ``gzip_static`` /
+``brotli_static``, ...) do not compress them on every request. Files are
+compressed by a process pool. The content hash of every compressed file is
+kept in ``.compress_manifest.json`` of the build state folder (not in the
+published output) and files whose hash did not change since the last run
+keep their sidecars.
+
+Brotli sidecars need the optional ``brotli`` package, without it only gzip
+sidecars are written.
+
+    python -m build_tools.compress [OUTPUT] [--threshold BYTES] [--workers N] [--statepath DIR]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from build_tools.config import STATE_PATH
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".compress_manifest.json"
+EXTENSIONS = (".json", ".geojson")
+DEFAULT_THRESHOLD = 1024
+
+
+def _gzip(content: bytes) -> bytes:
+    # mtime=0 keeps the sidecars reproducible
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _brotli(content: bytes) -> bytes:
+    return brotli.compress(content, mode=brotli.MODE_TEXT, quality=11)
+
+
+ENCODERS = {"gz": _gzip, "br": _brotli}
+
+
+def available_formats() -> tuple[str, ...]:
+    return ("gz", "br") if brotli is not None else ("gz",)
+
+
+def _write(path: str, content: bytes) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(content)
+    os.replace(temporary, path)
+
+
+def _remove_sidecars(path: str, exclude: tuple[str, ...] = ()) -> None:
+    for extension in ENCODERS:
+        if extension in exclude:
+            continue
+        try:
+            os.remove(f"{path}.{extension}")
+        except FileNotFoundError:
+            pass
+
+
+def compress_file(path: str, previous_hash: str | None, formats: tuple[str, ...],
+                  threshold: int) -> dict:
+    """Write the sidecars of ``path`` unless its content is unchanged"""
+    with open(path, "rb") as file:
+        content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+    result = {"hash": digest, "size": len(content), "sizes": {}}
+    if len(content) < threshold:
+        _remove_sidecars(path)
+        result["status"] = "small"
+        return result
+    unchanged = digest == previous_hash and all(
+        os.path.exists(f"{path}.{extension}") for extension in formats
+    )
+    for extension in formats:
+        sidecar = f"{path}.{extension}"
+        if not unchanged:
+            _write(sidecar, ENCODERS[extension](content))
+        result["sizes"][extension] = os.path.getsize(sidecar)
+    # e.g. a .br of an earlier run with brotli installed, it would serve stale content
+    _remove_sidecars(path, exclude=formats)
+    result["status"] = "unchanged" if unchanged else "compressed"
+    return result
+
+
+def source_files(root: str) -> list[str]:
+    """JSON and GeoJSON files below ``root``, without the build bookkeeping files"""
+    paths = []
+    for directory, directories, files in os.walk(root):
+        directories[:] = sorted(name for name in directories if not name.startswith("."))
+        for name in sorted(files):
+            if name.endswith(EXTENSIONS) and not name.startswith("."):
+                paths.append(os.path.join(directory, name))
+    return paths
+
+
+def _remove_orphans(root: str) -> int:
+    """Remove sidecars whose source file was removed"""
+    removed = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            source, extension = os.path.splitext(name)
+            if extension[1:] in ENCODERS and source.endswith(EXTENSIONS) \
+                    and source not in files:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+    return removed
+
+
+def compress_tree(root: str, threshold: int = DEFAULT_THRESHOLD,
+                  workers: int | None = None, state_path: str = STATE_PATH) -> dict:
+    """Write the sidecars of every JSON/GeoJSON file below ``root`` and report the ratios"""
+    formats = available_formats()
+    if brotli is None:
+        LOGGER.warning("brotli is not installed, only gzip sidecars are written")
+    manifest_path = os.path.join(state_path, MANIFEST_NAME)
+    try:
+        with open(manifest_path) as file:
+            previous = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = {}
+
+    paths = source_files(root)
+    relative = [os.path.relpath(path, root) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            compress_file,
+            paths,
+            [previous.get(name) for name in relative],
+            [formats] * len(paths),
+            [threshold] * len(paths),
+            chunksize=16,
+        ))
+
+    report = {
+        "files": len(paths),
+        "compressed": 0,
+        "unchanged": 0,
+        "small": 0,
+        "removed": _remove_orphans(root),
+        "formats": {extension: {"bytes_in": 0, "bytes_out": 0} for extension in formats},
+    }
+    manifest = {}
+    for name, result in zip(relative, results):
+        report[result["status"]] += 1
+        if result["status"] == "small":
+            continue
+        manifest[name] = result["hash"]
+        for extension, size in result["sizes"].items():
+            report["formats"][extension]["bytes_in"] += result["size"]
+            report["formats"][extension]["bytes_out"] += size
+    for totals in report["formats"].values():
+        totals["ratio"] = (
+            round(totals["bytes_in"] / totals["bytes_out"], 2) if totals["bytes_out"] else None
+        )
+    os.makedirs(state_path, exist_ok=True)
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"Compression: {report['compressed']} compressed, {report['unchanged']} unchanged, "
+        f"{report['small']} below threshold, {report['removed']} stale sidecars removed"
+    )
+    for extension, totals in report["formats"].items():
+        if totals["bytes_out"]:
+            print(
+                f"  .{extension}  {totals['bytes_in'] / 1e6:8.2f} MB -> "
+                f"{totals['bytes_out'] / 1e6:8.2f} MB  ({totals['ratio']}x)"
+            )
+
+
+def main(args=None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Write .gz/.br sidecars of the build output")
+    parser.add_argument("output", nargs="?", default="build")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help="smallest file size in bytes that is compressed")
+    parser.add_argument("--workers", "-j", type=int, default=None,
+                        help="compression processes, defaults to the number of CPUs")
+    parser.add_argument("--statepath", default=STATE_PATH,
+                        help="folder of the compression manifest")
+    options = parser.parse_args(args)
+    print_report(
+        compress_tree(options.output, options.threshold, options.workers, options.statepath)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Helpers to read the catalog, indicator and collection configuration files
+and to find the local files every configuration depends on.
+"""
+
+import ast
+import json
+import os
+import posixpath
+import urllib.parse
+
+import yaml
+
+CATALOGS_PATH = "catalogs"
+COLLECTIONS_PATH = "collections"
+INDICATORS_PATH = "indicators"
+# manifests and reports of the build, kept out of the published output
+STATE_PATH = ".cache/build"
+HANDLERS_PACKAGE = "custom_handlers"
+SUFFIXES = [".json", ".yaml", ".yml", ".JSON", ".YAML", ".YML"]
+
+
+def find_config_file(path: str) -> str | None:
+    """Resolve a config path with or without suffix, like eodash_catalog does"""
+    if os.path.isfile(path):
+        return path
+    for suffix in SUFFIXES:
+        if os.path.isfile(path + suffix):
+            return path + suffix
+    return None
+
+
+def read_config(path: str) -> dict:
+    with open(path) as file:
+        content = file.read()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return yaml.safe_load(content)
+
+
+def catalog_files(catalogs_path: str = CATALOGS_PATH) -> list[str]:
+    return sorted(
+        os.path.join(catalogs_path, name)
+        for name in os.listdir(catalogs_path)
+        if os.path.isfile(os.path.join(catalogs_path, name))
+    )
+
+
+def resolve_entry(name: str, collections_path: str = COLLECTIONS_PATH,
+                  indicators_path: str = INDICATORS_PATH) -> str | None:
+    """Config file of a catalog entry, collections take precedence over indicators"""
+    return find_config_file(f"{collections_path}/{name}") or find_config_file(
+        f"{indicators_path}/{name}"
+    )
+
+
+def handler_modules(config: dict) -> list[str]:
+    """Module names of the custom handlers referenced by the resources of a collection"""
+    modules = []
+    for resource in config.get("Resources", []) or []:
+        location = resource.get("Python_Function_Location")
+        if location:
+            modules.append(location.rpartition(".")[0])
+    return modules
+
+
+def module_file(module: str) -> str | None:
+    path = module.replace(".", "/") + ".py"
+    return path if os.path.isfile(path) else None
+
+
+def local_imports(path: str, package: str = HANDLERS_PACKAGE) -> list[str]:
+    """Modules of ``package`` imported by the python file at ``path``"""
+    with open(path) as file:
+        tree = ast.parse(file.read(), filename=path)
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names if alias.name.startswith(package))
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            if node.module == package:
+                modules.extend(f"{package}.{alias.name}" for alias in node.names)
+            elif node.module.startswith(f"{package}."):
+                modules.append(node.module)
+    return modules
+
+
+def module_closure(modules: list[str]) -> list[str]:
+    """Source files of ``modules`` and of every local module they import"""
+    files = []
+    pending = list(modules)
+    seen = set()
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        path = module_file(module)
+        if path:
+            files.append(path)
+            pending.extend(local_imports(path))
+    return sorted(files)
+
+
+def _local_path(value: str) -> str | None:
+    if "/" not in value or "\n" in value or len(value) > 1024:
+        return None
+    parsed = urllib.parse.urlparse(value)
+    if parsed.scheme in ("http", "https"):
+        # files served from the repository while developing, e.g.
+        # http://localhost:8001/processes/methane_detection/jsonform.json
+        candidate = parsed.path.lstrip("/")
+    elif parsed.scheme:
+        return None
+    else:
+        candidate = value
+    candidate = posixpath.normpath(candidate)
+    while candidate.startswith("../"):
+        candidate = candidate[3:]
+    if not candidate or candidate.startswith("/") or candidate == ".":
+        return None
+    return find_config_file(candidate)
+
+
+def local_references(config) -> list[str]:
+    """Local files (styles, processes, data, layers, ...) referenced from a config"""
+    found = set()
+    pending = [config]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, str):
+            path = _local_path(value)
+            if path:
+                found.add(path)
+    return sorted(found)
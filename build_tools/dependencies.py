@@ -0,0 +1,114 @@
+"""
+Reverse-dependency index of the catalog configuration.
+
+Maps every file a catalog entry is built from (catalog, indicator and
+collection configurations, custom handler modules and the local files they
+import, styles, processes, layers, data, ...) back to the catalog entries
+depending on it, so the entries affected by a set of changed files can be
+looked up directly.
+
+Files that no longer exist are matched as well: configurations by their
+path without suffix and handler modules by the path derived from their
+module name.
+"""
+
+import os
+import posixpath
+
+from build_tools.cache import entry_inputs
+from build_tools.config import (
+    CATALOGS_PATH,
+    COLLECTIONS_PATH,
+    INDICATORS_PATH,
+    SUFFIXES,
+    catalog_files,
+    handler_modules,
+    local_references,
+    read_config,
+    resolve_entry,
+)
+
+
+def normalize(path: str) -> str:
+    return posixpath.normpath(path.replace(os.sep, "/"))
+
+
+def _config_key(path: str) -> str:
+    """Path of a configuration without its suffix"""
+    root, suffix = posixpath.splitext(normalize(path))
+    return root if suffix in SUFFIXES else normalize(path)
+
+
+def _declared_paths(name: str, collections_path: str, indicators_path: str) -> set[str]:
+    """Paths an entry depends on by name, whether or not the files exist"""
+    declared = {
+        _config_key(f"{collections_path}/{name}"),
+        _config_key(f"{indicators_path}/{name}"),
+    }
+    entry_file = resolve_entry(name, collections_path, indicators_path)
+    if entry_file is None:
+        return declared
+    configs = [read_config(entry_file)]
+    for collection in configs[0].get("Collections", []) or []:
+        declared.add(_config_key(f"{collections_path}/{collection}"))
+        collection_file = resolve_entry(collection, collections_path, collections_path)
+        if collection_file:
+            configs.append(read_config(collection_file))
+    for config in configs:
+        for subcollection in config.get("Subcollections", []) or []:
+            declared.add(_config_key(f"{collections_path}/{subcollection.get('Collection', '')}"))
+        for module in handler_modules(config):
+            declared.add(normalize(module.replace(".", "/") + ".py"))
+    return declared
+
+
+class DependencyIndex:
+    """Reverse index of file path to the (catalog file, entry name) pairs built from it"""
+
+    def __init__(self, catalogs_path: str = CATALOGS_PATH,
+                 collections_path: str = COLLECTIONS_PATH,
+                 indicators_path: str = INDICATORS_PATH):
+        self.catalogs_path = catalogs_path
+        self.collections_path = collections_path
+        self.indicators_path = indicators_path
+        self.catalogs: dict[str, list[str]] = {}
+        self.dependents: dict[str, set[tuple[str, str]]] = {}
+        self._build()
+
+    def _add(self, path: str, catalog_file: str, name: str) -> None:
+        self.dependents.setdefault(path, set()).add((catalog_file, name))
+
+    def _build(self) -> None:
+        # entries shared by several catalogs are only resolved once
+        entry_paths: dict[str, set[str]] = {}
+        for catalog_file in catalog_files(self.catalogs_path):
+            catalog_config = read_config(catalog_file)
+            names = list(catalog_config.get("collections", []))
+            self.catalogs[catalog_file] = names
+            catalog_paths = {_config_key(catalog_file)} | {
+                normalize(path) for path in local_references(catalog_config)
+            }
+            for name in names:
+                if name not in entry_paths:
+                    entry_paths[name] = {
+                        normalize(path) for path in entry_inputs(
+                            name, self.collections_path, self.indicators_path
+                        )
+                    } | _declared_paths(name, self.collections_path, self.indicators_path)
+                for path in catalog_paths | entry_paths[name]:
+                    self._add(path, catalog_file, name)
+
+    def dependents_of(self, path: str) -> set[tuple[str, str]]:
+        path = normalize(path)
+        return self.dependents.get(path, set()) | self.dependents.get(_config_key(path), set())
+
+    def affected(self, changed_files: list[str]) -> dict[str, list[str]]:
+        """Entries of every catalog affected by ``changed_files``, in catalog order"""
+        hits: set[tuple[str, str]] = set()
+        for path in changed_files:
+            if path:
+                hits |= self.dependents_of(path)
+        return {
+            catalog_file: [name for name in names if (catalog_file, name) in hits]
+            for catalog_file, names in self.catalogs.items()
+        }
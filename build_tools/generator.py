@@ -0,0 +1,33 @@
+"""
+eodash_catalog with the build options applied inside the generator process.
+
+Takes the arguments of ``eodash_catalog``. ``build_tools.build`` runs it
+instead of the ``eodash_catalog`` command when one of these is set:
+    - ``EODASH_PROFILE_DIR``: profile the custom handlers (build_tools.profiling)
+    - ``EODASH_COMPACT_JSON``: write compact JSON (build_tools.serialization)
+
+    python -m build_tools.generator [eodash_catalog arguments]
+"""
+
+import os
+import sys
+
+from build_tools import profiling
+from build_tools.serialization import COMPACT_ENV, use_compact_output
+from custom_handlers.catalog_output import BUILD_DIR_ENV, generator_output_path
+
+
+def main():
+    # handlers write their extra files into the output folder of these arguments
+    os.environ[BUILD_DIR_ENV] = generator_output_path(sys.argv[1:])
+    if os.environ.get(profiling.PROFILE_DIR_ENV):
+        profiling.install(os.environ[profiling.PROFILE_DIR_ENV])
+    if os.environ.get(COMPACT_ENV):
+        use_compact_output()
+    from eodash_catalog.generate_indicators import process_catalogs
+
+    process_catalogs(prog_name="eodash_catalog")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Tile pre-warming of TiTiler after a deploy.
+
+Collects the ``xyz`` links of the build output, expands their
+``{z}/{x}/{y}`` template over the bbox of the item (or the spatial extent
+of the collection for collection-level links) for a zoom range and requests
+every tile once, so the first users do not pay the cold rendering latency.
+Requests run on a bounded thread pool and are rate limited; the latency of
+the requests is reported as p50/p95.
+
+    python -m build_tools.prewarm [OUTPUT] [--zoom MIN-MAX] [--collection ID ...]
+                                  [--workers N] [--rate REQUESTS_PER_SECOND]
+                                  [--max-tiles N] [--dry-run] [--report FILE]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from custom_handlers.time_dimension import expand_time_dimension
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_ZOOM = "8-12"
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 20.0
+DEFAULT_MAX_TILES = 10000
+DEFAULT_TIMEOUT = 60
+MAX_LATITUDE = 85.0511287798066
+# eodash map layers of the catalog, not served by our TiTiler
+LAYER_ROLES = {"baselayer", "overlay"}
+
+
+def tile_range(bbox: list, zoom: int) -> tuple[range, range]:
+    """Web Mercator tile columns and rows covering ``bbox`` at ``zoom``"""
+    west, south, east, north = bbox[:4]
+    tiles = 2 ** zoom
+
+    def column(lon):
+        return min(tiles - 1, max(0, math.floor((lon + 180) / 360 * tiles)))
+
+    def row(lat):
+        lat = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, lat)))
+        value = (1 - math.asinh(math.tan(lat)) / math.pi) / 2 * tiles
+        return min(tiles - 1, max(0, math.floor(value)))
+
+    return range(column(west), column(east) + 1), range(row(north), row(south) + 1)
+
+
+def tiles(bbox: list, zooms: range):
+    """(z, x, y) of every tile covering ``bbox``, split at the antimeridian"""
+    west, south, east, north = bbox[:4]
+    parts = [bbox] if west <= east else [[west, south, 180, north], [-180, south, east, north]]
+    for zoom in zooms:
+        for part in parts:
+            columns, rows = tile_range(part, zoom)
+            for x in columns:
+                for y in rows:
+                    yield zoom, x, y
+
+
+def tile_url(template: str, z: int, x: int, y: int) -> str:
+    return template.replace("{z}", str(z)).replace("{x}", str(x)).replace("{y}", str(y))
+
+
+def _documents(output_path: str):
+    for directory, directories, files in os.walk(output_path):
+        directories[:] = sorted(name for name in directories if not name.startswith("."))
+        for name in sorted(files):
+            if name.endswith(".json") and not name.startswith("."):
+                with open(os.path.join(directory, name), encoding="utf-8") as file:
+                    try:
+                        yield json.load(file)
+                    except ValueError:
+                        continue
+
+
+def _bbox(document: dict) -> list | None:
+    if document.get("type") == "Feature":
+        return document.get("bbox")
+    bboxes = ((document.get("extent") or {}).get("spatial") or {}).get("bbox") or []
+    return bboxes[0] if bboxes else None
+
+
+def xyz_templates(output_path: str, collections: list | None = None):
+    """(collection id, template, bbox) of every xyz link of the output"""
+    for document in _documents(output_path):
+        kind = document.get("type")
+        if kind not in ("Feature", "Collection"):
+            continue
+        collection_id = document.get("collection") if kind == "Feature" else document.get("id")
+        if collections and collection_id not in collections:
+            continue
+        # one link per date in place of a templated one
+        document = expand_time_dimension(document)
+        bbox = _bbox(document)
+        if not bbox:
+            continue
+        for link in document.get("links") or []:
+            href = link.get("href") or ""
+            if link.get("rel") != "xyz" or LAYER_ROLES.intersection(link.get("roles") or []):
+                continue
+            if href.startswith(("http://", "https://")) and all(
+                part in href for part in ("{z}", "{x}", "{y}")
+            ):
+                yield collection_id, href, bbox
+
+
+def plan_tiles(output_path: str, zooms: range, collections: list | None = None,
+               max_tiles: int = DEFAULT_MAX_TILES) -> list[str]:
+    """Unique tile urls to request, at most ``max_tiles``"""
+    urls = {}
+    for _, template, bbox in xyz_templates(output_path, collections):
+        for z, x, y in tiles(bbox, zooms):
+            urls.setdefault(tile_url(template, z, x, y), None)
+            if len(urls) >= max_tiles:
+                LOGGER.warning(f"Stopping at {max_tiles} tiles, raise --max-tiles for more")
+                return list(urls)
+    return list(urls)
+
+
+class RateLimiter:
+    """Spaces the requests of all threads to at most ``rate`` per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next)
+            self.next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    """Nearest-rank percentile of ``values``"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def prewarm(urls: list[str], workers: int = DEFAULT_WORKERS,
+            rate: float = DEFAULT_RATE, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """Request every tile once and report the status codes and latencies"""
+    limiter = RateLimiter(rate)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def fetch(url):
+        limiter.wait()
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=timeout)
+            # reading the body waits for the whole tile to be rendered
+            size = len(response.content)
+            return response.status_code, time.perf_counter() - start, size
+        except requests.RequestException as error:
+            LOGGER.debug(f"Could not request {url}: {error}")
+            return "error", time.perf_counter() - start, 0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fetch, urls))
+    duration = time.perf_counter() - start
+    session.close()
+    latencies = [latency for status, latency, _ in results if status == 200]
+    statuses = Counter(str(status) for status, _, _ in results)
+    return {
+        "tiles": len(urls),
+        "ok": statuses.get("200", 0),
+        "statuses": dict(sorted(statuses.items())),
+        "bytes": sum(size for _, _, size in results),
+        "duration": round(duration, 3),
+        "p50_ms": _ms(percentile(latencies, 0.5)),
+        "p95_ms": _ms(percentile(latencies, 0.95)),
+        "max_ms": _ms(max(latencies, default=None)),
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"Pre-warmed {report['ok']}/{report['tiles']} tiles in {report['duration']:.1f}s "
+        f"({report['bytes'] / 1e6:.1f} MB), statuses {report['statuses']}"
+    )
+    if report["p50_ms"] is not None:
+        print(
+            f"Latency p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, "
+            f"max {report['max_ms']} ms"
+        )
+
+
+def zoom_range(value: str) -> range:
+    low, _, high = value.partition("-")
+    return range(int(low), int(high or low) + 1)
+
+
+def main(args=None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Request the TiTiler tiles of the catalogs")
+    parser.add_argument("output", nargs="?", default="build")
+    parser.add_argument("--zoom", type=zoom_range, default=DEFAULT_ZOOM, metavar="MIN-MAX",
+                        help="zoom levels to request")
+    parser.add_argument("--collection", nargs="+", default=None, metavar="ID",
+                        help="only the xyz links of these collections")
+    parser.add_argument("--workers", "-j", type=int, default=DEFAULT_WORKERS,
+                        help="tiles requested at the same time")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="requests per second, 0 for no limit")
+    parser.add_argument("--max-tiles", type=int, default=DEFAULT_MAX_TILES)
+    parser.add_argument("--dry-run", action="store_true", help="only count the tiles")
+    parser.add_argument("--report", default=None, metavar="FILE",
+                        help="write the report as JSON")
+    options = parser.parse_args(args)
+    urls = plan_tiles(options.output, options.zoom, options.collection, options.max_tiles)
+    LOGGER.info(f"{len(urls)} tiles for zoom {options.zoom.start}-{options.zoom.stop - 1}")
+    if options.dry_run:
+        return
+    report = prewarm(urls, options.workers, options.rate)
+    if options.report:
+        with open(options.report, "w") as file:
+            json.dump(report, file, indent=2)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
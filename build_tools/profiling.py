@@ -0,0 +1,188 @@
+"""
+Profiling of the custom handlers.
+
+When ``EODASH_PROFILE_DIR`` is set, ``build_tools.generator`` runs the
+generator with every ``Custom-Endpoint`` resource wrapped, so each call of
+a ``Python_Function_Location`` handler records its wall and CPU time, the
+peak memory traced while it runs, the number of items and links of the
+returned collection and the number of HTTP requests it sent. The records
+of a generator process are written to ``EODASH_PROFILE_DIR`` when it exits.
+
+``python -m build_tools.build --profile`` runs the generator this way and
+collects the records of all its processes into ``build_profile.json``.
+"""
+
+import atexit
+import http.client
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from pystac import Collection
+
+from custom_handlers.item_writer import streamed_items
+
+PROFILE_DIR_ENV = "EODASH_PROFILE_DIR"
+PROFILE_NAME = "build_profile.json"
+# the records of the handler calls are sorted by this field
+SORT_KEY = "wall"
+
+
+class RequestCounter:
+    """Counts the HTTP requests of the process, for requests/urllib3 and urllib alike"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._putrequest = None
+
+    def install(self) -> None:
+        putrequest = self._putrequest = http.client.HTTPConnection.putrequest
+        counter = self
+
+        def counting_putrequest(connection, *args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return putrequest(connection, *args, **kwargs)
+
+        http.client.HTTPConnection.putrequest = counting_putrequest
+
+    def uninstall(self) -> None:
+        if self._putrequest is not None:
+            http.client.HTTPConnection.putrequest = self._putrequest
+            self._putrequest = None
+
+
+def collection_counts(collection: Collection) -> tuple[int, int]:
+    """Items and links of a collection returned by a handler, including the streamed items"""
+    streamed = streamed_items(collection)
+    items = len(collection.get_links("item")) + streamed
+    return items, len(collection.links) + streamed
+
+
+class HandlerProfiler:
+    """Wraps the eodash_catalog custom endpoint function and keeps one record per call"""
+
+    def __init__(self):
+        self.records = []
+        self.requests = RequestCounter()
+
+    def wrap(self, handle_custom_endpoint):
+        def profiled(catalog_config, endpoint_config, collection_config, catalog):
+            record = {
+                "catalog": catalog_config["id"],
+                "collection": collection_config["Name"],
+                "handler": endpoint_config["Python_Function_Location"],
+            }
+            requests_before = self.requests.count
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            start_wall = time.perf_counter()
+            start_cpu = time.process_time()
+            try:
+                collection = handle_custom_endpoint(
+                    catalog_config, endpoint_config, collection_config, catalog
+                )
+            except Exception as error:
+                record["error"] = repr(error)
+                raise
+            else:
+                record["items"], record["links"] = collection_counts(collection)
+                return collection
+            finally:
+                record["wall"] = round(time.perf_counter() - start_wall, 4)
+                record["cpu"] = round(time.process_time() - start_cpu, 4)
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+                if not tracing:
+                    tracemalloc.stop()
+                record["network_calls"] = self.requests.count - requests_before
+                self.records.append(record)
+
+        return profiled
+
+    def write(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}-{time.time_ns()}.json")
+        with open(path, "w") as file:
+            json.dump(self.records, file)
+
+
+def collect_profile(directory: str) -> list[dict]:
+    """Records written by the profiled generator processes, slowest handler call first"""
+    records = []
+    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        with open(os.path.join(directory, name)) as file:
+            records.extend(json.load(file))
+    return sorted(records, key=lambda record: record[SORT_KEY], reverse=True)
+
+
+def summarize(records: list[dict]) -> dict:
+    """Totals of the handler calls per collection, slowest collection first"""
+    collections = {}
+    for record in records:
+        key = (record["catalog"], record["collection"])
+        summary = collections.setdefault(key, {
+            "catalog": record["catalog"],
+            "collection": record["collection"],
+            "calls": 0,
+            "wall": 0.0,
+            "cpu": 0.0,
+            "peak_memory": 0,
+            "items": 0,
+            "links": 0,
+            "network_calls": 0,
+        })
+        summary["calls"] += 1
+        for field in ("wall", "cpu", "items", "links", "network_calls"):
+            summary[field] += record.get(field, 0)
+        summary["peak_memory"] = max(summary["peak_memory"], record["peak_memory"])
+    for summary in collections.values():
+        summary["wall"] = round(summary["wall"], 4)
+        summary["cpu"] = round(summary["cpu"], 4)
+    return {
+        "collections": sorted(collections.values(), key=lambda entry: entry[SORT_KEY],
+                              reverse=True),
+        "handlers": records,
+    }
+
+
+def write_profile(state_path: str, records: list[dict]) -> dict:
+    profile = summarize(records)
+    os.makedirs(state_path, exist_ok=True)
+    with open(os.path.join(state_path, PROFILE_NAME), "w") as file:
+        json.dump(profile, file, indent=2)
+    return profile
+
+
+def print_profile(profile: dict, top: int) -> None:
+    collections = profile["collections"][:top]
+    if not collections:
+        print("Profile: no custom handler was called")
+        return
+    print(f"Profile, top {len(collections)} collections by handler wall time:")
+    print(f"  {'collection':32} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} "
+          f"{'items':>7} {'links':>7} {'http':>6}")
+    for entry in collections:
+        print(
+            f"  {entry['collection'][:32]:32} {entry['wall']:8.2f} {entry['cpu']:8.2f} "
+            f"{entry['peak_memory'] / 1e6:8.1f} {entry['items']:7d} {entry['links']:7d} "
+            f"{entry['network_calls']:6d}"
+        )
+
+
+def install(directory: str) -> HandlerProfiler:
+    """Profile the custom handlers of this generator process, records are written at exit"""
+    # imported here so build_tools.build does not need the generator to read profiles
+    from eodash_catalog import generate_indicators
+
+    profiler = HandlerProfiler()
+    generate_indicators.handle_custom_endpoint = profiler.wrap(
+        generate_indicators.handle_custom_endpoint
+    )
+    profiler.requests.install()
+    atexit.register(profiler.write, directory)
+    return profiler
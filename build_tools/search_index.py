@@ -0,0 +1,318 @@
+"""
+Static spatio-temporal search index of the build output.
+
+Answers "which items intersect this bbox and date range" without crawling
+every collection and item of a catalog. ``write_index`` packs the id,
+collection, bbox and datetime of every item below a catalog into one
+columnar file, ``<catalog>/search-index.bin``, linked from catalog.json.
+
+Layout, little endian, made to be range-read by a browser:
+    - 8 bytes magic ``EOSINDEX``, uint32 version, uint32 header length
+    - a JSON header: item count, collection ids, the byte offset and dtype of
+      every column and a summary (time range, bbox) of every block of
+      ``block_size`` rows
+    - the columns, each aligned to 8 bytes so they map onto typed arrays:
+      ``start``/``end`` (float64 epoch seconds), ``west``/``south``/``east``/
+      ``north`` (float32, rounded outwards), ``collection`` (uint16 index into
+      the header ids), ``id_offsets`` (uint32, count + 1) and ``ids`` (UTF-8)
+
+Rows are sorted by ``start``, so a date range is a binary search and the
+block summaries tell which row ranges can intersect a bbox. ``SearchIndex``
+is the query API, vectorised with NumPy.
+
+    python -m build_tools.search_index build [OUTPUT]
+    python -m build_tools.search_index query INDEX [--bbox W S E N]
+                                                   [--start DATE] [--end DATE]
+                                                   [--collection ID ...]
+"""
+
+import argparse
+import json
+import logging
+import os
+import struct
+from datetime import datetime, timezone
+
+import numpy as np
+
+from build_tools.serialization import dumps
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_NAME = "search-index.bin"
+INDEX_REL = "search-index"
+INDEX_TYPE = "application/octet-stream"
+MAGIC = b"EOSINDEX"
+VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+ALIGNMENT = 8
+DEFAULT_BLOCK_SIZE = 1024
+COLUMNS = {
+    "start": "<f8",
+    "end": "<f8",
+    "west": "<f4",
+    "south": "<f4",
+    "east": "<f4",
+    "north": "<f4",
+    "collection": "<u2",
+}
+
+
+def _timestamp(value: str | None) -> float | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _item_row(item: dict) -> tuple | None:
+    properties = item.get("properties") or {}
+    start = _timestamp(properties.get("start_datetime") or properties.get("datetime"))
+    end = _timestamp(properties.get("end_datetime") or properties.get("datetime"))
+    bbox = item.get("bbox")
+    if start is None or not bbox:
+        return None
+    if len(bbox) == 6:
+        bbox = [bbox[0], bbox[1], bbox[3], bbox[4]]
+    return item["id"], item.get("collection") or "", start, end or start, *bbox[:4]
+
+
+def scan_items(catalog_root: str):
+    """(id, collection, start, end, west, south, east, north) of every item"""
+    for directory, directories, files in os.walk(catalog_root):
+        directories[:] = sorted(name for name in directories if not name.startswith("."))
+        for name in sorted(files):
+            if not name.endswith(".json") or name in ("catalog.json", "collection.json"):
+                continue
+            with open(os.path.join(directory, name), encoding="utf-8") as file:
+                try:
+                    document = json.load(file)
+                except ValueError:
+                    continue
+            if document.get("type") == "Feature":
+                row = _item_row(document)
+                if row is not None:
+                    yield row
+
+
+def _float32(values: np.ndarray, direction: float) -> np.ndarray:
+    """float32 of ``values`` rounded towards ``direction`` so bboxes only grow"""
+    rounded = values.astype("<f4")
+    wrong = rounded > values if direction < 0 else rounded < values
+    rounded[wrong] = np.nextafter(rounded[wrong], np.float32(direction))
+    return rounded
+
+
+def _blocks(columns: dict, block_size: int) -> dict:
+    count = len(columns["start"])
+    starts = range(0, count, block_size)
+    return {
+        "size": block_size,
+        "start": [float(columns["start"][row:row + block_size].min()) for row in starts],
+        "end": [float(columns["end"][row:row + block_size].max()) for row in starts],
+        "bbox": [
+            [float(columns["west"][row:row + block_size].min()),
+             float(columns["south"][row:row + block_size].min()),
+             float(columns["east"][row:row + block_size].max()),
+             float(columns["north"][row:row + block_size].max())]
+            for row in starts
+        ],
+    }
+
+
+def _padding(length: int) -> int:
+    return -length % ALIGNMENT
+
+
+def write_index(catalog_root: str, block_size: int = DEFAULT_BLOCK_SIZE) -> dict:
+    """Write the search index of the items below ``catalog_root``"""
+    rows = sorted(scan_items(catalog_root), key=lambda row: (row[2], row[1], row[0]))
+    collections = sorted({row[1] for row in rows})
+    positions = {collection_id: index for index, collection_id in enumerate(collections)}
+    values = np.array([row[2:] for row in rows], dtype="<f8").reshape(len(rows), 6)
+    columns = {
+        "start": values[:, 0],
+        "end": values[:, 1],
+        "west": _float32(values[:, 2], -np.inf),
+        "south": _float32(values[:, 3], -np.inf),
+        "east": _float32(values[:, 4], np.inf),
+        "north": _float32(values[:, 5], np.inf),
+        "collection": np.array([positions[row[1]] for row in rows], dtype="<u2"),
+    }
+    encoded = [row[0].encode() for row in rows]
+    columns["id_offsets"] = np.concatenate(
+        [[0], np.cumsum([len(item_id) for item_id in encoded])]
+    ).astype("<u4")
+    columns["ids"] = np.frombuffer(b"".join(encoded), dtype="u1")
+    dtypes = {**COLUMNS, "id_offsets": "<u4", "ids": "u1"}
+
+    # the header holds the column offsets, so its size is settled first
+    header = {
+        "version": VERSION,
+        "count": len(rows),
+        "collections": collections,
+        "sorted_by": "start",
+        "columns": {name: {"dtype": dtype, "offset": 0} for name, dtype in dtypes.items()},
+        "blocks": _blocks(columns, block_size) if rows else {"size": block_size},
+    }
+    while True:
+        encoded_header = json.dumps(header, separators=(",", ":")).encode()
+        offset = PREAMBLE.size + len(encoded_header) + _padding(len(encoded_header))
+        layout = {}
+        for name in dtypes:
+            layout[name] = offset
+            offset += columns[name].nbytes + _padding(columns[name].nbytes)
+        if all(header["columns"][name]["offset"] == layout[name] for name in dtypes):
+            break
+        for name in dtypes:
+            header["columns"][name]["offset"] = layout[name]
+
+    path = os.path.join(catalog_root, INDEX_NAME)
+    with open(f"{path}.tmp", "wb") as file:
+        file.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded_header)))
+        file.write(encoded_header + b" " * _padding(len(encoded_header)))
+        for name in dtypes:
+            file.write(columns[name].tobytes())
+            file.write(b"\0" * _padding(columns[name].nbytes))
+    os.replace(f"{path}.tmp", path)
+    return {"items": len(rows), "collections": len(collections), "bytes": offset}
+
+
+def link_from_catalog(catalog_root: str, link: dict, compact: bool = False) -> None:
+    """Add ``link`` to catalog.json, replacing a link with the same rel"""
+    catalog_path = os.path.join(catalog_root, "catalog.json")
+    with open(catalog_path, encoding="utf-8") as file:
+        catalog = json.load(file)
+    links = [existing for existing in catalog["links"] if existing.get("rel") != link["rel"]]
+    # before the self link, like the other links merge_catalog keeps
+    position = next(
+        (index for index, existing in enumerate(links) if existing.get("rel") == "self"),
+        len(links),
+    )
+    catalog["links"] = links[:position] + [link] + links[position:]
+    with open(catalog_path, "w", encoding="utf-8") as file:
+        file.write(dumps(catalog, compact))
+
+
+def build_indexes(output_path: str, compact: bool = False,
+                  block_size: int = DEFAULT_BLOCK_SIZE) -> dict:
+    """Write the search index of every catalog in the build output"""
+    report = {}
+    for name in sorted(os.listdir(output_path)):
+        catalog_root = os.path.join(output_path, name)
+        if not os.path.isfile(os.path.join(catalog_root, "catalog.json")):
+            continue
+        report[name] = write_index(catalog_root, block_size)
+        link_from_catalog(catalog_root, {
+            "rel": INDEX_REL,
+            "href": f"./{INDEX_NAME}",
+            "type": INDEX_TYPE,
+            "title": "Spatio-temporal index of the items",
+        }, compact)
+    return report
+
+
+class SearchIndex:
+    """Columns of a search index file, queried with NumPy"""
+
+    def __init__(self, header: dict, columns: dict, ids: bytes):
+        self.header = header
+        self.collections = header["collections"]
+        self.columns = columns
+        self._ids = ids
+
+    @classmethod
+    def open(cls, path: str) -> "SearchIndex":
+        with open(path, "rb") as file:
+            content = file.read()
+        magic, version, header_length = PREAMBLE.unpack_from(content)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} search index")
+        header = json.loads(content[PREAMBLE.size:PREAMBLE.size + header_length])
+        count = header["count"]
+        columns = {}
+        for name, column in header["columns"].items():
+            length = count + 1 if name == "id_offsets" else count
+            if name == "ids":
+                continue
+            columns[name] = np.frombuffer(
+                content, dtype=column["dtype"], count=length, offset=column["offset"]
+            )
+        ids_offset = header["columns"]["ids"]["offset"]
+        ids = content[ids_offset:ids_offset + int(columns["id_offsets"][-1])]
+        return cls(header, columns, ids)
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def item_id(self, row: int) -> str:
+        offsets = self.columns["id_offsets"]
+        return self._ids[offsets[row]:offsets[row + 1]].decode()
+
+    def search(self, bbox: list | None = None, start: str | None = None,
+               end: str | None = None, collections: list | None = None) -> np.ndarray:
+        """Rows of the items intersecting ``bbox`` and the ``start``/``end`` range.
+
+        Bboxes are stored as float32 rounded outwards, an item touching the
+        query bbox within float32 precision may be returned as well.
+        """
+        columns = self.columns
+        # rows are sorted by start, items starting after the range are cut off
+        last = len(self)
+        if end is not None:
+            last = int(np.searchsorted(columns["start"], _timestamp(end), side="right"))
+        mask = np.ones(last, dtype=bool)
+        if start is not None:
+            mask &= columns["end"][:last] >= _timestamp(start)
+        if bbox is not None:
+            west, south, east, north = bbox
+            mask &= (columns["south"][:last] <= north) & (columns["north"][:last] >= south)
+            item_west, item_east = columns["west"][:last], columns["east"][:last]
+            # items crossing the antimeridian have west > east
+            crossing = item_west > item_east
+            mask &= np.where(
+                crossing,
+                (item_west <= east) | (item_east >= west),
+                (item_west <= east) & (item_east >= west),
+            )
+        if collections is not None:
+            wanted = [index for index, name in enumerate(self.collections) if name in collections]
+            mask &= np.isin(columns["collection"][:last], wanted)
+        return np.flatnonzero(mask)
+
+    def items(self, rows) -> list[tuple[str, str]]:
+        """(collection, item id) of ``rows``"""
+        collection = self.columns["collection"]
+        return [(self.collections[collection[row]], self.item_id(row)) for row in rows]
+
+
+def main(args=None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Search index of the STAC items")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write the index of every catalog")
+    build.add_argument("output", nargs="?", default="build")
+    build.add_argument("--compact", action="store_true",
+                       help="the output was built with --compact")
+    query = commands.add_parser("query", help="list the items matching a query")
+    query.add_argument("index")
+    query.add_argument("--bbox", nargs=4, type=float, metavar=("W", "S", "E", "N"))
+    query.add_argument("--start", default=None)
+    query.add_argument("--end", default=None)
+    query.add_argument("--collection", nargs="+", default=None, metavar="ID")
+    options = parser.parse_args(args)
+    if options.command == "build":
+        for catalog_id, counts in build_indexes(options.output, options.compact).items():
+            print(f"Search index {catalog_id}: {counts['items']} items of "
+                  f"{counts['collections']} collections, {counts['bytes'] / 1e6:.2f} MB")
+        return
+    index = SearchIndex.open(options.index)
+    rows = index.search(options.bbox, options.start, options.end, options.collection)
+    for collection_id, item_id in index.items(rows):
+        print(f"{collection_id}\t{item_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Compact JSON output of the catalog.
+
+pystac writes every catalog, collection and item indented by two spaces.
+With compact output the documents are written minified with sorted keys
+through orjson (the optional ``compact`` extra, ``json`` when orjson is not
+installed). With the same serializer the same document always serializes
+to the same bytes. The two format some floats differently (``0.00001``
+and ``1e16`` with orjson, ``1e-05`` and ``1e+16`` with json), so
+``SERIALIZER`` is part of the build hash and switching serializers
+rebuilds the catalog.
+"""
+
+import json
+from typing import Any
+
+from pystac import StacIO
+from pystac.stac_io import DefaultStacIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPACT_ENV = "EODASH_COMPACT_JSON"
+# name and version of the compact serializer, part of the build hash
+SERIALIZER = f"orjson {orjson.__version__}" if orjson is not None else "json"
+
+
+def dumps(document: Any, compact: bool = False) -> str:
+    """Serialize ``document`` like the catalog output, indented or compact"""
+    if not compact:
+        return json.dumps(document, indent=2)
+    if orjson is not None:
+        return orjson.dumps(document, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class CompactStacIO(DefaultStacIO):
+    def json_dumps(self, json_dict: dict[str, Any], *args: Any, **kwargs: Any) -> str:
+        return dumps(json_dict, compact=True)
+
+
+def use_compact_output() -> None:
+    """Make pystac write compact JSON in this process"""
+    StacIO.set_default(CompactStacIO)
@@ -0,0 +1,364 @@
+"""
+Static thumbnails of the build output.
+
+TiTiler handlers give every item a ``thumbnail`` asset pointing at the
+dynamic ``/cog/preview.png`` endpoint, so every catalog browser renders it
+again. This stage renders each of those thumbnails once, stores it in
+``<catalog>/thumbnails/`` and rewrites the asset href to the static file.
+
+Thumbnails are rendered by TiTiler on a bounded thread pool, or locally
+from the COG overviews when the COG is a local file and ``rasterio`` is
+installed. A thumbnail is named after the hash of the content of a local
+COG, or of the url and the ``ETag``/``Last-Modified`` validator of a remote
+one, together with the rendering parameters, so unchanged COGs reuse the
+existing file and replaced ones are rendered again. The validators are
+requested with HEAD requests through the persistent HTTP cache, ``s3://``
+COGs at their public S3 url; a remote COG without a validator is keyed on
+its preview url only. Thumbnails no item refers to any more are removed.
+
+    python -m build_tools.thumbnails [OUTPUT] [--format png|webp] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from pystac import StacIO
+
+from build_tools.serialization import use_compact_output
+from custom_handlers.http_cache import cached_session
+
+try:
+    import numpy as np
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.io import MemoryFile
+except ImportError:
+    rasterio = None
+
+LOGGER = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = "thumbnails"
+FORMATS = {"png": ("PNG", "image/png"), "webp": ("WEBP", "image/webp")}
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_SIZE = 512
+DEFAULT_TIMEOUT = 120
+
+
+class Thumbnail:
+    """One thumbnail to render, shared by every asset with the same source"""
+
+    __slots__ = ("preview_url", "cog_path", "params", "name")
+
+    def __init__(self, preview_url: str, cog_path: str | None, params: list, name: str):
+        self.preview_url = preview_url
+        self.cog_path = cog_path
+        self.params = params
+        self.name = name
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cog_http_url(cog_url: str) -> str | None:
+    parsed = urllib.parse.urlparse(cog_url)
+    if parsed.scheme in ("http", "https"):
+        return cog_url
+    if parsed.scheme == "s3" and parsed.netloc:
+        return f"https://{parsed.netloc}.s3.amazonaws.com{parsed.path}"
+    return None
+
+
+def remote_validator(cog_url: str, session: requests.Session) -> str | None:
+    """``ETag`` or ``Last-Modified`` of a remote COG, None when the server gives neither"""
+    url = _cog_http_url(cog_url)
+    if url is None:
+        return None
+    try:
+        response = session.head(url, allow_redirects=True, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as error:
+        LOGGER.warning(f"Could not check {cog_url} for changes: {error}")
+        return None
+    return response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+
+def preview_cog_url(href: str) -> str | None:
+    """COG of a TiTiler preview href, None for any other href"""
+    parsed = urllib.parse.urlparse(href)
+    endpoint = parsed.path.rpartition("/cog/")[2]
+    if parsed.scheme not in ("http", "https") or not endpoint.startswith("preview"):
+        return None
+    return dict(urllib.parse.parse_qsl(parsed.query)).get("url") or None
+
+
+def _local_cog(cog_url: str) -> str | None:
+    parsed = urllib.parse.urlparse(cog_url)
+    if parsed.scheme == "file":
+        path = urllib.parse.unquote(parsed.path)
+    elif not parsed.scheme:
+        path = cog_url
+    else:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+class ThumbnailPlanner:
+    """Resolves the thumbnail assets of the items to the files to render"""
+
+    def __init__(self, image_format: str):
+        self.image_format = image_format
+        self.thumbnails: dict[str, Thumbnail] = {}
+        self._digests: dict[str, str] = {}
+        self._validators: dict[str, str | None] = {}
+
+    def _digest(self, path: str) -> str:
+        if path not in self._digests:
+            self._digests[path] = _file_digest(path)
+        return self._digests[path]
+
+    def validate(self, cog_urls, session: requests.Session,
+                 workers: int = DEFAULT_WORKERS) -> None:
+        """Request the validators of the remote COGs among ``cog_urls`` concurrently"""
+        remote = [
+            cog_url for cog_url in dict.fromkeys(cog_urls)
+            if cog_url not in self._validators
+            and not (rasterio is not None and _local_cog(cog_url))
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            validators = executor.map(lambda cog_url: remote_validator(cog_url, session), remote)
+            self._validators.update(zip(remote, validators))
+
+    def plan(self, href: str) -> Thumbnail | None:
+        """Thumbnail of a TiTiler preview href, None for any other href"""
+        cog_url = preview_cog_url(href)
+        if not cog_url:
+            return None
+        parsed = urllib.parse.urlparse(href)
+        prefix = parsed.path.rpartition("/cog/")[0]
+        preview_url = urllib.parse.urlunparse(parsed._replace(
+            path=f"{prefix}/cog/preview.{self.image_format}"
+        ))
+        cog_path = _local_cog(cog_url) if rasterio is not None else None
+        params = urllib.parse.parse_qsl(parsed.query)
+        rendering = [(key, value) for key, value in params if key != "url"]
+        if cog_path:
+            source = self._digest(cog_path)
+        elif self._validators.get(cog_url):
+            source = [preview_url, self._validators[cog_url]]
+        else:
+            source = preview_url
+        key = json.dumps([source, rendering, self.image_format])
+        name = f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.{self.image_format}"
+        if name not in self.thumbnails:
+            self.thumbnails[name] = Thumbnail(preview_url, cog_path, rendering, name)
+        return self.thumbnails[name]
+
+
+def _rescale(data, ranges: list):
+    scaled = []
+    for index, band in enumerate(data):
+        low, high = ranges[min(index, len(ranges) - 1)] if ranges else (band.min(), band.max())
+        span = float(high - low) or 1.0
+        scaled.append(np.clip((band.astype("float32") - low) * 255 / span, 0, 255))
+    return np.stack(scaled).astype("uint8")
+
+
+def render_local(thumbnail: Thumbnail, image_format: str) -> bytes:
+    """Render from the COG overviews, with the bidx/rescale/max_size of the preview url"""
+    bands = [int(value) for key, value in thumbnail.params if key == "bidx"]
+    ranges = [
+        tuple(float(part) for part in value.split(","))
+        for key, value in thumbnail.params if key == "rescale"
+    ]
+    max_size = int(dict(thumbnail.params).get("max_size", DEFAULT_MAX_SIZE))
+    with rasterio.open(thumbnail.cog_path) as dataset:
+        bands = bands or list(range(1, min(dataset.count, 3) + 1))
+        ratio = max(dataset.width, dataset.height) / max_size
+        width = max(1, round(dataset.width / ratio))
+        height = max(1, round(dataset.height / ratio))
+        # reading a reduced shape uses the matching overview level
+        data = dataset.read(bands, out_shape=(len(bands), height, width), masked=True,
+                            resampling=Resampling.bilinear)
+    image = _rescale(data.filled(0), ranges)
+    alpha = np.where(np.ma.getmaskarray(data).any(axis=0), 0, 255).astype("uint8")
+    driver = FORMATS[image_format][0]
+    with MemoryFile() as memory:
+        with memory.open(driver=driver, width=width, height=height, count=len(bands) + 1,
+                         dtype="uint8") as target:
+            target.write(image, indexes=list(range(1, len(bands) + 1)))
+            target.write(alpha, len(bands) + 1)
+        return memory.read()
+
+
+def render(thumbnail: Thumbnail, directory: str, image_format: str,
+           session: requests.Session) -> bool:
+    if thumbnail.cog_path:
+        content = render_local(thumbnail, image_format)
+    else:
+        response = session.get(thumbnail.preview_url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        content = response.content
+    path = os.path.join(directory, thumbnail.name)
+    with open(f"{path}.tmp", "wb") as file:
+        file.write(content)
+    os.replace(f"{path}.tmp", path)
+    return True
+
+
+def _items(catalog_root: str):
+    for directory, directories, files in os.walk(catalog_root):
+        directories[:] = sorted(name for name in directories if name != THUMBNAIL_DIR)
+        for name in sorted(files):
+            if name.endswith(".json") and name not in ("catalog.json", "collection.json"):
+                yield os.path.join(directory, name)
+
+
+def _thumbnail_assets(item: dict):
+    for asset in (item.get("assets") or {}).values():
+        if "thumbnail" in (asset.get("roles") or []):
+            yield asset
+
+
+def materialize_catalog(catalog_root: str, image_format: str = "png",
+                        workers: int = DEFAULT_WORKERS) -> dict:
+    """Render the thumbnails of the items below ``catalog_root`` and point the items at them"""
+    directory = os.path.join(catalog_root, THUMBNAIL_DIR)
+    os.makedirs(directory, exist_ok=True)
+    planner = ThumbnailPlanner(image_format)
+    stac_io = StacIO.default()
+    referenced = set()
+    # items with preview thumbnails and the COGs those render
+    previews = []
+    cog_urls = []
+    for path in _items(catalog_root):
+        with open(path, encoding="utf-8") as file:
+            item = json.load(file)
+        if item.get("type") != "Feature":
+            continue
+        item_cogs = []
+        for asset in _thumbnail_assets(item):
+            cog_url = preview_cog_url(asset["href"])
+            if cog_url:
+                item_cogs.append(cog_url)
+            elif posixpath.dirname(asset["href"]).endswith(THUMBNAIL_DIR):
+                referenced.add(posixpath.basename(asset["href"]))
+        if item_cogs:
+            previews.append((path, item))
+            cog_urls.extend(item_cogs)
+    with cached_session(pool_size=workers) as head_session:
+        planner.validate(cog_urls, head_session, workers)
+
+    pending = []
+    for path, item in previews:
+        relative = posixpath.relpath(directory, os.path.dirname(path)).replace(os.sep, "/")
+        updates = []
+        for asset in _thumbnail_assets(item):
+            thumbnail = planner.plan(asset["href"])
+            if thumbnail is None:
+                continue
+            referenced.add(thumbnail.name)
+            updates.append((asset, thumbnail, f"{relative}/{thumbnail.name}"))
+        if updates:
+            pending.append((path, item, updates))
+
+    existing = set(os.listdir(directory))
+    missing = [
+        thumbnail for name, thumbnail in planner.thumbnails.items() if name not in existing
+    ]
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def safe_render(thumbnail):
+        try:
+            return render(thumbnail, directory, image_format, session)
+        except (requests.RequestException, OSError, ValueError) as error:
+            LOGGER.warning(f"Could not render {thumbnail.preview_url}: {error}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rendered = dict(zip((t.name for t in missing), executor.map(safe_render, missing)))
+    session.close()
+
+    media_type = FORMATS[image_format][1]
+    rewritten = 0
+    for path, item, updates in pending:
+        changed = False
+        for asset, thumbnail, href in updates:
+            if rendered.get(thumbnail.name, thumbnail.name in existing):
+                asset["href"] = href
+                asset["type"] = media_type
+                changed = True
+        if changed:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(stac_io.json_dumps(item))
+            rewritten += 1
+
+    removed = 0
+    for name in existing - referenced:
+        os.remove(os.path.join(directory, name))
+        removed += 1
+    if not os.listdir(directory):
+        os.rmdir(directory)
+    return {
+        "thumbnails": len(planner.thumbnails),
+        "rendered": sum(rendered.values()),
+        "failed": len(rendered) - sum(rendered.values()),
+        "reused": len(referenced & existing),
+        "local": sum(1 for thumbnail in missing if thumbnail.cog_path),
+        "items_rewritten": rewritten,
+        "removed": removed,
+    }
+
+
+def materialize_thumbnails(output_path: str, image_format: str = "png",
+                           workers: int = DEFAULT_WORKERS) -> dict:
+    """Materialize the thumbnails of every catalog in the build output"""
+    report = {}
+    for name in sorted(os.listdir(output_path)):
+        catalog_root = os.path.join(output_path, name)
+        if os.path.isfile(os.path.join(catalog_root, "catalog.json")):
+            report[name] = materialize_catalog(catalog_root, image_format, workers)
+    return report
+
+
+def print_report(report: dict) -> None:
+    for catalog_id, counts in report.items():
+        print(
+            f"Thumbnails {catalog_id}: {counts['rendered']} rendered "
+            f"({counts['local']} locally), {counts['reused']} reused, "
+            f"{counts['failed']} failed, {counts['removed']} removed, "
+            f"{counts['items_rewritten']} items rewritten"
+        )
+
+
+def main(args=None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Render the item thumbnails into the build")
+    parser.add_argument("output", nargs="?", default="build")
+    parser.add_argument("--format", choices=list(FORMATS), default="png")
+    parser.add_argument("--workers", "-j", type=int, default=DEFAULT_WORKERS,
+                        help="thumbnails rendered at the same time")
+    parser.add_argument("--compact", action="store_true",
+                        help="the output was built with --compact")
+    options = parser.parse_args(args)
+    if options.compact:
+        use_compact_output()
+    print_report(materialize_thumbnails(options.output, options.format, options.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Output of the generator as seen by the custom handlers.
+
+``output_path`` is the output folder of the running generator, where
+handlers write their extra files: ``EODASH_BUILD_DIR`` (set by
+``build_tools.build`` and ``build_tools.generator``) or the ``--outputpath``
+of the running ``eodash_catalog`` command. Files written below
+``catalog_dir`` are referred to by their absolute path in the pystac
+objects, the saved documents get these hrefs relative to their own
+location, wherever the generator lays them out.
+
+Handlers finishing documents while eodash_catalog saves the catalog register
+a save hook for a field with ``on_save`` and call ``install``. The hook
+then runs right before a document holding the field is written, with the
+real destination of the document, and the field is removed from the
+document.
+"""
+
+import functools
+import os
+import sys
+import threading
+from typing import Any, Callable
+
+from pystac import StacIO
+from pystac.stac_io import DefaultStacIO
+
+BUILD_DIR_ENV = "EODASH_BUILD_DIR"
+GENERATOR = "eodash_catalog"
+
+# (order, field, hook) of the registered save hooks, run by order
+_HOOKS: list = []
+# catalog folders whose paths are written relative to the saved documents
+_CATALOG_DIRS: set = set()
+_INSTALL_LOCK = threading.Lock()
+
+
+def generator_output_path(args: list[str]) -> str:
+    """``--outputpath`` of eodash_catalog called with ``args``"""
+    from eodash_catalog.generate_indicators import process_catalogs
+
+    return process_catalogs.make_context(GENERATOR, list(args)).params["outputpath"]
+
+
+@functools.cache
+def _command_output_path() -> str | None:
+    if os.path.basename(sys.argv[0]) != GENERATOR:
+        return None
+    return generator_output_path(sys.argv[1:])
+
+
+def output_path() -> str:
+    """Output folder of the generator, handlers write their extra files there"""
+    path = os.environ.get(BUILD_DIR_ENV) or _command_output_path()
+    if not path:
+        raise RuntimeError(
+            f"Output folder of the generator unknown, run eodash_catalog or set {BUILD_DIR_ENV}"
+        )
+    return path
+
+
+def catalog_dir(catalog_config: dict) -> str:
+    """Absolute folder the catalog of ``catalog_config`` is written to"""
+    path = os.path.abspath(os.path.join(output_path(), catalog_config["id"]))
+    install()
+    _CATALOG_DIRS.add(path)
+    return path
+
+
+def on_save(field: str, hook: Callable, order: int = 0) -> None:
+    """Run ``hook(stac_io, dest_href, document, value)`` before a document with ``field`` is saved"""
+    _HOOKS.append((order, field, hook))
+    _HOOKS.sort(key=lambda entry: entry[0])
+
+
+class OutputStacIO:
+    """StacIO mixin running the save hooks and relativizing catalog paths of a document"""
+
+    def save_json(self, dest: Any, json_dict: dict[str, Any], *args: Any, **kwargs: Any) -> None:
+        dest = os.fspath(dest)
+        for _, field, hook in _HOOKS:
+            if field in json_dict:
+                hook(self, dest, json_dict, json_dict.pop(field))
+        txt = self.json_dumps(json_dict, *args, **kwargs)
+        for path in _CATALOG_DIRS:
+            if f"{path}/" in txt:
+                relative = os.path.relpath(path, os.path.dirname(os.path.abspath(dest)))
+                txt = txt.replace(f"{path}/", f"{relative}/" if relative != "." else "./")
+        self.write_text(dest, txt)
+
+
+def install() -> None:
+    """Run the save hooks in the default StacIO of this process"""
+    with _INSTALL_LOCK:
+        stac_io_class = StacIO._default_io or DefaultStacIO
+        if not issubclass(stac_io_class, OutputStacIO):
+            StacIO.set_default(
+                type(f"Output{stac_io_class.__name__}", (OutputStacIO, stac_io_class), {})
+            )
@@ -0,0 +1,195 @@
+"""
+COG metadata fetched from TiTiler at build time.
+
+Resources with ``PrefetchCogInfo: true`` request the info of every unique
+COG once while the catalog is built, instead of every viewer calling the
+``info`` asset at runtime. The info fills in the real footprint of the
+items (in place of the configured or default ``Bbox``) and the band count,
+data type and nodata value as ``raster:bands`` of the COG asset.
+
+``/cog/info.geojson`` is requested rather than ``/cog/info`` because it
+reports the bounds in WGS84 whatever the CRS of the COG. Responses are kept
+in the persistent HTTP cache and reused without revalidation, the info of
+a published COG does not change. Requests run on a bounded thread pool
+(``MaxConcurrency``). ``iter_cog_info`` yields the info in the order of the
+hrefs with only a few requests in flight ahead of the handler, so time
+series handlers never hold the info of every entry.
+"""
+
+import json
+import logging
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from custom_handlers.http_cache import HttpCache
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60
+# requests in flight per worker while iterating
+PREFETCH_DEPTH = 2
+RASTER_EXTENSION = "https://stac-extensions.github.io/raster/v1.1.0/schema.json"
+
+
+def _bbox(feature: dict) -> list | None:
+    if feature.get("bbox"):
+        return list(feature["bbox"][:4])
+    coordinates = (feature.get("geometry") or {}).get("coordinates") or []
+    positions = [position for ring in coordinates for position in ring]
+    if not positions:
+        return None
+    xs = [position[0] for position in positions]
+    ys = [position[1] for position in positions]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def raster_fields(count: int, dtype: str | None, nodata) -> dict:
+    """``raster:bands`` asset fields of a COG, with a dict of its own for every band"""
+    band = {"data_type": dtype} if dtype else {}
+    if nodata is not None:
+        band["nodata"] = nodata
+    return {"raster:bands": [dict(band) for _ in range(count)]}
+
+
+class CogInfo:
+    """The parts of a TiTiler info response written to the catalog"""
+
+    __slots__ = ("bbox", "count", "dtype", "nodata")
+
+    def __init__(self, bbox: list, count: int, dtype: str | None, nodata=None):
+        self.bbox = bbox
+        self.count = count
+        self.dtype = dtype
+        self.nodata = nodata
+
+    @classmethod
+    def from_feature(cls, feature: dict) -> "CogInfo | None":
+        bbox = _bbox(feature)
+        if bbox is None:
+            return None
+        info = feature.get("properties") or {}
+        count = info.get("count") or len(info.get("band_descriptions") or []) or 1
+        nodata = info.get("nodata_value") if info.get("nodata_type") == "Nodata" else None
+        return cls(bbox, count, info.get("dtype"), nodata)
+
+    @property
+    def raster_fields(self) -> dict:
+        return raster_fields(self.count, self.dtype, self.nodata)
+
+
+class CogInfoClient:
+    """Fetches the info of many COGs from one TiTiler endpoint concurrently"""
+
+    def __init__(self, endpoint: str, concurrency: int = DEFAULT_CONCURRENCY,
+                 cache: HttpCache | None = None, session: requests.Session | None = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.endpoint = endpoint.rstrip("/")
+        self.concurrency = concurrency
+        self.cache = cache
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests = 0
+
+    def info_url(self, href: str) -> str:
+        return f"{self.endpoint}/cog/info.geojson?url={urllib.parse.quote(href, safe='')}"
+
+    def _feature(self, url: str) -> dict:
+        if self.cache is not None and self.cache.lookup(url):
+            content = self.cache.body(url)
+            self.cache.count("hits")
+            self.cache.count("bytes_from_cache", len(content))
+            return json.loads(content)
+        self.requests += 1
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.count("misses")
+            self.cache.count("bytes_downloaded", len(response.content))
+            self.cache.store(url, response.headers, response.content)
+        return response.json()
+
+    def fetch(self, href: str) -> CogInfo | None:
+        """Info of the COG at ``href``, None when TiTiler could not read it"""
+        url = self.info_url(href)
+        try:
+            return CogInfo.from_feature(self._feature(url))
+        except (requests.RequestException, ValueError) as error:
+            logging.warning(f"Could not fetch the COG info of {href}: {error}")
+            return None
+
+    def fetch_all(self, hrefs) -> dict:
+        """Info of every unique href, requested concurrently"""
+        unique = list(dict.fromkeys(hrefs))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return dict(zip(unique, executor.map(self.fetch, unique)))
+
+    def iter_fetch(self, hrefs):
+        """(href, info) of every href in order, requested ahead on the thread pool"""
+        window = deque()
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for href in hrefs:
+                # repeated hrefs in the window share one request
+                future = in_flight.get(href) or executor.submit(self.fetch, href)
+                in_flight[href] = future
+                window.append((href, future))
+                if len(window) > self.concurrency * PREFETCH_DEPTH:
+                    yield self._done(window, in_flight)
+            while window:
+                yield self._done(window, in_flight)
+
+    @staticmethod
+    def _done(window: deque, in_flight: dict) -> tuple:
+        href, future = window.popleft()
+        if in_flight.get(href) is future and all(entry[1] is not future for entry in window):
+            del in_flight[href]
+        return href, future.result()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def prefetch_cog_info(endpoint_config: dict, hrefs) -> dict:
+    """Info of the COGs of a resource with ``PrefetchCogInfo``, empty otherwise"""
+    if not endpoint_config.get("PrefetchCogInfo"):
+        return {}
+    client = CogInfoClient(
+        endpoint_config["EndPoint"],
+        concurrency=endpoint_config.get("MaxConcurrency", DEFAULT_CONCURRENCY),
+        cache=HttpCache(),
+    )
+    try:
+        infos = client.fetch_all(hrefs)
+    finally:
+        client.close()
+    logging.info(
+        f"Prefetched the info of {len(infos)} COGs with {client.requests} requests"
+    )
+    return infos
+
+
+def iter_cog_info(endpoint_config: dict, hrefs):
+    """(href, info) of every href in order, the info is None without ``PrefetchCogInfo``"""
+    if not endpoint_config.get("PrefetchCogInfo"):
+        for href in hrefs:
+            yield href, None
+        return
+    client = CogInfoClient(
+        endpoint_config["EndPoint"],
+        concurrency=endpoint_config.get("MaxConcurrency", DEFAULT_CONCURRENCY),
+        cache=HttpCache(),
+    )
+    count = 0
+    try:
+        for entry in client.iter_fetch(hrefs):
+            count += 1
+            yield entry
+    finally:
+        client.close()
+    logging.info(f"Prefetched the info of {count} COGs with {client.requests} requests")
@@ -1,5 +1,8 @@
-from pystac import Collection, Catalog
-from pystac_client import Client
+from pystac import Collection
+
+from custom_handlers.http_cache import HttpCache
+from custom_handlers.item_pages import request_pages
+from custom_handlers.stac_traversal import DEFAULT_CONCURRENCY, daily_catalog_items
 
 
 def execute(
@@ -11,17 +14,17 @@ def execute(
     if "template catalog" not in catalog_config["title"].lower():
         raise Exception("This demo handler should be run only on Template Catalog.")
     stac_endpoint_url = endpoint_config["STAC_Url"]
-    api = Client.open(stac_endpoint_url)
-
-    # catalog structure is {year}/{year-month}/{year-month-day}/items
-    for date_entry in endpoint_config["Subset_Dates"]:
-        year, month, day = date_entry.split("-")
-        catalog: Catalog = (
-            api.get_child(year)
-            .get_child(f"{year}-{month}")  # type: ignore
-            .get_child(f"{year}-{month}-{day}")  # type: ignore
-        )
 
-        for item in catalog.get_items():
-            collection.add_item(item)
+    # catalog structure is {year}/{year-month}/{year-month-day}/items, the
+    # catalogs and items of all dates are fetched concurrently
+    items = daily_catalog_items(
+        stac_endpoint_url,
+        endpoint_config["Subset_Dates"],
+        concurrency=endpoint_config.get("MaxConcurrency", DEFAULT_CONCURRENCY),
+        # immutable remote catalogs are revalidated instead of downloaded again
+        cache=HttpCache() if endpoint_config.get("HttpCache") else None,
+    )
+    for item in items:
+        collection.add_item(item)
+    request_pages(collection, endpoint_config)
     return collection
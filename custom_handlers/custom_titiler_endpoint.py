@@ -1,6 +1,8 @@
 from pystac import Collection, Link
 import logging
 
+from custom_handlers.titiler_urls import TitilerUrlTemplate
+
 def handle_titiler_endpoint(
     collection: Collection,
     catalog_config: dict,
@@ -10,37 +12,23 @@ def handle_titiler_endpoint(
     """Custom TiTiler endpoint handler"""
     
     # Generate TiTiler URL template
-    titiler_base = endpoint_config["EndPoint"]
     cog_url_template = endpoint_config.get("COG_URL", "{cog_url}")
     
-    # Build the basic TiTiler URL
-    target_url = f"{titiler_base}/cog/tiles/{{z}}/{{x}}/{{y}}"
-    
-    # Add query parameters
-    params = []
-    params.append(f"url={cog_url_template}")
-    
-    if endpoint_config.get("Rescale"):
-        vmin, vmax = endpoint_config["Rescale"]
-        params.append(f"rescale={vmin},{vmax}")
-    
-    if endpoint_config.get("Colormap"):
-        params.append(f"colormap_name={endpoint_config['Colormap']}")
-    
     # Add other common TiTiler parameters
-    if endpoint_config.get("Assets"):
-        assets = ",".join(endpoint_config["Assets"])
-        params.append(f"assets={assets}")
-    
-    if endpoint_config.get("Expression"):
-        params.append(f"expression={endpoint_config['Expression']}")
-    
-    if endpoint_config.get("NoData") is not None:
-        params.append(f"nodata={endpoint_config['NoData']}")
+    extra_params = {
+        "colormap_name": endpoint_config.get("Colormap") or None,
+        "assets": ",".join(endpoint_config.get("Assets") or []) or None,
+        "expression": endpoint_config.get("Expression") or None,
+        "nodata": endpoint_config.get("NoData"),
+    }
     
-    # Combine URL with parameters
-    if params:
-        target_url += "?" + "&".join(params)
+    template = TitilerUrlTemplate(
+        endpoint_config["EndPoint"],
+        rescale=endpoint_config.get("Rescale"),
+        extra_params=extra_params,
+    )
+    # the cog url stays a placeholder which is filled in by the client
+    target_url = template.tile_url(cog_url_template, encode=False)
     
     # Add extra fields for EODash
     extra_fields = {
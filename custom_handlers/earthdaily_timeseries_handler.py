@@ -1,8 +1,20 @@
 import logging
-import urllib.parse
 from datetime import datetime
 
-from pystac import Asset, Collection, Item, Link
+from pystac import Collection
+
+from custom_handlers.cog_info import RASTER_EXTENSION, iter_cog_info
+from custom_handlers.item_records import AssetRecord, ItemRecord, LinkRecord, footprint, roles
+from custom_handlers.item_writer import item_sink
+from custom_handlers.titiler_urls import TitilerUrlTemplate, s3_href
+
+DATA = roles("data")
+METADATA = roles("metadata")
+OVERVIEW = roles("overview")
+THUMBNAIL = roles("thumbnail")
+WEB_MERCATOR = {"proj:epsg": 3857}
+XYZ_LINK_FIELDS = {"role": ["data"], "proj:epsg": 4326}
+RASTER = (RASTER_EXTENSION,)
 
 
 def process(
@@ -13,44 +25,30 @@ def process(
 ) -> Collection:
     """Custom handler for EarthDaily time series data with TiTiler endpoints"""
     
-    titiler_base = endpoint_config["EndPoint"]
     s3_bucket = endpoint_config["S3Bucket"]
-    bands = endpoint_config.get("Bands", [1, 2, 3])
-    rescale = endpoint_config.get("Rescale", [-50, 350])
-    reproject = endpoint_config.get("Reproject", "bilinear")
     bbox = endpoint_config.get("Bbox")
+    time_entries = endpoint_config.get("TimeEntries", [])
+    
+    # Encode the query parameters shared by every time entry only once
+    template = TitilerUrlTemplate.from_endpoint_config(
+        endpoint_config,
+        bands=[1, 2, 3],
+        rescale=[-50, 350],
+        reproject="bilinear",
+    )
+    # Every item shares the geometry and bbox of the resource
+    shape = footprint(bbox) if bbox else None
+    items = item_sink(collection, endpoint_config)
+    s3_urls = (s3_href(s3_bucket, time_entry["S3Key"]) for time_entry in time_entries)
+    # Real bbox, bands, dtype and nodata of every COG with PrefetchCogInfo,
+    # fetched a few entries ahead instead of for the whole series at once
+    infos = iter_cog_info(endpoint_config, s3_urls)
     
     # Process each time entry
-    for time_entry in endpoint_config.get("TimeEntries", []):
+    for time_entry, (s3_url, info) in zip(time_entries, infos):
         time_str = time_entry["Time"]
-        s3_key = time_entry["S3Key"]
-        
-        # Create S3 URL
-        s3_url = f"s3://{s3_bucket}/{s3_key}"
-        
-        # Create TiTiler URL with URL encoding like titiler_handler.py
-        titiler_url = f"{titiler_base}/cog/tiles/{{z}}/{{x}}/{{y}}.png"
-        encoded_s3_url = urllib.parse.quote(s3_url, safe='')
-        
-        # Build query parameters in same order as titiler_handler.py
-        params = [
-            f"url={encoded_s3_url}"
-        ]
-        
-        # Add band indices first
-        for band in bands:
-            params.append(f"bidx={band}")
-        
-        # Add rescale parameters (one per band)
-        rescale_str = f"{rescale[0]}%2C{rescale[1]}"
-        for _ in bands:
-            params.append(f"rescale={rescale_str}")
-        
-        # Add reproject
-        if reproject:
-            params.append(f"reproject={reproject}")
-        
-        full_url = f"{titiler_url}?{'&'.join(params)}"
+        urls = template.urls(s3_url)
+        full_url = urls.tile
         
         # Parse datetime
         dt = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
@@ -58,96 +56,32 @@ def process(
         # Create STAC Item for this time entry
         item_id = f"{collection_config['Name']}_{dt.strftime('%Y%m%d_%H%M%S')}"
         
-        item = Item(
+        item = ItemRecord(
             id=item_id,
-            geometry={
-                "type": "Polygon",
-                "coordinates": [[
-                    [bbox[0], bbox[1]],
-                    [bbox[2], bbox[1]],
-                    [bbox[2], bbox[3]],
-                    [bbox[0], bbox[3]],
-                    [bbox[0], bbox[1]]
-                ]]
-            },
-            bbox=bbox,
             datetime=dt,
-            properties={}
-        )
-        
-        # Add RGB composite asset
-        item.add_asset(
-            "rgb_composite",
-            Asset(
-                href=s3_url,
-                media_type="image/tiff",
-                title="RGB Composite",
-                roles=["data"]
-            )
-        )
-        
-        # Add additional assets like titiler_handler.py
-        # Create other URLs
-        info_url = f"{titiler_base}/cog/info?{'&'.join(params[1:])}&url={encoded_s3_url}"
-        preview_url = f"{titiler_base}/cog/preview?{'&'.join(params[1:])}&url={encoded_s3_url}"
-        thumbnail_url = f"{titiler_base}/cog/preview.png?{'&'.join(params[1:])}&url={encoded_s3_url}&max_size=512"
-        
-        item.add_asset(
-            "data",
-            Asset(
-                href=full_url,
-                media_type="image/png",
-                roles=["data"],
-                extra_fields={
-                    "proj:epsg": 3857
-                }
-            )
-        )
-        
-        item.add_asset(
-            "info",
-            Asset(
-                href=info_url,
-                media_type="application/json",
-                roles=["metadata"]
-            )
-        )
-        
-        item.add_asset(
-            "preview",
-            Asset(
-                href=preview_url,
-                media_type="image/png",
-                roles=["overview"]
-            )
-        )
-        
-        item.add_asset(
-            "thumbnail",
-            Asset(
-                href=thumbnail_url,
-                media_type="image/png",
-                roles=["thumbnail"]
-            )
-        )
-        
-        # Add TiTiler XYZ link
-        item.add_link(
-            Link(
-                rel="xyz",
-                target=full_url,
-                media_type="image/png",
-                title="TiTiler RGB tiles",
-                extra_fields={
-                    "role": ["data"],
-                    "proj:epsg": 4326
-                }
-            )
+            footprint=footprint(info.bbox) if info else shape,
+            assets=(
+                # RGB composite plus the assets of titiler_handler.py
+                AssetRecord("rgb_composite", s3_url, "image/tiff", "RGB Composite", DATA,
+                            extra_fields=info.raster_fields if info else None),
+                AssetRecord("data", full_url, "image/png", roles=DATA,
+                            extra_fields=WEB_MERCATOR),
+                AssetRecord("info", urls.info, "application/json", roles=METADATA),
+                AssetRecord("preview", urls.preview, "image/png", roles=OVERVIEW),
+                AssetRecord("thumbnail", urls.thumbnail, "image/png", roles=THUMBNAIL),
+            ),
+            # TiTiler XYZ link
+            links=(
+                LinkRecord("xyz", full_url, "image/png", "TiTiler RGB tiles", XYZ_LINK_FIELDS),
+            ),
+            extensions=RASTER if info else (),
         )
         
         # Add item to collection
-        collection.add_item(item)
+        items.add(item)
         
         logging.info(f"Added time series item: {item_id} with TiTiler URL: {full_url}")
     
+    items.close()
+    
     return collection
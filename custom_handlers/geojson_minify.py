@@ -0,0 +1,192 @@
+"""
+Streaming GeoJSON minifier used for overlay files.
+
+Features are decoded one at a time from the ``features`` array so memory
+stays bounded by the size of a single feature, coordinates are rounded to a
+fixed precision and only whitelisted properties are kept. The output is
+written as compact JSON.
+
+    python -m custom_handlers.geojson_minify source.geojson destination.geojson \
+        --precision 6 --properties type,confidence
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+from typing import Iterator
+
+DEFAULT_PRECISION = 6
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _StreamReader:
+    """Minimal incremental JSON tokenizer over a text file"""
+
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        # drop everything already consumed so the buffer does not grow
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.position = _WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ""
+
+    def expect(self, character: str) -> None:
+        found = self.peek()
+        if found != character:
+            raise ValueError(f"Expected '{character}' in GeoJSON but found '{found}'")
+        self.position += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number at the end of the buffer might continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_features(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Yield the features of a FeatureCollection without loading the whole file"""
+    with open(path, encoding="utf-8") as file:
+        reader = _StreamReader(file, chunk_size)
+        reader.expect("{")
+        while reader.peek() != "}":
+            key = reader.decode()
+            reader.expect(":")
+            if key != "features":
+                # other members (type, crs, name, ...) are small, skip them
+                reader.decode()
+            else:
+                reader.expect("[")
+                while reader.peek() != "]":
+                    yield reader.decode()
+                    if reader.peek() == ",":
+                        reader.position += 1
+                reader.position += 1
+            if reader.peek() == ",":
+                reader.position += 1
+
+
+def round_coordinates(coordinates, precision: int):
+    if isinstance(coordinates, float):
+        return round(coordinates, precision)
+    if isinstance(coordinates, list):
+        return [round_coordinates(value, precision) for value in coordinates]
+    return coordinates
+
+
+def _minify_geometry(geometry: dict | None, precision: int) -> dict | None:
+    if not geometry:
+        return geometry
+    if geometry.get("type") == "GeometryCollection":
+        return {
+            "type": "GeometryCollection",
+            "geometries": [
+                _minify_geometry(child, precision) for child in geometry.get("geometries", [])
+            ],
+        }
+    return {
+        "type": geometry["type"],
+        "coordinates": round_coordinates(geometry.get("coordinates"), precision),
+    }
+
+
+def minify_feature(feature: dict, precision: int = DEFAULT_PRECISION,
+                   properties: list | None = None) -> dict:
+    """Round the geometry of a feature and reduce its properties to a whitelist"""
+    feature_properties = feature.get("properties") or {}
+    if properties is not None:
+        feature_properties = {
+            key: feature_properties[key] for key in properties if key in feature_properties
+        }
+    minified = {"type": "Feature"}
+    if "id" in feature:
+        minified["id"] = feature["id"]
+    if feature.get("bbox"):
+        minified["bbox"] = round_coordinates(feature["bbox"], precision)
+    minified["properties"] = feature_properties
+    minified["geometry"] = _minify_geometry(feature.get("geometry"), precision)
+    return minified
+
+
+def minify_geojson(
+    source: str,
+    destination: str,
+    precision: int = DEFAULT_PRECISION,
+    properties: list | None = None,
+) -> dict:
+    """Write a compact copy of ``source`` to ``destination`` and return a size report"""
+    if os.path.abspath(source) == os.path.abspath(destination):
+        raise ValueError("GeoJSON can not be minified in place, use a different destination")
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    feature_count = 0
+    with open(destination, "w", encoding="utf-8") as output:
+        output.write('{"type":"FeatureCollection","features":[')
+        for feature in iter_features(source):
+            if feature_count:
+                output.write(",")
+            json.dump(minify_feature(feature, precision, properties), output,
+                      separators=(",", ":"), ensure_ascii=False)
+            feature_count += 1
+        output.write("]}")
+
+    source_bytes = os.path.getsize(source)
+    output_bytes = os.path.getsize(destination)
+    report = {
+        "source": str(source),
+        "destination": str(destination),
+        "features": feature_count,
+        "source_bytes": source_bytes,
+        "output_bytes": output_bytes,
+        "reduction": round(1 - output_bytes / source_bytes, 4) if source_bytes else 0,
+    }
+    logging.info(
+        f"Minified {source}: {source_bytes} -> {output_bytes} bytes "
+        f"({report['reduction']:.1%} smaller, {feature_count} features)"
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify GeoJSON overlay files")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="number of decimals kept for coordinates")
+    parser.add_argument("--properties", default=None,
+                        help="comma separated list of properties to keep, default keeps all")
+    args = parser.parse_args()
+    properties = args.properties.split(",") if args.properties is not None else None
+    report = minify_geojson(args.source, args.destination, args.precision, properties)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
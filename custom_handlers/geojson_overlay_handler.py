@@ -1,12 +1,34 @@
 import os
-import shutil
 import json
 from pathlib import Path
 
+from pystac import Link
+
+from custom_handlers.catalog_output import catalog_dir
+from custom_handlers.geojson_minify import DEFAULT_PRECISION, minify_geojson
+from custom_handlers import vector_tiles
+from custom_handlers.geojson_partition import INDEX_NAME, partition_geojson
+
 def process(collection, catalog_config, endpoint_config, collection_config):
     """
     Custom handler to copy GeoJSON files to the build directory
     and make them available as overlay layers.
+    
+    The copy is minified on the way: coordinates are rounded to
+    ``geojson_precision`` decimals and, if ``geojson_properties`` is set,
+    only those feature properties are kept.
+    
+    With ``pmtiles: true`` the features are additionally tiled into a
+    PMTiles archive of vector tiles (``pmtiles_minzoom`` to
+    ``pmtiles_maxzoom``) which is then used for the overlay instead of
+    the full GeoJSON file.
+    
+    With ``partition_grid: [columns, rows]`` the features are also split
+    into chunk files over a grid spanning the resource ``Bbox``, together
+    with an index of the chunk bboxes referenced from the overlay.
+
+    The overlay urls and the pmtiles link are written relative to the
+    saved collection.json.
     """
     
     # Get the source GeoJSON file path from collection config
@@ -14,31 +36,35 @@ def process(collection, catalog_config, endpoint_config, collection_config):
     if not geojson_source:
         return collection
     
-    # Get the build directory from the catalog config
-    build_dir = catalog_config.get('build_dir', 'build')
-    catalog_id = catalog_config.get('id', 'catalog')
-    
-    # Create the data directory in build folder
-    data_dir = Path(build_dir) / catalog_id / 'data'
+    # Create the data directory in the output folder of the catalog
+    data_dir = Path(catalog_dir(catalog_config)) / 'data'
     data_dir.mkdir(parents=True, exist_ok=True)
     
     # Get the filename from the source path
     source_file = Path(geojson_source)
     destination_file = data_dir / source_file.name
     
-    # Copy the GeoJSON file to build directory
+    # Write a minified copy of the GeoJSON file to build directory
     if source_file.exists():
-        shutil.copy2(source_file, destination_file)
-        print(f"Copied {source_file} to {destination_file}")
+        report = minify_geojson(
+            source_file,
+            destination_file,
+            precision=collection_config.get('geojson_precision', DEFAULT_PRECISION),
+            properties=collection_config.get('geojson_properties'),
+        )
+        print(
+            f"Copied {source_file} to {destination_file} "
+            f"({report['source_bytes']} -> {report['output_bytes']} bytes)"
+        )
         
         # Add the overlay information to the collection
-        if 'overlays' not in collection:
-            collection['overlays'] = []
+        if 'overlays' not in collection.extra_fields:
+            collection.extra_fields['overlays'] = []
         
         overlay_info = {
             'id': f"{collection_config.get('Name', 'overlay')}_geojson",
             'name': collection_config.get('overlay_name', f"{collection_config.get('Name', 'Data')} Overlay"),
-            'url': f'data/{source_file.name}',
+            'url': str(destination_file),
             'protocol': 'geojson',
             'visible': collection_config.get('overlay_visible', False),
             'style': collection_config.get('overlay_style', {
@@ -50,7 +76,53 @@ def process(collection, catalog_config, endpoint_config, collection_config):
             })
         }
         
-        collection['overlays'].append(overlay_info)
+        if collection_config.get('pmtiles'):
+            pmtiles_file = destination_file.with_suffix('.pmtiles')
+            minzoom = collection_config.get('pmtiles_minzoom', vector_tiles.DEFAULT_MINZOOM)
+            maxzoom = collection_config.get('pmtiles_maxzoom', vector_tiles.DEFAULT_MAXZOOM)
+            vector_tiles.geojson_to_pmtiles(
+                destination_file,
+                pmtiles_file,
+                minzoom=minzoom,
+                maxzoom=maxzoom,
+                simplify=collection_config.get('pmtiles_simplify', vector_tiles.DEFAULT_SIMPLIFY),
+            )
+            print(f"Tiled {destination_file} into {pmtiles_file}")
+            
+            overlay_info['url'] = str(pmtiles_file)
+            overlay_info['protocol'] = 'pmtiles'
+            overlay_info['minZoom'] = minzoom
+            overlay_info['maxZoom'] = maxzoom
+            collection.add_link(
+                Link(
+                    rel="pmtiles",
+                    target=str(pmtiles_file),
+                    media_type="application/vnd.pmtiles",
+                    title=overlay_info['name'],
+                    extra_fields={
+                        "role": ["data"],
+                        "minzoom": minzoom,
+                        "maxzoom": maxzoom
+                    }
+                )
+            )
+        
+        if collection_config.get('partition_grid'):
+            columns, rows = collection_config['partition_grid']
+            chunks_dir = data_dir / source_file.stem
+            partition_geojson(
+                source_file,
+                chunks_dir,
+                endpoint_config.get('Bbox', [-180, -90, 180, 90]),
+                columns,
+                rows,
+                precision=collection_config.get('geojson_precision', DEFAULT_PRECISION),
+                properties=collection_config.get('geojson_properties'),
+            )
+            print(f"Partitioned {source_file} into {chunks_dir}")
+            overlay_info['index'] = str(chunks_dir / INDEX_NAME)
+        
+        collection.extra_fields['overlays'].append(overlay_info)
     else:
         print(f"Warning: GeoJSON file {source_file} not found")
     
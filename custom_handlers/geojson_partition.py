@@ -0,0 +1,267 @@
+"""
+Partition a GeoJSON FeatureCollection into a fixed spatial grid of chunk
+files plus a small JSON index of the chunk bboxes, or into one file per
+acquisition date.
+
+Every feature is written to the cell containing the center of its bbox, so
+each feature lives in exactly one chunk and the chunk bbox is the union of
+its feature bboxes; features without geometry are skipped with a warning.
+Clients load the index first and then only the chunks intersecting the
+current view.
+
+    python -m custom_handlers.geojson_partition source.geojson destination_dir \
+        --grid 4 4 --bbox -114.8 32.4 -114.4 32.8
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from custom_handlers.geojson_minify import DEFAULT_PRECISION, iter_features, minify_feature
+
+BATCH_SIZE = 10000
+INDEX_NAME = "index.json"
+MAX_OPEN_FILES = 64
+
+
+def _iter_positions(coordinates):
+    if not coordinates:
+        return
+    if isinstance(coordinates[0], (int, float)):
+        yield coordinates[0], coordinates[1]
+        return
+    for part in coordinates:
+        yield from _iter_positions(part)
+
+
+def _geometry_positions(geometry: dict | None):
+    if not geometry:
+        return
+    if geometry.get("type") == "GeometryCollection":
+        for child in geometry.get("geometries", []):
+            yield from _geometry_positions(child)
+    else:
+        yield from _iter_positions(geometry.get("coordinates"))
+
+
+def feature_bboxes(features: list) -> np.ndarray:
+    """Bbox of every feature as an (n, 4) array, NaN for features without geometry"""
+    counts = np.zeros(len(features), dtype=np.int64)
+    positions = []
+    for index, feature in enumerate(features):
+        feature_positions = list(_geometry_positions(feature.get("geometry")))
+        counts[index] = len(feature_positions)
+        positions.extend(feature_positions)
+    bboxes = np.full((len(features), 4), np.nan)
+    if not positions:
+        return bboxes
+    coordinates = np.asarray(positions, dtype=np.float64)
+    has_positions = counts > 0
+    starts = (np.cumsum(counts) - counts)[has_positions]
+    bboxes[has_positions, 0:2] = np.minimum.reduceat(coordinates, starts, axis=0)
+    bboxes[has_positions, 2:4] = np.maximum.reduceat(coordinates, starts, axis=0)
+    return bboxes
+
+
+def grid_cells(bboxes: np.ndarray, bbox: list, columns: int, rows: int) -> np.ndarray:
+    """Grid cell (row * columns + column) of each feature bbox center"""
+    center_x = (bboxes[:, 0] + bboxes[:, 2]) / 2
+    center_y = (bboxes[:, 1] + bboxes[:, 3]) / 2
+    width = (bbox[2] - bbox[0]) / columns or 1.0
+    height = (bbox[3] - bbox[1]) / rows or 1.0
+    column = np.clip(np.floor((center_x - bbox[0]) / width), 0, columns - 1)
+    # rows are counted from the top so chunk names read like a map
+    row = np.clip(np.floor((bbox[3] - center_y) / height), 0, rows - 1)
+    return (row * columns + column).astype(np.int64)
+
+
+def _chunk_name(stem: str, cell: int, columns: int) -> str:
+    return f"{stem}_{cell // columns}_{cell % columns}.geojson"
+
+
+def _batches(features, size: int):
+    batch = []
+    for feature in features:
+        batch.append(feature)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _FeatureCollectionWriters:
+    """Append features to many FeatureCollection files with a bounded number of open files"""
+
+    def __init__(self, max_open: int = MAX_OPEN_FILES):
+        self.max_open = max_open
+        self.counts: dict[Path, int] = {}
+        self._open: OrderedDict = OrderedDict()
+
+    def write(self, path: Path, feature: dict) -> None:
+        output = self._open.pop(path, None)
+        if output is None:
+            if len(self._open) >= self.max_open:
+                _, oldest = self._open.popitem(last=False)
+                oldest.close()
+            output = open(path, "a" if path in self.counts else "w", encoding="utf-8")
+        self._open[path] = output
+        count = self.counts.get(path, 0)
+        output.write(',' if count else '{"type":"FeatureCollection","features":[')
+        json.dump(feature, output, separators=(",", ":"), ensure_ascii=False)
+        self.counts[path] = count + 1
+
+    def close(self) -> None:
+        for output in self._open.values():
+            output.close()
+        self._open.clear()
+        for path in self.counts:
+            with open(path, "a", encoding="utf-8") as output:
+                output.write("]}")
+
+
+def partition_geojson(
+    source: str,
+    destination_dir: str,
+    bbox: list,
+    columns: int = 4,
+    rows: int = 4,
+    precision: int | None = DEFAULT_PRECISION,
+    properties: list | None = None,
+) -> dict:
+    """Write the grid chunks and their index to ``destination_dir`` and return the index"""
+    destination = Path(destination_dir)
+    destination.mkdir(parents=True, exist_ok=True)
+    stem = Path(source).stem
+    writers = _FeatureCollectionWriters()
+    counts = np.zeros(columns * rows, dtype=np.int64)
+    extents = np.tile([np.inf, np.inf, -np.inf, -np.inf], (columns * rows, 1))
+    unlocated = 0
+    try:
+        for batch in _batches(iter_features(source), BATCH_SIZE):
+            bboxes = feature_bboxes(batch)
+            # features without geometry belong to no cell
+            valid = ~np.isnan(bboxes[:, 0])
+            unlocated += int((~valid).sum())
+            batch = [feature for feature, located in zip(batch, valid.tolist()) if located]
+            bboxes = bboxes[valid]
+            cells = grid_cells(bboxes, bbox, columns, rows)
+            np.add.at(counts, cells, 1)
+            np.minimum.at(extents[:, 0], cells, bboxes[:, 0])
+            np.minimum.at(extents[:, 1], cells, bboxes[:, 1])
+            np.maximum.at(extents[:, 2], cells, bboxes[:, 2])
+            np.maximum.at(extents[:, 3], cells, bboxes[:, 3])
+            for feature, cell in zip(batch, cells.tolist()):
+                if precision is not None:
+                    feature = minify_feature(feature, precision, properties)
+                writers.write(destination / _chunk_name(stem, cell, columns), feature)
+    finally:
+        writers.close()
+    if unlocated:
+        logging.warning(f"Skipped {unlocated} features of {source} without geometry")
+
+    chunks = []
+    for cell in np.flatnonzero(counts).tolist():
+        chunks.append({
+            "href": _chunk_name(stem, cell, columns),
+            "row": cell // columns,
+            "column": cell % columns,
+            "bbox": [round(value, 7) for value in extents[cell].tolist()],
+            "features": int(counts[cell]),
+        })
+    index = {
+        "source": Path(source).name,
+        "bbox": list(bbox),
+        "grid": [columns, rows],
+        "features": int(counts.sum()),
+        "chunks": chunks,
+    }
+    with open(destination / INDEX_NAME, "w", encoding="utf-8") as output:
+        json.dump(index, output, separators=(",", ":"))
+    logging.info(
+        f"Partitioned {source} into {len(chunks)} chunks of a {columns}x{rows} grid"
+    )
+    return index
+
+
+def feature_date(value) -> str | None:
+    """Acquisition day (YYYY-MM-DD) of a date property value"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # epoch timestamps, milliseconds if the value is too large for seconds
+        seconds = value / 1000 if abs(value) > 1e11 else value
+        return datetime.fromtimestamp(seconds, tz=timezone.utc).date().isoformat()
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        return None
+
+
+def partition_by_date(
+    source: str,
+    destination_dir: str,
+    date_property: str | None,
+    precision: int | None = DEFAULT_PRECISION,
+    properties: list | None = None,
+    default_day: str | None = None,
+) -> dict:
+    """Stream ``source`` once and write one FeatureCollection per day of ``date_property``.
+
+    Features without a valid ``date_property`` go to ``default_day`` when it
+    is given and are skipped otherwise. Returns a mapping of day to
+    ``{"file": path, "features": count}`` sorted by day.
+    """
+    destination = Path(destination_dir)
+    destination.mkdir(parents=True, exist_ok=True)
+    writers = _FeatureCollectionWriters()
+    days: dict[str, Path] = {}
+    undated = 0
+    try:
+        for feature in iter_features(source):
+            day = feature_date((feature.get("properties") or {}).get(date_property)) \
+                if date_property else None
+            day = day or default_day
+            if day is None:
+                undated += 1
+                continue
+            path = days.setdefault(day, destination / f"{day}.geojson")
+            if precision is not None:
+                feature = minify_feature(feature, precision, properties)
+            writers.write(path, feature)
+    finally:
+        writers.close()
+    if undated:
+        logging.warning(f"Skipped {undated} features of {source} without a valid {date_property}")
+    logging.info(f"Partitioned {source} into {len(days)} daily files")
+    return {
+        day: {"file": days[day], "features": writers.counts[days[day]]}
+        for day in sorted(days)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition GeoJSON into a spatial grid")
+    parser.add_argument("source")
+    parser.add_argument("destination_dir")
+    parser.add_argument("--grid", type=int, nargs=2, default=[4, 4],
+                        metavar=("COLUMNS", "ROWS"))
+    parser.add_argument("--bbox", type=float, nargs=4, required=True,
+                        metavar=("MINX", "MINY", "MAXX", "MAXY"))
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION)
+    args = parser.parse_args()
+    index = partition_geojson(
+        args.source, args.destination_dir, args.bbox, args.grid[0], args.grid[1],
+        args.precision,
+    )
+    print(json.dumps({key: index[key] for key in ("features", "grid")}))
+
+
+if __name__ == "__main__":
+    main()
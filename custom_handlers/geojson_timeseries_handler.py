@@ -0,0 +1,124 @@
+import logging
+from pathlib import Path
+
+from eodash_catalog.stac_handling import add_collection_information
+from pystac import Asset, Collection, Item, Link
+
+from custom_handlers.catalog_output import catalog_dir
+from custom_handlers.geojson_minify import DEFAULT_PRECISION
+from custom_handlers.geojson_partition import partition_by_date
+from custom_handlers.time_entries import parse_time
+
+
+def process(
+    collection: Collection,
+    catalog_config: dict,
+    endpoint_config: dict,
+    collection_config: dict
+) -> Collection:
+    """Handler that splits a multi-date GeoJSON into one file and item per acquisition day.
+
+    Features without ``DateProperty`` belong to the day of ``DefaultTime``,
+    so single-date detection files can use the handler with ``DefaultTime``
+    only.
+    """
+
+    source = endpoint_config.get("GeoJSONSource")
+    date_property = endpoint_config.get("DateProperty")
+    default_time = endpoint_config.get("DefaultTime")
+    if not source or not (date_property or default_time):
+        logging.warning(
+            "GeoJSONSource and DateProperty or DefaultTime are required in endpoint_config"
+        )
+        return collection
+
+    bbox = endpoint_config.get("Bbox", [-180, -85, 180, 85])
+    identifier = endpoint_config.get("AssetIdentifier", "data")
+    source_file = Path(source)
+
+    # Stream the source once, writing one FeatureCollection per day
+    data_dir = Path(catalog_dir(catalog_config)) / "data" / source_file.stem
+    days = partition_by_date(
+        source_file,
+        data_dir,
+        date_property,
+        precision=endpoint_config.get("Precision", DEFAULT_PRECISION),
+        properties=endpoint_config.get("Properties"),
+        default_day=parse_time(str(default_time)).date().isoformat() if default_time else None,
+    )
+
+    # Generate the TimeEntries pointing at the daily files, the saved
+    # documents get the paths below the catalog folder relative to themselves
+    data_endpoint = endpoint_config.get("DataEndpoint")
+    base_href = f"{data_endpoint.rstrip('/')}/data/{source_file.stem}" if data_endpoint else (
+        str(data_dir)
+    )
+    time_entries = [
+        {
+            "Time": day,
+            "Assets": [
+                {"Identifier": identifier, "File": f"{base_href}/{info['file'].name}"}
+            ],
+        }
+        for day, info in days.items()
+    ]
+    endpoint_config["TimeEntries"] = time_entries
+
+    style_link = None
+    if endpoint_config.get("Style"):
+        style = endpoint_config["Style"]
+        assets_endpoint = catalog_config.get("assets_endpoint")
+        if not style.startswith(("http", "data:")) and assets_endpoint:
+            style = f"{assets_endpoint.rstrip('/')}/{style}"
+        style_link = Link(
+            rel="style",
+            target=style,
+            media_type="text/vector-styles",
+            extra_fields={
+                "asset:keys": [identifier]
+            }
+        )
+
+    # Create one item per day, like the standard GeoJSON source processing
+    for time_entry in time_entries:
+        dt = parse_time(time_entry["Time"])
+        time_str = dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        item = Item(
+            id=time_str,
+            geometry={
+                "type": "Polygon",
+                "coordinates": [[[bbox[0], bbox[1]], [bbox[2], bbox[1]],
+                               [bbox[2], bbox[3]], [bbox[0], bbox[3]], [bbox[0], bbox[1]]]]
+            },
+            bbox=bbox,
+            datetime=dt,
+            properties={}
+        )
+        for asset_config in time_entry["Assets"]:
+            item.add_asset(
+                asset_config["Identifier"],
+                Asset(
+                    href=asset_config["File"],
+                    title=asset_config["Identifier"],
+                    media_type="application/geo+json",
+                    roles=["data"]
+                )
+            )
+        if style_link:
+            # Link.clone drops the extra fields (asset:keys)
+            item.add_link(Link.from_dict(style_link.to_dict()))
+        link = collection.add_item(item)
+        # the item link carries the datetime and data assets, like the standard GeoJSON source
+        link.extra_fields["datetime"] = time_str
+        link.extra_fields["assets"] = [asset.href for asset in item.assets.values()]
+        link.extra_fields["id"] = item.id
+        logging.info(f"Added daily GeoJSON item for {time_entry['Time']}")
+
+    if time_entries:
+        # extents of every item, including the ones of the other resources
+        collection.update_extent_from_items()
+        if style_link:
+            collection.add_link(style_link)
+
+    add_collection_information(catalog_config, collection, collection_config)
+    return collection
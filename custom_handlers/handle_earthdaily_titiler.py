@@ -2,6 +2,8 @@ from pystac import Collection, Item, Asset, Link
 from datetime import datetime
 import logging
 
+from custom_handlers.titiler_urls import TitilerUrlTemplate
+
 def execute(
     collection: Collection,
     catalog_config: dict,
@@ -22,6 +24,13 @@ def execute(
         }
     ]
     
+    template = TitilerUrlTemplate(
+        endpoint_config["EndPoint"],
+        bands=[1, 2, 3],
+        rescale=[-50, 350],
+        reproject="bilinear",
+    )
+    
     # Create items for each time entry
     for entry in time_entries:
         dt = datetime.fromisoformat(entry["datetime"].replace('Z', '+00:00'))
@@ -59,7 +68,7 @@ def execute(
         )
         
         # Add TiTiler link to the item
-        titiler_url = f"{endpoint_config['EndPoint']}/cog/tiles/{{z}}/{{x}}/{{y}}.png?url={entry['file']}&bidx=1&bidx=2&bidx=3&rescale=-50%2C350&rescale=-50%2C350&rescale=-50%2C350&reproject=bilinear"
+        titiler_url = template.tile_url(entry["file"])
         
         item.add_link(Link(
             rel="xyz",
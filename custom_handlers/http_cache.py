@@ -0,0 +1,230 @@
+"""
+Persistent on-disk cache for HTTP responses of remote catalogs and services.
+
+Handlers opt in by mounting a ``CachingAdapter`` on their requests session
+(see ``cached_session``). Cached GET responses carrying an ``ETag`` or
+``Last-Modified`` header are revalidated with conditional requests, a
+``304 Not Modified`` answer is served from disk so unchanged documents are
+not transferred again. HEAD responses are kept the same way, without a
+body, under a key of their own. The cache is capped in size and evicts the least
+recently used responses first.
+
+Hit and miss counters are shared by the caches of a process and written
+next to the cache directory once, at exit, then collected into the build
+report by ``build_tools.build``.
+
+The cache directory defaults to ``.cache/http`` and can be changed with the
+``EODASH_HTTP_CACHE`` environment variable, the size cap (in bytes) with
+``EODASH_HTTP_CACHE_MAX_BYTES``.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR_ENV = "EODASH_HTTP_CACHE"
+MAX_BYTES_ENV = "EODASH_HTTP_CACHE_MAX_BYTES"
+DEFAULT_CACHE_DIR = ".cache/http"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+STATS_DIR = "stats"
+COUNTERS = ("hits", "misses", "stored", "evicted", "bytes_from_cache", "bytes_downloaded")
+
+# counters of this process by cache directory, written by one exit hook
+_STATS: dict[Path, dict] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _process_stats(directory: Path) -> dict:
+    with _STATS_LOCK:
+        if not _STATS:
+            atexit.register(write_stats)
+        return _STATS.setdefault(directory.resolve(), dict.fromkeys(COUNTERS, 0))
+
+
+def write_stats() -> None:
+    """Write the counters of this process next to every cache it used"""
+    with _STATS_LOCK:
+        for directory, stats in _STATS.items():
+            if not any(stats.values()):
+                continue
+            stats_dir = directory / STATS_DIR
+            stats_dir.mkdir(parents=True, exist_ok=True)
+            path = stats_dir / f"{os.getpid()}-{time.time_ns()}.json"
+            with open(path, "w") as file:
+                json.dump(stats, file)
+            stats.update(dict.fromkeys(COUNTERS, 0))
+
+
+class HttpCache:
+    """Responses stored as ``<key>.body`` files with a ``<key>.meta`` JSON header file"""
+
+    def __init__(self, directory: str | None = None, max_bytes: int | None = None):
+        self.directory = Path(directory or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+        self.max_bytes = int(max_bytes or os.environ.get(MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.stats = _process_stats(self.directory)
+        self._lock = threading.Lock()
+        self._size = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = self.key(url)
+        return self.directory / f"{key}.meta", self.directory / f"{key}.body"
+
+    def count(self, counter: str, value: int = 1) -> None:
+        with _STATS_LOCK:
+            self.stats[counter] += value
+
+    def lookup(self, url: str) -> dict | None:
+        """Cached header of ``url``, marks the entry as recently used"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as file:
+                meta = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if meta.get("url") != url or not body_path.exists():
+            return None
+        os.utime(body_path)
+        return meta
+
+    def body(self, url: str) -> bytes:
+        return self._paths(url)[1].read_bytes()
+
+    def _write(self, path: Path, content: bytes) -> None:
+        # atomic so concurrent builds never read partial entries
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        os.replace(temporary, path)
+
+    def store(self, url: str, headers, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            # the body is stored decoded, so no Content-Encoding is replayed
+            "headers": {
+                name: headers[name]
+                for name in ("Content-Type", "ETag", "Last-Modified")
+                if name in headers
+            },
+        }
+        meta_path, body_path = self._paths(url)
+        self._write(body_path, content)
+        self._write(meta_path, json.dumps(meta).encode())
+        self.count("stored")
+        with self._lock:
+            if self._size is not None:
+                self._size += len(content)
+            full = self._size is None or self._size > self.max_bytes
+        if full:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used responses until the cache fits its cap"""
+        with self._lock:
+            bodies = []
+            for path in self.directory.glob("*.body"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                bodies.append((stat.st_mtime, stat.st_size, path))
+            size = sum(entry[1] for entry in bodies)
+            bodies.sort()
+            evicted = 0
+            while size > self.max_bytes and bodies:
+                _, body_size, path = bodies.pop(0)
+                path.with_suffix(".meta").unlink(missing_ok=True)
+                path.unlink(missing_ok=True)
+                size -= body_size
+                evicted += 1
+            self._size = size
+        self.count("evicted", evicted)
+
+
+def collect_stats(directory: str | None = None) -> dict:
+    """Sum and remove the counters written by the processes using the cache"""
+    stats_dir = Path(directory or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)) / STATS_DIR
+    totals = dict.fromkeys(COUNTERS, 0)
+    for path in sorted(stats_dir.glob("*.json")) if stats_dir.is_dir() else []:
+        try:
+            with open(path) as file:
+                stats = json.load(file)
+        except json.JSONDecodeError:
+            continue
+        finally:
+            path.unlink(missing_ok=True)
+        for counter in COUNTERS:
+            totals[counter] += stats.get(counter, 0)
+    return totals
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter revalidating GET requests against an ``HttpCache``"""
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if request.method not in ("GET", "HEAD") or "Range" in request.headers:
+            return super().send(request, **kwargs)
+        # the empty body of a HEAD response must not replace the GET body
+        url = request.url if request.method == "GET" else f"HEAD {request.url}"
+        meta = self.cache.lookup(url)
+        if meta:
+            if meta.get("etag"):
+                request.headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request.headers["If-Modified-Since"] = meta["last_modified"]
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and meta:
+            content = self.cache.body(url)
+            response.status_code = 200
+            response.reason = "OK"
+            response.headers = CaseInsensitiveDict(meta["headers"])
+            response._content = content
+            response._content_consumed = True
+            self.cache.count("hits")
+            self.cache.count("bytes_from_cache", len(content))
+            return response
+        if kwargs.get("stream"):
+            return response
+        self.cache.count("misses")
+        self.cache.count("bytes_downloaded", len(response.content))
+        if response.status_code == 200 and (
+            response.headers.get("ETag") or response.headers.get("Last-Modified")
+        ):
+            try:
+                self.cache.store(url, response.headers, response.content)
+            except OSError as error:
+                logging.warning(f"Could not cache {url}: {error}")
+        return response
+
+
+def cached_session(cache: HttpCache | None = None, pool_size: int = 10) -> requests.Session:
+    """Session whose HTTP(S) GET and HEAD requests go through the persistent cache"""
+    adapter = CachingAdapter(
+        cache or HttpCache(), pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,8 +1,9 @@
 import logging
-from datetime import datetime
 
 from pystac import Asset, Collection, Item, Link
 
+from custom_handlers.time_entries import TimeEntryIndex, log_unmatched
+
 
 def process(
     collection: Collection,
@@ -18,28 +19,13 @@ def process(
         logging.warning("No TimeEntries found in endpoint_config")
         return collection
     
-    # Process items that were already created by the standard YAML processor
-    for item in collection.get_items():
-        item_time = item.datetime
-        if not item_time:
-            continue
-            
-        # Find the matching time entry from YAML
-        matching_entry = None
-        for time_entry in time_entries:
-            time_str = time_entry.get("Time")
-            if time_str:
-                try:
-                    entry_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-                    if item_time == entry_time:
-                        matching_entry = time_entry
-                        break
-                except ValueError:
-                    continue
-        
-        if not matching_entry:
-            continue
-            
+    # Match the items that were already created by the standard YAML processor
+    # against the time entries, parsing every Time only once
+    index = TimeEntryIndex.from_endpoint_config(endpoint_config)
+    matches = index.match(collection.get_items())
+    log_unmatched(matches, index)
+    
+    for item, matching_entry in matches.matched:
         # Process Links from YAML and add them to the STAC item
         links = matching_entry.get("Links", [])
         for link_config in links:
@@ -60,5 +46,5 @@ def process(
                 )
                 logging.info(f"Added XYZ link to item {item.id}: {url}")
     
-    logging.info(f"Processed {len(list(collection.get_items()))} items with XYZ links")
+    logging.info(f"Processed {len(matches.matched)} items with XYZ links")
     return collection
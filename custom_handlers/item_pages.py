@@ -0,0 +1,112 @@
+"""
+Paginated item links of large collections.
+
+Resources with ``ItemPageSize: N`` get their item links split into pages of
+N links when the catalog is saved. Pages are ordered by item datetime,
+newest first, and written next to collection.json as ``items-0001.json``,
+``items-0002.json``... The collection keeps an ``items`` link to the newest
+page in place of its item links and a small temporal index of the pages,
+so a client only needs the first page to show the latest items and can
+jump to the page of a date.
+
+A page is a GeoJSON FeatureCollection without features, like the pages of
+a STAC API item search: its ``links`` hold ``root``, ``collection``,
+``parent``, ``first``, ``prev`` (newer) and ``next`` (older) links and the
+item links of the page.
+
+The item links are only final once the items are saved, so the pages are
+written by a save hook (see catalog_output) right before collection.json,
+after its items, which also removes the page size marker.
+"""
+
+import json
+import logging
+import os
+
+from pystac import Collection, StacIO
+
+from custom_handlers import catalog_output
+
+PAGE_FIELD = "eodash:item_page_size"
+INDEX_FIELD = "eodash:item_pages"
+PAGE_NAME = "items-{:04d}.json"
+PAGE_TYPE = "application/geo+json"
+# after the streamed items of the collection are written
+SAVE_ORDER = 1
+
+
+def request_pages(collection: Collection, endpoint_config: dict) -> None:
+    """Mark the collection for pagination when the resource sets ``ItemPageSize``"""
+    page_size = endpoint_config.get("ItemPageSize")
+    if page_size:
+        catalog_output.install()
+        collection.extra_fields[PAGE_FIELD] = int(page_size)
+
+
+def _item_time(collection_dir: str, link: dict) -> str:
+    path = os.path.join(collection_dir, link["href"])
+    if not os.path.isfile(path):
+        # eodash_catalog -ni saves no items
+        return link.get("datetime") or ""
+    with open(path, encoding="utf-8") as file:
+        properties = json.load(file).get("properties", {})
+    return properties.get("datetime") or properties.get("start_datetime") or ""
+
+
+def _page_link(rel: str, number: int, title: str | None = None) -> dict:
+    link = {"rel": rel, "href": f"./{PAGE_NAME.format(number)}", "type": PAGE_TYPE}
+    if title:
+        link["title"] = title
+    return link
+
+
+def _paginate_collection(stac_io: StacIO, collection_path: str, collection: dict,
+                         page_size: int) -> None:
+    """Move the item links of ``collection`` into pages written next to ``collection_path``"""
+    collection_dir = os.path.dirname(collection_path)
+    item_links = [link for link in collection["links"] if link["rel"] == "item"]
+    if not item_links:
+        return
+    # newest first, the first page is all a client needs for the latest items
+    timed = sorted(
+        ((_item_time(collection_dir, link), link) for link in item_links),
+        key=lambda entry: entry[0], reverse=True,
+    )
+    pages = [timed[start:start + page_size] for start in range(0, len(timed), page_size)]
+    # pages sit next to collection.json, relative hrefs stay valid
+    hierarchy = [link for link in collection["links"] if link["rel"] == "root"] + [
+        {"rel": "collection", "href": "./collection.json", "type": "application/json"},
+        {"rel": "parent", "href": "./collection.json", "type": "application/json"},
+    ]
+
+    index = []
+    for number, page in enumerate(pages, start=1):
+        links = hierarchy + [_page_link("first", 1)]
+        if number > 1:
+            links.append(_page_link("prev", number - 1))
+        if number < len(pages):
+            links.append(_page_link("next", number + 1))
+        document = {
+            "type": "FeatureCollection",
+            "id": f"{collection['id']}-items-{number:04d}",
+            "collection": collection["id"],
+            "features": [],
+            "links": links + [link for _, link in page],
+        }
+        stac_io.save_json(os.path.join(collection_dir, PAGE_NAME.format(number)), document)
+        index.append({"href": f"./{PAGE_NAME.format(number)}", "count": len(page),
+                      "interval": [page[-1][0], page[0][0]]})
+
+    # the link to the newest page takes the place of the item links
+    links = []
+    for link in collection["links"]:
+        if link["rel"] != "item":
+            links.append(link)
+        elif link is item_links[0]:
+            links.append(_page_link("items", 1, "Newest items"))
+    collection["links"] = links
+    collection[INDEX_FIELD] = index
+    logging.info(f"Wrote {len(pages)} item pages of {collection['id']}")
+
+
+catalog_output.on_save(PAGE_FIELD, _paginate_collection, SAVE_ORDER)
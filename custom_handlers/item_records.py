@@ -0,0 +1,178 @@
+"""
+Compact item records for handlers producing many items per resource.
+
+A ``pystac.Item`` carries its own geometry dict, properties dict, asset
+and link objects. Time series handlers create thousands of items that only
+differ by datetime and hrefs, so ``ItemRecord`` keeps just those in
+``__slots__`` and shares one interned footprint (the bbox) per resource and
+one tuple of roles per asset kind. Records serialize straight to STAC item
+JSON when the catalog is written (see item_writer), or to a ``pystac.Item``.
+The geometry, bbox and extra fields in that output are new objects, so
+changing one item never changes the records or the other items.
+"""
+
+from copy import deepcopy
+from datetime import datetime
+from functools import lru_cache
+
+import pystac
+from pystac import Asset, Item, Link
+from pystac.utils import datetime_to_str
+
+
+class Footprint:
+    """Bbox shared by every item of a resource"""
+
+    __slots__ = ("bbox",)
+
+    def __init__(self, bbox: tuple):
+        self.bbox = tuple(bbox)
+
+    @property
+    def geometry(self) -> dict:
+        """Polygon of the bbox, a new dict on every call"""
+        bbox = self.bbox
+        return {
+            "type": "Polygon",
+            "coordinates": [[
+                [bbox[0], bbox[1]],
+                [bbox[2], bbox[1]],
+                [bbox[2], bbox[3]],
+                [bbox[0], bbox[3]],
+                [bbox[0], bbox[1]],
+            ]],
+        }
+
+
+@lru_cache(maxsize=256)
+def _footprint(bbox: tuple) -> Footprint:
+    return Footprint(bbox)
+
+
+def footprint(bbox: list) -> Footprint:
+    """Interned footprint of ``bbox``, the same object for equal bboxes"""
+    return _footprint(tuple(bbox))
+
+
+@lru_cache(maxsize=64)
+def roles(*names: str) -> tuple:
+    """Interned tuple of asset roles"""
+    return names
+
+
+class AssetRecord:
+    __slots__ = ("key", "href", "media_type", "title", "roles", "extra_fields")
+
+    def __init__(self, key: str, href: str, media_type: str | None = None,
+                 title: str | None = None, roles: tuple = (), extra_fields: dict | None = None):
+        self.key = key
+        self.href = href
+        self.media_type = media_type
+        self.title = title
+        self.roles = roles
+        self.extra_fields = extra_fields
+
+    def to_dict(self) -> dict:
+        asset = {"href": self.href}
+        if self.media_type is not None:
+            asset["type"] = self.media_type
+        if self.title is not None:
+            asset["title"] = self.title
+        # same key order as pystac.Asset.to_dict
+        if self.extra_fields:
+            asset.update(deepcopy(self.extra_fields))
+        if self.roles:
+            asset["roles"] = list(self.roles)
+        return asset
+
+    def to_asset(self) -> Asset:
+        return Asset(
+            href=self.href,
+            title=self.title,
+            media_type=self.media_type,
+            roles=list(self.roles) if self.roles else None,
+            extra_fields=deepcopy(self.extra_fields) if self.extra_fields else None,
+        )
+
+
+class LinkRecord:
+    __slots__ = ("rel", "href", "media_type", "title", "extra_fields")
+
+    def __init__(self, rel: str, href: str, media_type: str | None = None,
+                 title: str | None = None, extra_fields: dict | None = None):
+        self.rel = rel
+        self.href = href
+        self.media_type = media_type
+        self.title = title
+        self.extra_fields = extra_fields
+
+    def to_dict(self) -> dict:
+        link = {"rel": self.rel, "href": self.href}
+        if self.media_type is not None:
+            link["type"] = self.media_type
+        if self.title is not None:
+            link["title"] = self.title
+        if self.extra_fields:
+            link.update(deepcopy(self.extra_fields))
+        return link
+
+    def to_link(self) -> Link:
+        return Link(
+            rel=self.rel,
+            target=self.href,
+            media_type=self.media_type,
+            title=self.title,
+            extra_fields=deepcopy(self.extra_fields) if self.extra_fields else None,
+        )
+
+
+class ItemRecord:
+    """Id, datetime, shared footprint, assets, links and extensions of one STAC item"""
+
+    __slots__ = ("id", "datetime", "footprint", "assets", "links", "extensions")
+
+    def __init__(self, id: str, datetime: datetime, footprint: Footprint,
+                 assets: tuple = (), links: tuple = (), extensions: tuple = ()):
+        self.id = id
+        self.datetime = datetime
+        self.footprint = footprint
+        self.assets = assets
+        self.links = links
+        self.extensions = extensions
+
+    @property
+    def bbox(self) -> tuple:
+        return self.footprint.bbox
+
+    def to_dict(self, links: list[dict] | None = None, collection_id: str | None = None) -> dict:
+        """STAC item JSON, ``links`` are prepended to the item's own links"""
+        item = {
+            "type": "Feature",
+            "stac_version": pystac.get_stac_version(),
+            "stac_extensions": list(self.extensions),
+            "id": self.id,
+            "geometry": self.footprint.geometry,
+            "bbox": list(self.footprint.bbox),
+            "properties": {"datetime": datetime_to_str(self.datetime)},
+            "links": (links or []) + [link.to_dict() for link in self.links],
+            "assets": {asset.key: asset.to_dict() for asset in self.assets},
+        }
+        if collection_id:
+            item["collection"] = collection_id
+        return item
+
+    def to_item(self) -> Item:
+        """``pystac.Item`` of the record"""
+        item = Item(
+            id=self.id,
+            geometry=self.footprint.geometry,
+            bbox=list(self.footprint.bbox),
+            datetime=self.datetime,
+            properties={},
+            stac_extensions=list(self.extensions),
+        )
+        for asset in self.assets:
+            item.add_asset(asset.key, asset.to_asset())
+        for link in self.links:
+            item.add_link(link.to_link())
+        return item
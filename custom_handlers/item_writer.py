@@ -0,0 +1,184 @@
+"""
+Item sinks for the time series handlers.
+
+By default items are added to the collection as ``pystac.Item`` objects and
+written when eodash_catalog saves the whole catalog.
+
+Resources with ``StreamItems: true`` use a ``StreamingItemWriter``: only
+the first item is added as a ``pystac.Item``, it anchors the item layout of
+the catalog save and keeps the collection from getting a placeholder item.
+Every item after the anchor is serialized to a temporary spool file as soon
+as it is produced, so memory stays flat however long the series is. The
+collection is marked with the spool and, while the catalog is saved, the
+spooled items are written next to the saved anchor item with its
+root/parent/collection links and their item links are added to the
+collection (a save hook, see catalog_output).
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from pystac import Collection, StacIO
+
+from custom_handlers import catalog_output
+from custom_handlers.item_pages import request_pages
+from custom_handlers.item_records import ItemRecord
+
+SPOOL_FIELD = "eodash:item_spool"
+HIERARCHY_RELS = ("root", "collection", "parent")
+
+# spool files of the process, removed when it exits
+_SPOOL_DIR = None
+_SPOOL_LOCK = threading.Lock()
+
+
+def _spool_dir() -> str:
+    global _SPOOL_DIR
+    with _SPOOL_LOCK:
+        if _SPOOL_DIR is None:
+            _SPOOL_DIR = tempfile.TemporaryDirectory(prefix="eodash-items-")
+        return _SPOOL_DIR.name
+
+
+class CollectionItemSink:
+    """Adds the records to the collection as regular pystac items"""
+
+    def __init__(self, collection: Collection):
+        self.collection = collection
+        self.count = 0
+        self.min_time = None
+        self.max_time = None
+        self.bbox = None
+
+    def _update_extents(self, record: ItemRecord) -> None:
+        if self.min_time is None or record.datetime < self.min_time:
+            self.min_time = record.datetime
+        if self.max_time is None or record.datetime > self.max_time:
+            self.max_time = record.datetime
+        bbox = record.bbox
+        if self.bbox is None:
+            self.bbox = list(bbox)
+        else:
+            self.bbox = [
+                min(self.bbox[0], bbox[0]), min(self.bbox[1], bbox[1]),
+                max(self.bbox[2], bbox[2]), max(self.bbox[3], bbox[3]),
+            ]
+
+    def add(self, record: ItemRecord, link_fields: dict | None = None) -> None:
+        self._update_extents(record)
+        link = self.collection.add_item(record.to_item())
+        if link_fields:
+            link.extra_fields.update(link_fields)
+        self.count += 1
+
+    def close(self) -> None:
+        """Set the collection extents to the ones of the added items"""
+        if self.min_time is not None:
+            self.collection.extent.temporal.intervals = [[self.min_time, self.max_time]]
+            self.collection.extent.spatial.bboxes = [self.bbox]
+
+
+class StreamingItemWriter(CollectionItemSink):
+    """Spools the records as STAC JSON while keeping only running extents"""
+
+    def __init__(self, collection: Collection):
+        super().__init__(collection)
+        catalog_output.install()
+        self.anchor_href = None
+        descriptor, self.spool_path = tempfile.mkstemp(
+            prefix=f"{collection.id}-", suffix=".jsonl", dir=_spool_dir()
+        )
+        self._spool = os.fdopen(descriptor, "w", encoding="utf-8")
+
+    def _item_link(self, record: ItemRecord, link_fields: dict | None) -> dict:
+        # same href as the TemplateLayoutStrategy of the catalog save
+        return {
+            "rel": "item",
+            "href": f"./{self.collection.id}/{record.datetime.year}/{record.id}.json",
+            "type": "application/geo+json",
+            **(link_fields or {}),
+        }
+
+    def add(self, record: ItemRecord, link_fields: dict | None = None) -> None:
+        if self.count == 0:
+            # the anchor item is laid out and saved by the regular catalog save
+            super().add(record, link_fields)
+            self.anchor_href = self._item_link(record, None)["href"]
+            return
+        self._update_extents(record)
+        link = self._item_link(record, link_fields)
+        item = record.to_dict(collection_id=self.collection.id)
+        self._spool.write(json.dumps({"link": link, "item": item}, separators=(",", ":")))
+        self._spool.write("\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._spool.close()
+        if self.count > 1:
+            self.collection.extra_fields[SPOOL_FIELD] = {
+                "path": self.spool_path, "anchor": self.anchor_href,
+            }
+        else:
+            os.remove(self.spool_path)
+        super().close()
+        logging.info(f"Streamed {self.count} items of {self.collection.id}")
+
+
+def item_sink(collection: Collection, endpoint_config: dict) -> CollectionItemSink:
+    request_pages(collection, endpoint_config)
+    if endpoint_config.get("StreamItems"):
+        return StreamingItemWriter(collection)
+    return CollectionItemSink(collection)
+
+
+def streamed_items(collection: Collection) -> int:
+    """Number of spooled items of ``collection``, written when the catalog is saved"""
+    spool = collection.extra_fields.get(SPOOL_FIELD)
+    if not spool:
+        return 0
+    with open(spool["path"], encoding="utf-8") as file:
+        return sum(1 for _ in file)
+
+
+def _write_streamed_items(stac_io: StacIO, collection_path: str, collection: dict,
+                          spool: dict) -> None:
+    """Write the spooled items next to the saved anchor item and link them after it"""
+    collection_dir = os.path.dirname(collection_path)
+    links = collection["links"]
+    anchor = next(
+        (index for index, link in enumerate(links)
+         if link["rel"] == "item" and link["href"] == spool["anchor"]),
+        None,
+    )
+    if anchor is None:
+        logging.warning(f"No anchor item link in {collection_path}, streamed items not written")
+        return
+    anchor_path = os.path.join(collection_dir, spool["anchor"])
+    # eodash_catalog -ni saves the collections without their items
+    hierarchy = None
+    if os.path.isfile(anchor_path):
+        with open(anchor_path, encoding="utf-8") as file:
+            hierarchy = [
+                link for link in json.load(file)["links"] if link["rel"] in HIERARCHY_RELS
+            ]
+
+    item_links = []
+    with open(spool["path"], encoding="utf-8") as file:
+        for line in file:
+            entry = json.loads(line)
+            if hierarchy is not None:
+                item = entry["item"]
+                item["links"] = item["links"] + hierarchy
+                stac_io.save_json(
+                    os.path.normpath(os.path.join(collection_dir, entry["link"]["href"])), item
+                )
+            item_links.append(entry["link"])
+    collection["links"] = links[:anchor + 1] + item_links + links[anchor + 1:]
+    if hierarchy is not None:
+        logging.info(f"Wrote {len(item_links)} streamed items of {collection['id']}")
+
+
+catalog_output.on_save(SPOOL_FIELD, _write_streamed_items)
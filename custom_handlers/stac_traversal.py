@@ -0,0 +1,159 @@
+"""
+Concurrent traversal of static STAC catalogs.
+
+Catalog and item JSON documents are fetched through one shared
+``requests.Session`` by a bounded thread pool. Every document is fetched at
+most once per reader, so catalogs shared by several paths (e.g. the year and
+month catalogs of a ``{year}/{year-month}/{year-month-day}`` structure) are
+only requested once.
+"""
+
+import logging
+import posixpath
+import threading
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from pystac import Item
+from requests.adapters import HTTPAdapter
+
+from custom_handlers.http_cache import CachingAdapter, HttpCache
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 60
+
+
+def _absolute(href: str, base: str) -> str:
+    return urllib.parse.urljoin(base, href)
+
+
+class StacReader:
+    """Memoizing, thread-pooled reader of static STAC catalogs over HTTP"""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session: requests.Session | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: HttpCache | None = None,
+    ):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        # keep one pooled connection per worker thread
+        if cache is not None:
+            adapter = CachingAdapter(cache, pool_connections=concurrency, pool_maxsize=concurrency)
+        else:
+            adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.requests = 0
+        self._documents: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def _get(self, href: str) -> dict:
+        response = self.session.get(href, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch(self, href: str) -> Future:
+        """Future of the JSON document at ``href``, requested only once"""
+        with self._lock:
+            future = self._documents.get(href)
+            if future is None:
+                self.requests += 1
+                future = self._documents[href] = self.executor.submit(self._get, href)
+        return future
+
+    def read(self, href: str) -> dict:
+        return self.fetch(href).result()
+
+    @staticmethod
+    def link_hrefs(document: dict, href: str, rel: str) -> list[str]:
+        return [
+            _absolute(link["href"], href)
+            for link in document.get("links", [])
+            if link.get("rel") == rel
+        ]
+
+    def child(self, href: str, child_id: str) -> str | None:
+        """Href of the child catalog ``child_id`` of the catalog at ``href``"""
+        children = self.link_hrefs(self.read(href), href, "child")
+        # static catalogs usually name the child directory after its id, try
+        # those links first before resolving every child
+        likely = [
+            child for child in children
+            if child_id in posixpath.basename(posixpath.dirname(child))
+            or posixpath.basename(child).startswith(child_id)
+        ]
+        for candidates in (likely, children):
+            futures = [(child, self.fetch(child)) for child in candidates]
+            for child, future in futures:
+                if future.result().get("id") == child_id:
+                    return child
+        return None
+
+    def find(self, href: str, path: list[str]) -> str | None:
+        """Href of the catalog reached by following the child ids in ``path``"""
+        for child_id in path:
+            href = self.child(href, child_id)
+            if href is None:
+                return None
+        return href
+
+    def items(self, hrefs: list[str]) -> list[Item]:
+        """Items at ``hrefs`` in the given order, fetched concurrently"""
+        futures = [(href, self.fetch(href)) for href in hrefs]
+        return [
+            Item.from_dict(future.result(), href=href, migrate=True, preserve_dict=False)
+            for href, future in futures
+        ]
+
+    def catalog_items(self, href: str) -> list[Item]:
+        return self.items(self.link_hrefs(self.read(href), href, "item"))
+
+
+def daily_catalog_items(
+    root_href: str,
+    dates: list[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: HttpCache | None = None,
+) -> list[Item]:
+    """Items of the ``{year}/{year-month}/{year-month-day}`` catalogs of ``dates``"""
+    paths = []
+    for date_entry in dates:
+        year, month, day = date_entry.split("-")
+        paths.append([year, f"{year}-{month}", f"{year}-{month}-{day}"])
+    with StacReader(concurrency, cache=cache) as reader:
+        # resolve the days concurrently, the year and month catalogs they
+        # share are fetched only once; the fetches themselves run in the
+        # reader pool so the resolvers never wait on their own threads
+        with ThreadPoolExecutor(max_workers=concurrency) as resolvers:
+            catalog_hrefs = list(
+                resolvers.map(lambda path: reader.find(root_href, path), paths)
+            )
+        item_hrefs = []
+        for date_entry, catalog_href in zip(dates, catalog_hrefs):
+            if catalog_href is None:
+                logging.warning(f"No catalog found for {date_entry} in {root_href}")
+                continue
+            item_hrefs.extend(
+                reader.link_hrefs(reader.read(catalog_href), catalog_href, "item")
+            )
+        items = reader.items(item_hrefs)
+        logging.info(
+            f"Read {len(items)} items of {len(dates)} days with {reader.requests} requests"
+        )
+        return items
@@ -0,0 +1,277 @@
+"""
+Compact encoding of the time dimension of a collection.
+
+Resources with ``CompactTimeDimension: true`` write one templated link in
+place of the collection-level links repeated for every time entry, and the
+dates once in place of the ``ts:dates`` and ``time_series`` lists:
+    - the parts of a link equal to the date of its entry become ``{time}``,
+      the parts equal to its day (``YYYY-MM-DD``) become ``{date}``
+    - a href differing in another way becomes ``prefix{key}suffix``, the
+      varying parts are listed in ``time_dimension.values`` of the link
+    - regular date series are written as runs ``{"start", "step", "count"}``
+      with an ISO 8601 duration step, irregular dates stay as they are
+
+``expand_time_dimension`` restores the collection the handler would have
+written without the option.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta
+
+from pystac import Collection, Link
+
+FIELD = "time_dimension"
+TIME = "{time}"
+DATE = "{date}"
+KEY = "{key}"
+MIN_RUN = 3
+# formats a date is written back with, the first one giving the same string wins
+TIME_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S+00:00",
+    "%Y-%m-%d",
+)
+DURATION = re.compile(
+    r"^P(?:(?P<months>\d+)M)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def _time_format(value: str) -> str | None:
+    for time_format in TIME_FORMATS:
+        try:
+            if datetime.strptime(value, time_format).strftime(time_format) == value:
+                return time_format
+        except ValueError:
+            continue
+    return None
+
+
+def _add_months(start: datetime, months: int) -> datetime | None:
+    years, month = divmod(start.month - 1 + months, 12)
+    try:
+        return start.replace(year=start.year + years, month=month + 1)
+    except ValueError:
+        return None
+
+
+def _duration(step: int | timedelta) -> str:
+    if isinstance(step, int):
+        return f"P{step}M"
+    days, seconds = step.days, step.seconds
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    time = "".join(
+        f"{value}{unit}" for value, unit in ((hours, "H"), (minutes, "M"), (seconds, "S"))
+        if value
+    )
+    return f"P{f'{days}D' if days else ''}{f'T{time}' if time else ''}"
+
+
+def _parse_duration(value: str) -> int | timedelta:
+    match = DURATION.match(value)
+    if not match or value == "P":
+        raise ValueError(f"Unsupported time_dimension step {value}")
+    parts = {name: int(number or 0) for name, number in match.groupdict().items()}
+    months = parts.pop("months")
+    if months and any(parts.values()):
+        raise ValueError(f"Unsupported time_dimension step {value}")
+    return months or timedelta(**parts)
+
+
+def _series(start: datetime, step: int | timedelta, count: int, time_format: str):
+    for index in range(count):
+        if isinstance(step, int):
+            value = _add_months(start, step * index)
+            if value is None:
+                return
+        else:
+            value = start + step * index
+        yield value.strftime(time_format)
+
+
+def _run(dates: list[str], position: int) -> tuple[int | timedelta, int] | None:
+    """Longest regular series starting at ``position`` as (step, count)"""
+    time_format = _time_format(dates[position])
+    if time_format is None or position + 1 >= len(dates):
+        return None
+    try:
+        start = datetime.strptime(dates[position], time_format)
+        following = datetime.strptime(dates[position + 1], time_format)
+    except ValueError:
+        return None
+    steps = []
+    if following > start:
+        steps.append(following - start)
+    months = (following.year - start.year) * 12 + following.month - start.month
+    if months > 0 and following == _add_months(start, months):
+        steps.append(months)
+    best = None
+    for step in steps:
+        count = 0
+        for expected in _series(start, step, len(dates) - position, time_format):
+            if dates[position + count] != expected:
+                break
+            count += 1
+        if best is None or count > best[1]:
+            best = (step, count)
+    return best
+
+
+def encode_dates(dates: list[str]) -> list:
+    """Dates with the regular series written as runs"""
+    encoded = []
+    position = 0
+    while position < len(dates):
+        run = _run(dates, position)
+        if run and run[1] >= MIN_RUN:
+            step, count = run
+            encoded.append({"start": dates[position], "step": _duration(step), "count": count})
+            position += count
+        else:
+            encoded.append(dates[position])
+            position += 1
+    return encoded
+
+
+def decode_dates(encoded: list) -> list[str]:
+    dates = []
+    for part in encoded:
+        if isinstance(part, str):
+            dates.append(part)
+            continue
+        time_format = _time_format(part["start"])
+        start = datetime.strptime(part["start"], time_format)
+        dates.extend(_series(start, _parse_duration(part["step"]), part["count"], time_format))
+    return dates
+
+
+def _common_affixes(values: list[str]) -> tuple[str, str]:
+    shortest = min(len(value) for value in values)
+    prefix = 0
+    while prefix < shortest and len({value[prefix] for value in values}) == 1:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and len({value[-suffix - 1] for value in values}) == 1:
+        suffix += 1
+    return values[0][:prefix], values[0][len(values[0]) - suffix:]
+
+
+def _templated(value: str, date: str) -> str:
+    value = value.replace(date, TIME)
+    return value.replace(date[:10], DATE) if len(date) > 10 else value
+
+
+def _template(field: str, values: list, dates: list[str]):
+    """(template, lookup values) of one link field, None when it cannot be templated"""
+    strings = all(isinstance(value, str) for value in values)
+    if strings and any(TIME in value or DATE in value or KEY in value for value in values):
+        return None
+    if all(value == values[0] for value in values):
+        return values[0], None
+    if not strings:
+        return None
+    templated = {_templated(value, date) for value, date in zip(values, dates)}
+    if len(templated) == 1:
+        return templated.pop(), None
+    if field != "href":
+        return None
+    prefix, suffix = _common_affixes(values)
+    keys = [value[len(prefix):len(value) - len(suffix)] for value in values]
+    return f"{prefix}{KEY}{suffix}", keys
+
+
+def encode_links(dates: list[str], links: list[list[dict]]) -> list[dict] | None:
+    """Templated links of the per-date ``links``, None when they cannot be encoded.
+
+    ``links[index]`` are the links added for ``dates[index]``, every date
+    needs the same number of links with the same fields.
+    """
+    if not dates or len({len(date_links) for date_links in links}) != 1:
+        return None
+    encoded = []
+    for position in range(len(links[0])):
+        group = [date_links[position] for date_links in links]
+        if len({tuple(link) for link in group}) != 1:
+            return None
+        link = {}
+        for field in group[0]:
+            template = _template(field, [member[field] for member in group], dates)
+            if template is None:
+                return None
+            link[field], values = template
+            if values is not None:
+                link[FIELD] = {"values": values}
+        link.setdefault(FIELD, {})
+        encoded.append(link)
+    return encoded
+
+
+def add_time_dimension(collection: Collection, dates: list[str], series: dict,
+                       links: list[list[Link]] | None = None) -> bool:
+    """Write the links and ``series`` fields of ``dates`` in the compact encoding.
+
+    ``series`` maps the collection fields to restore to ``"dates"`` (the
+    list of dates), ``["time"]`` or ``["time", "url"]`` (a dict per date,
+    or per templated link and date with its href). Returns False, writing
+    nothing, when the links cannot be encoded.
+    """
+    links = links or [[] for _ in dates]
+    encoded = encode_links(dates, [[link.to_dict() for link in date_links] for date_links in links])
+    if encoded is None:
+        logging.info(f"Links of {collection.id} differ between dates, writing them all")
+        return False
+    for link in encoded:
+        collection.add_link(Link.from_dict(link))
+    collection.extra_fields[FIELD] = {"dates": encode_dates(dates), "series": series}
+    logging.info(f"Encoded {len(dates)} dates of {collection.id} as {len(encoded)} templated links")
+    return True
+
+
+def _fill(value, date: str, key: str | None):
+    if not isinstance(value, str):
+        return value
+    value = value.replace(TIME, date).replace(DATE, date[:10])
+    return value.replace(KEY, key) if key is not None else value
+
+
+def expand_time_dimension(collection: dict) -> dict:
+    """The collection dict with the links and series of ``time_dimension`` expanded"""
+    if FIELD not in collection:
+        return collection
+    expanded = {key: value for key, value in collection.items() if key != FIELD}
+    dimension = collection[FIELD]
+    dates = decode_dates(dimension["dates"])
+    links = []
+    templated = [link for link in collection.get("links", []) if FIELD in link]
+    for link in collection.get("links", []):
+        if FIELD not in link:
+            links.append(link)
+        elif link is templated[0]:
+            # templated links were added date by date, one of each per date
+            links.extend(link for _, link in _expand_links(templated, dates))
+    expanded["links"] = links
+    for field, spec in dimension.get("series", {}).items():
+        if spec == "dates":
+            expanded[field] = dates
+        elif "url" in spec:
+            expanded[field] = [
+                {"time": date, "url": link["href"]} for date, link in _expand_links(templated, dates)
+            ]
+        else:
+            expanded[field] = [{"time": date} for date in dates]
+    return expanded
+
+
+def _expand_links(templated: list[dict], dates: list[str]):
+    for index, date in enumerate(dates):
+        for link in templated:
+            values = link[FIELD].get("values")
+            key = values[index] if values else None
+            yield date, {
+                field: _fill(value, date, key)
+                for field, value in link.items() if field != FIELD
+            }
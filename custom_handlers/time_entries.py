@@ -0,0 +1,107 @@
+import bisect
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, NamedTuple
+
+
+def parse_time(time_str: str) -> datetime:
+    """Parse a TimeEntries ``Time`` value, naive values are treated as UTC"""
+    parsed = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class TimeEntryMatches(NamedTuple):
+    matched: list
+    unmatched_items: list
+    unmatched_entries: list
+
+
+class TimeEntryIndex:
+    """TimeEntries of a resource indexed by their parsed datetime.
+
+    Every ``Time`` is parsed once, lookups are a dict access or, when a
+    ``tolerance`` is given, a binary search for the nearest entry within
+    that window. If several entries share a timestamp the first one wins.
+    """
+
+    def __init__(self, time_entries: Iterable[dict], tolerance: timedelta | None = None):
+        self.tolerance = tolerance
+        self.invalid_entries = []
+        self._by_time: dict[datetime, dict] = {}
+        for time_entry in time_entries:
+            time_str = time_entry.get("Time")
+            if not time_str:
+                continue
+            try:
+                entry_time = parse_time(time_str)
+            except ValueError:
+                self.invalid_entries.append(time_entry)
+                continue
+            self._by_time.setdefault(entry_time, time_entry)
+        self._times = sorted(self._by_time) if tolerance else []
+
+    @classmethod
+    def from_endpoint_config(cls, endpoint_config: dict) -> "TimeEntryIndex":
+        """Index the TimeEntries of a resource, ``TimeTolerance`` is given in seconds"""
+        tolerance = endpoint_config.get("TimeTolerance")
+        return cls(
+            endpoint_config.get("TimeEntries", []),
+            timedelta(seconds=tolerance) if tolerance else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._by_time)
+
+    def _key(self, item_time: datetime) -> datetime | None:
+        if item_time.tzinfo is None:
+            item_time = item_time.replace(tzinfo=timezone.utc)
+        if item_time in self._by_time:
+            return item_time
+        if not self.tolerance or not self._times:
+            return None
+        position = bisect.bisect_left(self._times, item_time)
+        candidates = self._times[max(position - 1, 0):position + 1]
+        nearest = min(candidates, key=lambda t: abs(t - item_time))
+        if abs(nearest - item_time) <= self.tolerance:
+            return nearest
+        return None
+
+    def get(self, item_time: datetime) -> dict | None:
+        key = self._key(item_time)
+        return self._by_time[key] if key is not None else None
+
+    def match(self, items: Iterable) -> TimeEntryMatches:
+        """Pair items with their time entries in a single pass over the items"""
+        matched = []
+        unmatched_items = []
+        used = set()
+        for item in items:
+            key = self._key(item.datetime) if item.datetime else None
+            if key is None:
+                unmatched_items.append(item)
+                continue
+            used.add(key)
+            matched.append((item, self._by_time[key]))
+        unmatched_entries = [
+            time_entry for key, time_entry in self._by_time.items() if key not in used
+        ]
+        return TimeEntryMatches(matched, unmatched_items, unmatched_entries)
+
+
+def log_unmatched(matches: TimeEntryMatches, index: TimeEntryIndex) -> None:
+    if matches.unmatched_items:
+        logging.warning(
+            f"{len(matches.unmatched_items)} items without matching time entry: "
+            f"{[item.id for item in matches.unmatched_items]}"
+        )
+    if matches.unmatched_entries:
+        logging.warning(
+            f"{len(matches.unmatched_entries)} time entries without matching item: "
+            f"{[time_entry['Time'] for time_entry in matches.unmatched_entries]}"
+        )
+    if index.invalid_entries:
+        logging.warning(
+            f"Skipped {len(index.invalid_entries)} time entries with unparsable Time"
+        )
@@ -3,6 +3,8 @@ from datetime import datetime
 
 from pystac import Asset, Collection, Link
 
+from custom_handlers.time_dimension import add_time_dimension
+
 
 def process(
     collection: Collection,
@@ -22,6 +24,9 @@ def process(
     
     # Add time series data as collection-level links and properties
     time_data = []
+    compact = endpoint_config.get("CompactTimeDimension", False)
+    dates = []
+    date_links = []
     
     for time_entry in time_entries:
         time_str = time_entry.get("Time")
@@ -30,14 +35,15 @@ def process(
         if not time_str:
             continue
             
+        entry_links = []
         # Find XYZ link for this time entry
         for link_config in links:
             relation = link_config.get("Relation")
             url = link_config.get("URL")
             
             if relation == "xyz" and url:
-                # Add collection-level link with time information
-                collection.add_link(
+                # Collection-level link with time information
+                entry_links.append(
                     Link(
                         rel="xyz",
                         target=url,
@@ -57,11 +63,21 @@ def process(
                 })
                 
                 logging.info(f"Added collection-level XYZ link for {time_str}")
+        
+        if entry_links:
+            dates.append(time_str)
+            date_links.append(entry_links)
+    
+    # One templated link in place of a link per date when asked for
+    series = {"time_series": ["time", "url"]}
+    if not (compact and add_time_dimension(collection, dates, series, date_links)):
+        for entry_links in date_links:
+            collection.add_links(entry_links)
+        if time_data:
+            collection.extra_fields["time_series"] = time_data
     
     # Add time series metadata to collection
     if time_data:
-        collection.extra_fields["time_series"] = time_data
-        
         # Set temporal extent
         times = [datetime.fromisoformat(t["time"].replace('Z', '+00:00')) for t in time_data]
         min_time = min(times)
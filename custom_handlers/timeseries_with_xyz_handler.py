@@ -1,7 +1,13 @@
 import logging
 from datetime import datetime
 
-from pystac import Asset, Collection, Item, Link
+from pystac import Collection, Link
+
+from custom_handlers.item_records import AssetRecord, ItemRecord, footprint, roles
+from custom_handlers.item_writer import item_sink
+from custom_handlers.time_dimension import add_time_dimension
+
+DATA = roles("data")
 
 
 def process(
@@ -24,10 +30,18 @@ def process(
     # Remove any child links to prevent nested structure
     collection.links = [link for link in collection.links if link.rel != "child"]
     
+    # Every item shares the geometry and bbox of the resource
+    shape = footprint(bbox)
+    items = item_sink(collection, endpoint_config)
+    
     # Track min/max times for temporal extent
     min_time = None
     max_time = None
     
+    # XYZ links of every time entry, added at collection level below
+    dates = []
+    date_links = []
+    
     # Process each time entry and create STAC items (like original YAML processing)
     for time_entry in time_entries:
         time_str = time_entry.get("Time")
@@ -47,35 +61,26 @@ def process(
             if max_time is None or entry_time > max_time:
                 max_time = entry_time
             
-            # Create STAC item (exactly like original processing)
-            item = Item(
-                id=time_str,  # Use time string as ID
-                geometry={
-                    "type": "Polygon",
-                    "coordinates": [[[bbox[0], bbox[1]], [bbox[2], bbox[1]], 
-                                   [bbox[2], bbox[3]], [bbox[0], bbox[3]], [bbox[0], bbox[1]]]]
-                },
-                bbox=bbox,
-                datetime=entry_time,
-                properties={}
-            )
-            
             # Add assets from YAML (like original processing)
+            assets = {}
             for asset_config in assets_config:
                 identifier = asset_config.get("Identifier", "data")
                 file_url = asset_config.get("File")
                 if file_url:
-                    item.add_asset(
-                        identifier,
-                        Asset(
-                            href=file_url,
-                            media_type="image/tiff",
-                            roles=["data"]
-                        )
+                    assets[identifier] = AssetRecord(
+                        identifier, file_url, "image/tiff", roles=DATA
                     )
             
+            # Create STAC item (exactly like original processing)
+            item = ItemRecord(
+                id=time_str,  # Use time string as ID
+                datetime=entry_time,
+                footprint=shape,
+                assets=tuple(assets.values()),
+            )
+            
             # Store XYZ links for collection-level processing to avoid individual layers
-            xyz_links_data = []
+            entry_links = []
             for link_config in links_config:
                 relation = link_config.get("Relation")
                 url = link_config.get("URL")
@@ -83,27 +88,38 @@ def process(
                 title = link_config.get("Title", "")
                 
                 if relation == "xyz" and url:
-                    xyz_links_data.append({
-                        "time": time_str,
-                        "url": url,
-                        "type": link_type,
-                        "title": title
-                    })
+                    entry_links.append(
+                        Link(
+                            rel="xyz",
+                            target=url,
+                            media_type=link_type,
+                            title=title,
+                            extra_fields={
+                                "time": time_str,
+                                "role": ["data"]
+                            }
+                        )
+                    )
                     logging.info(f"Stored XYZ link for collection-level processing: {time_str}")
+            dates.append(time_str)
+            date_links.append(entry_links)
             
-            # Store xyz links data for later processing
-            if not hasattr(collection, '_xyz_links_data'):
-                collection._xyz_links_data = []
-            collection._xyz_links_data.extend(xyz_links_data)
-            
-            # Add the item to the collection
-            collection.add_item(item)
+            # Add the item to the collection, with datetime and assets on its
+            # item link like the original processing
+            link_fields = {"datetime": entry_time.isoformat().replace('+00:00', 'Z')}
+            # Only include original assets, not generated ones
+            asset_urls = [asset.href for asset in item.assets if asset.key != "data"]
+            if asset_urls:
+                link_fields["assets"] = asset_urls
+            items.add(item, link_fields)
             logging.info(f"Created STAC item for time: {time_str}")
             
         except ValueError as e:
             logging.error(f"Error parsing time {time_str}: {e}")
             continue
     
+    items.close()
+    
     # Update collection extents with actual data (like original processing)
     if min_time and max_time:
         # Update temporal extent
@@ -115,54 +131,21 @@ def process(
         
         # Add time series metadata to help EODash recognize this as a time series
         times = [time_entry.get("Time") for time_entry in time_entries if time_entry.get("Time")]
+        series = {"time_series": ["time"]} if len(times) > 1 else {}
+        # One templated link and the dates once in place of a link per date when asked for
+        compact = endpoint_config.get("CompactTimeDimension", False) and dates == times
+        if compact and add_time_dimension(collection, dates, series, date_links):
+            logging.info(f"Added compact time dimension with {len(dates)} time points")
+        else:
+            if series:
+                # Add EODash time series indicators
+                collection.extra_fields["time_series"] = [{"time": t} for t in times]
+            # Add collection-level XYZ links for time series
+            for entry_links in date_links:
+                collection.add_links(entry_links)
         if len(times) > 1:
-            # Add EODash time series indicators
-            collection.extra_fields["time_series"] = [{"time": t} for t in times]
             # Mark this as a time series collection
             collection.extra_fields["collection_type"] = "timeseries"
             logging.info(f"Added time series metadata with {len(times)} time points")
-            
-        # Add collection-level XYZ links for time series
-        if hasattr(collection, '_xyz_links_data'):
-            for xyz_data in collection._xyz_links_data:
-                collection.add_link(
-                    Link(
-                        rel="xyz",
-                        target=xyz_data["url"],
-                        media_type=xyz_data["type"],
-                        title=xyz_data["title"],
-                        extra_fields={
-                            "time": xyz_data["time"],
-                            "role": ["data"]
-                        }
-                    )
-                )
-                logging.info(f"Added collection-level XYZ link for {xyz_data['time']}")
-            
-            # Clean up temp data
-            delattr(collection, '_xyz_links_data')
-    
-    # Now the key part: Update the collection links to match original processing
-    # The original processing adds datetime and assets to the collection item links
-    items = list(collection.get_items())
-    for item in items:
-        # Find existing item link and enhance it with datetime and assets
-        for link in collection.links:
-            if (link.rel == "item" and 
-                link.target and item.id in str(link.target)):
-                
-                # Add datetime and assets to the link (like original processing)
-                link.extra_fields["datetime"] = item.datetime.isoformat().replace('+00:00', 'Z')
-                
-                # Add assets list to the link
-                asset_urls = []
-                for asset_key, asset in item.assets.items():
-                    if asset_key != "data":  # Only include original assets, not generated ones
-                        asset_urls.append(asset.href)
-                
-                if asset_urls:
-                    link.extra_fields["assets"] = asset_urls
-                
-                logging.info(f"Enhanced collection link for item {item.id}")
     
     return collection
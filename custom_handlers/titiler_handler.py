@@ -1,50 +1,32 @@
+import logging
+
 from pystac import Collection, Link, Item, Asset
 from pystac import SpatialExtent, TemporalExtent
 from datetime import datetime
-import urllib.parse
+
+from custom_handlers.cog_info import RASTER_EXTENSION, prefetch_cog_info
+from custom_handlers.titiler_urls import TitilerUrlTemplate, s3_href
 
 def process(collection, catalog_config, endpoint_config, collection_config):
     """Custom handler with direct link manipulation"""
     
-    # Build the S3 URL
-    s3_url = f"s3://{endpoint_config['S3Bucket']}/{endpoint_config['S3Key']}"
-    base_url = endpoint_config["EndPoint"]
-    encoded_s3_url = urllib.parse.quote(s3_url, safe='')
-    
-    # Build parameters for titiler
-    params = []
-    params.append(f"url={encoded_s3_url}")
-    
-    if endpoint_config.get("Bands"):
-        for band in endpoint_config["Bands"]:
-            params.append(f"bidx={band}")
-    
-    if endpoint_config.get("Rescale"):
-        rescale_str = f"{endpoint_config['Rescale'][0]}%2C{endpoint_config['Rescale'][1]}"
-        for _ in endpoint_config.get("Bands", [1]):
-            params.append(f"rescale={rescale_str}")
-    
-    if endpoint_config.get("Reproject"):
-        params.append(f"reproject={endpoint_config['Reproject']}")
-    
-    params_str = '&'.join(params)
+    # Build the S3 URL and the titiler urls for it
+    s3_url = s3_href(endpoint_config['S3Bucket'], endpoint_config['S3Key'])
+    template = TitilerUrlTemplate.from_endpoint_config(endpoint_config)
+    tile_url, info_url, preview_url, thumbnail_url = template.urls(s3_url)
     
-    # Create titiler tile URL
-    tile_url = f"{base_url}/cog/tiles/{{z}}/{{x}}/{{y}}.png?{params_str}"
-    
-    print(f"=== TITILER HANDLER DEBUG ===")
-    print(f"Generated tile URL: {tile_url}")
-    
-    # Create other URLs
-    info_url = f"{base_url}/cog/info?{params_str}"
-    preview_url = f"{base_url}/cog/preview?{params_str}"
-    thumbnail_url = f"{base_url}/cog/preview.png?{params_str}&max_size=512"
+    logging.debug(f"Generated tile URL: {tile_url}")
     
     # Create a STAC item
     datetime_str = endpoint_config.get("DateTime", "2020-10-30T18:21:38Z")
     item_datetime = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
     bbox = endpoint_config.get("Bbox", [-114.0, 32.0, -113.0, 33.0])
     
+    # Real bbox, bands, dtype and nodata of the COG with PrefetchCogInfo
+    info = prefetch_cog_info(endpoint_config, [s3_url]).get(s3_url)
+    if info:
+        bbox = info.bbox
+    
     item = Item(
         id=item_datetime.strftime('%Y-%m-%dT%H:%M:%SZ'),
         bbox=bbox,
@@ -99,10 +81,6 @@ def process(collection, catalog_config, endpoint_config, collection_config):
         title="Titiler XYZ Tiles"
     )
     
-    print(f"Custom Link rel: {xyz_link.rel}")
-    print(f"Custom Link href: {xyz_link.href}")
-    print(f"Custom Link media_type: {xyz_link.media_type}")
-    
     # Add the custom link to the item
     if not hasattr(item, 'links'):
         item.links = []
@@ -133,6 +111,19 @@ def process(collection, catalog_config, endpoint_config, collection_config):
         )
     )
     
+    # The prefetched bands, data type and nodata describe the COG itself
+    if info:
+        item.add_asset(
+            "raw_cog",
+            Asset(
+                href=s3_url,
+                media_type="image/tiff",
+                roles=["source"],
+                extra_fields=info.raster_fields
+            )
+        )
+        item.stac_extensions.append(RASTER_EXTENSION)
+    
     item.add_asset(
         "preview",
         Asset(
@@ -156,17 +147,6 @@ def process(collection, catalog_config, endpoint_config, collection_config):
     collection.extent.spatial = SpatialExtent([bbox])
     collection.extent.temporal = TemporalExtent([[item_datetime, item_datetime]])
     
-    print(f"Item has {len(item.links)} links")
-    print(f"Item has {len(item.assets)} assets")
-    
-    # Debug final structure
-    print("=== FINAL LINK STRUCTURE ===")
-    for link in item.links:
-        if hasattr(link, 'rel') and link.rel == "xyz":
-            print(f"XYZ Link found:")
-            print(f"  - rel: {link.rel}")
-            print(f"  - href: {getattr(link, 'href', 'NOT SET')}")
-            print(f"  - media_type: {getattr(link, 'media_type', 'NOT SET')}")
-            print(f"  - title: {getattr(link, 'title', 'NOT SET')}")
+    logging.debug(f"Item has {len(item.links)} links and {len(item.assets)} assets")
     
     return collection
\ No newline at end of file
@@ -0,0 +1,114 @@
+import urllib.parse
+from typing import Iterable, NamedTuple
+
+
+class TitilerUrls(NamedTuple):
+    """The four TiTiler URL variants emitted for a single COG"""
+
+    tile: str
+    info: str
+    preview: str
+    thumbnail: str
+
+
+def _encode_value(value) -> str:
+    return urllib.parse.quote(str(value), safe="")
+
+
+class TitilerUrlTemplate:
+    """Compiled TiTiler URL template for one resource.
+
+    The query parameters that are identical for every COG of a resource
+    (bidx, rescale, reproject, colormap, ...) are encoded once when the
+    template is built, so producing the URLs for a time entry is only the
+    quoting of its COG url plus a few string concatenations.
+    """
+
+    __slots__ = ("endpoint", "query", "_tile_prefix", "_info_prefix",
+                 "_preview_prefix", "_thumbnail_prefix", "_suffix",
+                 "_thumbnail_suffix")
+
+    def __init__(
+        self,
+        endpoint: str,
+        bands: Iterable | None = None,
+        rescale: list | None = None,
+        reproject: str | None = None,
+        extra_params: dict | None = None,
+        thumbnail_size: int = 512,
+    ):
+        bands = list(bands or [])
+        params = [f"bidx={_encode_value(band)}" for band in bands]
+        if rescale:
+            rescale_str = f"{_encode_value(rescale[0])}%2C{_encode_value(rescale[1])}"
+            # titiler expects one rescale range per requested band
+            params.extend(f"rescale={rescale_str}" for _ in (bands or [1]))
+        if reproject:
+            params.append(f"reproject={_encode_value(reproject)}")
+        for key, value in (extra_params or {}).items():
+            if value is not None:
+                params.append(f"{key}={urllib.parse.quote(str(value), safe=',')}")
+
+        self.endpoint = endpoint.rstrip("/")
+        self.query = "&".join(params)
+        self._tile_prefix = f"{self.endpoint}/cog/tiles/{{z}}/{{x}}/{{y}}.png?url="
+        self._info_prefix = f"{self.endpoint}/cog/info?url="
+        self._preview_prefix = f"{self.endpoint}/cog/preview?url="
+        self._thumbnail_prefix = f"{self.endpoint}/cog/preview.png?url="
+        self._suffix = f"&{self.query}" if self.query else ""
+        self._thumbnail_suffix = f"{self._suffix}&max_size={thumbnail_size}"
+
+    @classmethod
+    def from_endpoint_config(cls, endpoint_config: dict, **defaults) -> "TitilerUrlTemplate":
+        """Build the template from a resource definition of a collection config.
+
+        ``defaults`` provides fallback values for ``bands``, ``rescale`` and
+        ``reproject`` when the resource does not define them.
+        """
+        return cls(
+            endpoint_config["EndPoint"],
+            bands=endpoint_config.get("Bands", defaults.get("bands")),
+            rescale=endpoint_config.get("Rescale", defaults.get("rescale")),
+            reproject=endpoint_config.get("Reproject", defaults.get("reproject")),
+        )
+
+    def encode_href(self, href: str) -> str:
+        return urllib.parse.quote(href, safe="")
+
+    def tile_url(self, href: str, encode: bool = True) -> str:
+        """XYZ tile url for a COG, ``encode=False`` keeps placeholders like ``{cog_url}``"""
+        url = self.encode_href(href) if encode else href
+        return f"{self._tile_prefix}{url}{self._suffix}"
+
+    def urls(self, href: str) -> TitilerUrls:
+        """All URL variants for a single COG href"""
+        url = self.encode_href(href)
+        return TitilerUrls(
+            self._tile_prefix + url + self._suffix,
+            self._info_prefix + url + self._suffix,
+            self._preview_prefix + url + self._suffix,
+            self._thumbnail_prefix + url + self._thumbnail_suffix,
+        )
+
+    def batch(self, hrefs: Iterable[str]) -> list[TitilerUrls]:
+        """URL variants for many COG hrefs in one call"""
+        quote = urllib.parse.quote
+        tile, info = self._tile_prefix, self._info_prefix
+        preview, thumbnail = self._preview_prefix, self._thumbnail_prefix
+        suffix, thumbnail_suffix = self._suffix, self._thumbnail_suffix
+        result = []
+        for href in hrefs:
+            url = quote(href, safe="")
+            result.append(
+                TitilerUrls(
+                    tile + url + suffix,
+                    info + url + suffix,
+                    preview + url + suffix,
+                    thumbnail + url + thumbnail_suffix,
+                )
+            )
+        return result
+
+
+def s3_href(bucket: str, key: str) -> str:
+    return f"s3://{bucket}/{key}"
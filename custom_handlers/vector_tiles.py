@@ -0,0 +1,425 @@
+"""
+Tile a GeoJSON FeatureCollection into a single-file PMTiles (v3) archive
+of Mapbox Vector Tiles.
+
+Geometries are projected to web mercator, clipped per tile and simplified
+with a tolerance given in tile pixels, so lower zoom levels carry coarser
+geometry. Clients range-request only the tiles in view instead of
+downloading the whole GeoJSON.
+
+    python -m custom_handlers.vector_tiles source.geojson destination.pmtiles \
+        --minzoom 0 --maxzoom 14
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+from shapely.geometry.polygon import orient
+
+from custom_handlers.geojson_minify import iter_features
+
+EXTENT = 4096
+BUFFER = 64
+DEFAULT_MINZOOM = 0
+DEFAULT_MAXZOOM = 14
+DEFAULT_SIMPLIFY = 1.0
+MAX_LATITUDE = 85.05112878
+
+# PMTiles enums
+COMPRESSION_NONE = 1
+COMPRESSION_GZIP = 2
+TILE_TYPE_MVT = 1
+HEADER_SIZE = 127
+ROOT_DIRECTORY_LIMIT = 16384 - HEADER_SIZE
+
+
+# --- protobuf helpers -------------------------------------------------------
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _varint_field(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint(value)
+
+
+def _packed_field(field: int, values) -> bytes:
+    return _bytes_field(field, b"".join(_varint(value) for value in values))
+
+
+def _encode_value(value) -> bytes:
+    if isinstance(value, bool):
+        return _varint_field(7, int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _varint_field(5, value)
+        return _varint_field(6, _zigzag(value))
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack("<d", value)
+    if not isinstance(value, str):
+        value = json.dumps(value, separators=(",", ":"))
+    return _bytes_field(1, value.encode("utf-8"))
+
+
+# --- geometry ---------------------------------------------------------------
+
+def _to_mercator(coordinates: np.ndarray) -> np.ndarray:
+    """lon/lat to web mercator normalized to [0, 1], y pointing down"""
+    lon = coordinates[:, 0]
+    lat = np.clip(coordinates[:, 1], -MAX_LATITUDE, MAX_LATITUDE)
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(np.radians(lat)) + 1.0 / np.cos(np.radians(lat))) / math.pi) / 2.0
+    return np.column_stack((x, y))
+
+
+class _GeometryEncoder:
+    def __init__(self):
+        self.commands = []
+        self.cursor = (0, 0)
+
+    def _move(self, points, command: int) -> None:
+        self.commands.append((command & 0x7) | (len(points) << 3))
+        for x, y in points:
+            self.commands.append(_zigzag(x - self.cursor[0]))
+            self.commands.append(_zigzag(y - self.cursor[1]))
+            self.cursor = (x, y)
+
+    def line(self, coordinates) -> None:
+        self._move(coordinates[:1], 1)
+        self._move(coordinates[1:], 2)
+
+    def ring(self, coordinates) -> None:
+        # the closing point is implied by ClosePath
+        self.line(coordinates[:-1])
+        self.commands.append(7 | (1 << 3))
+
+
+def _int_coordinates(coordinates) -> list:
+    return [(int(x), int(y)) for x, y in coordinates]
+
+
+def _encode_geometry(geometry) -> tuple[int, list] | None:
+    """MVT geometry type and command list of an integer tile geometry"""
+    encoder = _GeometryEncoder()
+    kind = geometry.geom_type
+    if kind in ("Point", "MultiPoint"):
+        points = [(int(p.x), int(p.y)) for p in getattr(geometry, "geoms", [geometry])]
+        encoder._move(points, 1)
+        return 1, encoder.commands
+    if kind in ("LineString", "MultiLineString"):
+        for line in getattr(geometry, "geoms", [geometry]):
+            coordinates = _int_coordinates(line.coords)
+            if len(coordinates) >= 2:
+                encoder.line(coordinates)
+        return (2, encoder.commands) if encoder.commands else None
+    if kind in ("Polygon", "MultiPolygon"):
+        for polygon in getattr(geometry, "geoms", [geometry]):
+            # in y-down tile coordinates exterior rings need a positive area
+            polygon = orient(polygon, sign=1.0)
+            rings = [polygon.exterior, *polygon.interiors]
+            for ring in rings:
+                coordinates = _int_coordinates(ring.coords)
+                if len(coordinates) >= 4:
+                    encoder.ring(coordinates)
+        return (3, encoder.commands) if encoder.commands else None
+    return None
+
+
+class _Layer:
+    def __init__(self, name: str):
+        self.name = name
+        self.keys: dict[str, int] = {}
+        self.values: dict[tuple, int] = {}
+        self.features: list[bytes] = []
+
+    def add(self, geometry, properties: dict, feature_id) -> None:
+        encoded = _encode_geometry(geometry)
+        if encoded is None:
+            return
+        geometry_type, commands = encoded
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            key_index = self.keys.setdefault(key, len(self.keys))
+            value_key = (type(value).__name__, json.dumps(value, sort_keys=True))
+            if value_key not in self.values:
+                self.values[value_key] = len(self.values)
+            tags.extend((key_index, self.values[value_key]))
+        feature = b""
+        if isinstance(feature_id, int) and not isinstance(feature_id, bool) and feature_id >= 0:
+            feature += _varint_field(1, feature_id)
+        if tags:
+            feature += _packed_field(2, tags)
+        feature += _varint_field(3, geometry_type)
+        feature += _packed_field(4, commands)
+        self.features.append(feature)
+
+    def encode(self) -> bytes:
+        values = [None] * len(self.values)
+        for (_, dumped), index in self.values.items():
+            values[index] = json.loads(dumped)
+        layer = _varint_field(15, 2) + _bytes_field(1, self.name.encode("utf-8"))
+        layer += b"".join(_bytes_field(2, feature) for feature in self.features)
+        layer += b"".join(_bytes_field(3, key.encode("utf-8")) for key in self.keys)
+        layer += b"".join(_bytes_field(4, _encode_value(value)) for value in values)
+        layer += _varint_field(5, EXTENT)
+        return _bytes_field(3, layer)
+
+
+# --- pmtiles ----------------------------------------------------------------
+
+def _rotate(n: int, x: int, y: int, rx: int, ry: int) -> tuple[int, int]:
+    if ry == 0:
+        if rx == 1:
+            x = n - 1 - x
+            y = n - 1 - y
+        x, y = y, x
+    return x, y
+
+
+def zxy_to_tileid(z: int, x: int, y: int) -> int:
+    """PMTiles tile id: tiles of lower zooms first, then the hilbert index"""
+    n = 1 << z
+    tile_id = ((1 << (2 * z)) - 1) // 3
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        tile_id += s * s * ((3 * rx) ^ ry)
+        x, y = _rotate(n, x, y, rx, ry)
+        s >>= 1
+    return tile_id
+
+
+def _serialize_directory(entries: list) -> bytes:
+    """entries are (tile_id, offset, length, run_length) sorted by tile_id"""
+    out = bytearray(_varint(len(entries)))
+    last_id = 0
+    for tile_id, _, _, _ in entries:
+        out += _varint(tile_id - last_id)
+        last_id = tile_id
+    for entry in entries:
+        out += _varint(entry[3])
+    for entry in entries:
+        out += _varint(entry[2])
+    for index, (_, offset, _, _) in enumerate(entries):
+        previous = entries[index - 1] if index else None
+        if previous and offset == previous[1] + previous[2]:
+            out += _varint(0)
+        else:
+            out += _varint(offset + 1)
+    return gzip.compress(bytes(out), mtime=0)
+
+
+def _build_directories(entries: list) -> tuple[bytes, bytes]:
+    root = _serialize_directory(entries)
+    if len(root) <= ROOT_DIRECTORY_LIMIT:
+        return root, b""
+    leaf_size = 4096
+    while True:
+        leaves = b""
+        root_entries = []
+        for start in range(0, len(entries), leaf_size):
+            leaf = _serialize_directory(entries[start:start + leaf_size])
+            root_entries.append((entries[start][0], len(leaves), len(leaf), 0))
+            leaves += leaf
+        root = _serialize_directory(root_entries)
+        if len(root) <= ROOT_DIRECTORY_LIMIT:
+            return root, leaves
+        leaf_size *= 2
+
+
+def write_pmtiles(path: str, tiles: dict, metadata: dict, minzoom: int, maxzoom: int,
+                  bounds: list) -> dict:
+    """Write ``tiles`` ({(z, x, y): gzipped mvt bytes}) as a clustered PMTiles archive"""
+    ordered = sorted((zxy_to_tileid(*zxy), data) for zxy, data in tiles.items())
+    tile_data = bytearray()
+    offsets: dict[bytes, tuple[int, int]] = {}
+    entries: list[list] = []
+    for tile_id, data in ordered:
+        digest = hashlib.sha256(data).digest()
+        if digest not in offsets:
+            offsets[digest] = (len(tile_data), len(data))
+            tile_data += data
+        offset, length = offsets[digest]
+        last = entries[-1] if entries else None
+        # consecutive tile ids with identical content become a single run
+        if last and last[1] == offset and last[0] + last[3] == tile_id:
+            last[3] += 1
+        else:
+            entries.append([tile_id, offset, length, 1])
+    entries = [tuple(entry) for entry in entries]
+
+    root, leaves = _build_directories(entries)
+    metadata_bytes = gzip.compress(json.dumps(metadata).encode("utf-8"), mtime=0)
+
+    root_offset = HEADER_SIZE
+    metadata_offset = root_offset + len(root)
+    leaves_offset = metadata_offset + len(metadata_bytes)
+    data_offset = leaves_offset + len(leaves)
+    center_zoom = minzoom
+    header = b"PMTiles" + struct.pack(
+        "<BQQQQQQQQQQQBBBBBBiiiiBii",
+        3,
+        root_offset, len(root),
+        metadata_offset, len(metadata_bytes),
+        leaves_offset, len(leaves),
+        data_offset, len(tile_data),
+        len(ordered), len(entries), len(offsets),
+        1, COMPRESSION_GZIP, COMPRESSION_GZIP, TILE_TYPE_MVT,
+        minzoom, maxzoom,
+        round(bounds[0] * 1e7), round(bounds[1] * 1e7),
+        round(bounds[2] * 1e7), round(bounds[3] * 1e7),
+        center_zoom,
+        round((bounds[0] + bounds[2]) / 2 * 1e7), round((bounds[1] + bounds[3]) / 2 * 1e7),
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as output:
+        output.write(header)
+        output.write(root)
+        output.write(metadata_bytes)
+        output.write(leaves)
+        output.write(tile_data)
+    return {
+        "addressed_tiles": len(ordered),
+        "tile_entries": len(entries),
+        "tile_contents": len(offsets),
+        "bytes": data_offset + len(tile_data),
+    }
+
+
+# --- tiling -----------------------------------------------------------------
+
+def tile_features(features, minzoom: int = DEFAULT_MINZOOM, maxzoom: int = DEFAULT_MAXZOOM,
+                  layer_name: str = "features", simplify: float = DEFAULT_SIMPLIFY):
+    """Cut features into mvt tiles, returns ({(z, x, y): mvt bytes}, bounds, fields)"""
+    layers: dict[tuple, _Layer] = {}
+    bounds = [180.0, 90.0, -180.0, -90.0]
+    fields: dict[str, str] = {}
+    for feature in features:
+        if not feature.get("geometry"):
+            continue
+        geometry = shape(feature["geometry"])
+        if geometry.is_empty:
+            continue
+        minx, miny, maxx, maxy = geometry.bounds
+        bounds = [min(bounds[0], minx), min(bounds[1], miny),
+                  max(bounds[2], maxx), max(bounds[3], maxy)]
+        properties = feature.get("properties") or {}
+        for key, value in properties.items():
+            fields.setdefault(key, "Number" if isinstance(value, (int, float)) else "String")
+        world = shapely.transform(geometry, _to_mercator)
+        for zoom in range(minzoom, maxzoom + 1):
+            scale = (1 << zoom) * EXTENT
+            projected = shapely.transform(world, lambda coordinates: coordinates * scale)
+            wminx, wminy, wmaxx, wmaxy = projected.bounds
+            last_tile = (1 << zoom) - 1
+            for x in range(max(int((wminx - BUFFER) // EXTENT), 0),
+                           min(int((wmaxx + BUFFER) // EXTENT), last_tile) + 1):
+                for y in range(max(int((wminy - BUFFER) // EXTENT), 0),
+                               min(int((wmaxy + BUFFER) // EXTENT), last_tile) + 1):
+                    origin = np.array([x * EXTENT, y * EXTENT])
+                    clipped = shapely.clip_by_rect(
+                        projected,
+                        origin[0] - BUFFER, origin[1] - BUFFER,
+                        origin[0] + EXTENT + BUFFER, origin[1] + EXTENT + BUFFER,
+                    )
+                    if clipped.is_empty:
+                        continue
+                    local = shapely.transform(clipped, lambda coordinates: coordinates - origin)
+                    if simplify:
+                        local = local.simplify(simplify)
+                    local = shapely.set_precision(local, 1.0)
+                    if local.is_empty:
+                        continue
+                    layer = layers.setdefault((zoom, x, y), _Layer(layer_name))
+                    parts = local.geoms if local.geom_type == "GeometryCollection" else [local]
+                    for part in parts:
+                        layer.add(part, properties, feature.get("id"))
+    tiles = {
+        zxy: gzip.compress(layer.encode(), mtime=0)
+        for zxy, layer in layers.items() if layer.features
+    }
+    return tiles, bounds, fields
+
+
+def geojson_to_pmtiles(
+    source: str,
+    destination: str,
+    minzoom: int = DEFAULT_MINZOOM,
+    maxzoom: int = DEFAULT_MAXZOOM,
+    layer_name: str | None = None,
+    simplify: float = DEFAULT_SIMPLIFY,
+) -> dict:
+    """Tile a GeoJSON file into a PMTiles archive and return a small report"""
+    if not 0 <= minzoom <= maxzoom <= 24:
+        raise ValueError(f"Invalid zoom range {minzoom}-{maxzoom}")
+    layer_name = layer_name or os.path.splitext(os.path.basename(str(source)))[0]
+    tiles, bounds, fields = tile_features(
+        iter_features(source), minzoom, maxzoom, layer_name, simplify
+    )
+    metadata = {
+        "name": layer_name,
+        "format": "pbf",
+        "vector_layers": [
+            {"id": layer_name, "fields": fields, "minzoom": minzoom, "maxzoom": maxzoom}
+        ],
+    }
+    report = write_pmtiles(destination, tiles, metadata, minzoom, maxzoom, bounds)
+    report.update({"source": str(source), "destination": str(destination),
+                   "minzoom": minzoom, "maxzoom": maxzoom, "bounds": bounds})
+    logging.info(
+        f"Tiled {source} into {destination}: {report['addressed_tiles']} tiles, "
+        f"{report['bytes']} bytes"
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tile GeoJSON into a PMTiles archive")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--minzoom", type=int, default=DEFAULT_MINZOOM)
+    parser.add_argument("--maxzoom", type=int, default=DEFAULT_MAXZOOM)
+    parser.add_argument("--layer", default=None, help="layer name, defaults to the file name")
+    parser.add_argument("--simplify", type=float, default=DEFAULT_SIMPLIFY,
+                        help="simplification tolerance in tile pixels")
+    args = parser.parse_args()
+    report = geojson_to_pmtiles(
+        args.source, args.destination, args.minzoom, args.maxzoom, args.layer, args.simplify
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
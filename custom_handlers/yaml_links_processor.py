@@ -1,7 +1,13 @@
 import logging
 from datetime import datetime
 
-from pystac import Asset, Collection, Item, Link
+from pystac import Collection
+
+from custom_handlers.item_records import AssetRecord, ItemRecord, LinkRecord, footprint, roles
+from custom_handlers.item_writer import item_sink
+from custom_handlers.time_dimension import add_time_dimension
+
+DATA = roles("data")
 
 
 def process(
@@ -22,6 +28,10 @@ def process(
     # Clear any existing items (in case they were improperly created)
     collection.clear_items()
     
+    # Every item shares the geometry and bbox of the resource
+    shape = footprint(bbox)
+    items = item_sink(collection, endpoint_config)
+    
     # Track min/max times for temporal extent
     min_time = None
     max_time = None
@@ -45,34 +55,18 @@ def process(
             if max_time is None or entry_time > max_time:
                 max_time = entry_time
             
-            # Create STAC item
-            item = Item(
-                id=time_str,  # Use time string as ID
-                geometry={
-                    "type": "Polygon",
-                    "coordinates": [[[bbox[0], bbox[1]], [bbox[2], bbox[1]], 
-                                   [bbox[2], bbox[3]], [bbox[0], bbox[3]], [bbox[0], bbox[1]]]]
-                },
-                bbox=bbox,
-                datetime=entry_time,
-                properties={}
-            )
-            
             # Add assets from YAML
+            item_assets = {}
             for asset_config in assets:
                 identifier = asset_config.get("Identifier", "data")
                 file_url = asset_config.get("File")
                 if file_url:
-                    item.add_asset(
-                        identifier,
-                        Asset(
-                            href=file_url,
-                            media_type="image/tiff",
-                            roles=["data"]
-                        )
+                    item_assets[identifier] = AssetRecord(
+                        identifier, file_url, "image/tiff", roles=DATA
                     )
             
             # Add links from YAML (this is the key part!)
+            item_links = []
             for link_config in links:
                 relation = link_config.get("Relation")
                 url = link_config.get("URL")
@@ -81,24 +75,28 @@ def process(
                 
                 if relation == "xyz" and url:
                     # Add XYZ link to the item
-                    item.add_link(
-                        Link(
-                            rel="xyz",
-                            target=url,
-                            media_type=link_type,
-                            title=title
-                        )
-                    )
-                    logging.info(f"Added XYZ link to item {item.id}: {url}")
+                    item_links.append(LinkRecord("xyz", url, link_type, title))
+                    logging.info(f"Added XYZ link to item {time_str}: {url}")
+            
+            # Create STAC item
+            item = ItemRecord(
+                id=time_str,  # Use time string as ID
+                datetime=entry_time,
+                footprint=shape,
+                assets=tuple(item_assets.values()),
+                links=tuple(item_links),
+            )
             
             # Add the item to the collection
-            collection.add_item(item)
+            items.add(item)
             logging.info(f"Created STAC item for time: {time_str}")
             
         except ValueError as e:
             logging.error(f"Error parsing time {time_str}: {e}")
             continue
     
+    items.close()
+    
     # Update collection temporal extent with actual data times  
     if min_time and max_time:
         # Update the temporal extent with datetime objects
@@ -112,8 +110,14 @@ def process(
         # Based on STAC timeseries extension patterns AND EODash-specific patterns
         times = [time_entry.get("Time") for time_entry in time_entries if time_entry.get("Time")]
         if len(times) > 1:  # Only if we have multiple time points
+            # Both lists below hold the same dates, written once when asked for
+            compact = endpoint_config.get("CompactTimeDimension", False)
+            series = {"ts:dates": "dates", "time_series": ["time"]}
+            compact = compact and add_time_dimension(collection, times, series)
+            
             # Standard STAC timeseries extension
-            collection.extra_fields["ts:dates"] = times
+            if not compact:
+                collection.extra_fields["ts:dates"] = times
             collection.extra_fields["stac_extensions"] = [
                 "https://stac-extensions.github.io/timeseries/v1.0.0/schema.json"
             ]
@@ -125,7 +129,8 @@ def process(
                 if time_str:
                     time_series_data.append({"time": time_str})
             
-            collection.extra_fields["time_series"] = time_series_data
+            if not compact:
+                collection.extra_fields["time_series"] = time_series_data
             logging.info(f"Added both STAC and EODash timeseries metadata with {len(times)} dates")
     
     return collection
@@ -1,7 +1,14 @@
 import logging
 from datetime import datetime
 
-from pystac import Asset, Collection, Item, Link
+from pystac import Collection
+
+from custom_handlers.item_records import AssetRecord, ItemRecord, LinkRecord, footprint, roles
+from custom_handlers.item_writer import item_sink
+
+DATA = roles("data")
+# Match aircraft_detection
+WEB_MERCATOR = {"proj:epsg": 3857}
 
 
 def process(
@@ -20,11 +27,15 @@ def process(
         logging.warning("No TimeEntries found in endpoint_config")
         return collection
     
+    # Every item shares the geometry and bbox of the resource
+    shape = footprint(bbox)
+    items = item_sink(collection, endpoint_config)
+    
     # Process each time entry from YAML
     for time_entry in time_entries:
         time_str = time_entry.get("Time")
-        assets = time_entry.get("Assets", [])
-        links = time_entry.get("Links", [])
+        assets_config = time_entry.get("Assets", [])
+        links_config = time_entry.get("Links", [])
         
         if not time_str:
             logging.warning("No Time found in time entry")
@@ -33,41 +44,18 @@ def process(
         # Parse datetime
         dt = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
         
-        # Create STAC Item
-        item = Item(
-            id=time_str,  # Use the original time string as ID to match EODash expectations
-            geometry={
-                "type": "Polygon",
-                "coordinates": [[
-                    [bbox[0], bbox[1]],
-                    [bbox[2], bbox[1]],
-                    [bbox[2], bbox[3]],
-                    [bbox[0], bbox[3]],
-                    [bbox[0], bbox[1]]
-                ]]
-            },
-            bbox=bbox,
-            datetime=dt,
-            properties={}
-        )
-        
         # Add assets from YAML
-        for asset_config in assets:
+        assets = {}
+        for asset_config in assets_config:
             identifier = asset_config.get("Identifier", "data")
             file_href = asset_config.get("File")
             
             if file_href:
-                item.add_asset(
-                    identifier,
-                    Asset(
-                        href=file_href,
-                        media_type="image/tiff",
-                        roles=["data"]
-                    )
-                )
+                assets[identifier] = AssetRecord(identifier, file_href, "image/tiff", roles=DATA)
         
         # Add links from YAML - this is the key part!
-        for link_config in links:
+        links = []
+        for link_config in links_config:
             relation = link_config.get("Relation")
             url = link_config.get("URL")
             link_type = link_config.get("Type", "image/png")
@@ -75,32 +63,28 @@ def process(
             
             if relation == "xyz" and url:
                 # Create XYZ link for map tiles (like aircraft_detection)
-                item.add_link(
-                    Link(
-                        rel="xyz",
-                        target=url,
-                        media_type=link_type,
-                        title=title
-                    )
-                )
+                links.append(LinkRecord("xyz", url, link_type, title))
                 
                 # CRITICAL: Also add a "data" asset with the Titiler URL (like aircraft_detection)
-                item.add_asset(
-                    "data",
-                    Asset(
-                        href=url,
-                        media_type=link_type,
-                        roles=["data"],
-                        extra_fields={
-                            "proj:epsg": 3857  # Match aircraft_detection
-                        }
-                    )
+                assets["data"] = AssetRecord(
+                    "data", url, link_type, roles=DATA, extra_fields=WEB_MERCATOR
                 )
                 
                 logging.info(f"Added XYZ link and data asset for {time_str}: {url}")
         
+        # Create STAC item
+        item = ItemRecord(
+            id=time_str,  # Use the original time string as ID to match EODash expectations
+            datetime=dt,
+            footprint=shape,
+            assets=tuple(assets.values()),
+            links=tuple(links),
+        )
+        
         # Add item to collection
-        collection.add_item(item)
+        items.add(item)
         logging.info(f"Added time series item: {time_str}")
     
+    items.close()
+    
     return collection
@@ -1,10 +1,24 @@
 #!/bin/bash
 set -e
 
-rm -rf build
-eodash_catalog
+# only the entries whose configuration, handlers or referenced files changed
+# are regenerated, pass --force to rebuild everything
+python -m build_tools.build "$@"
 cp -r data build/template_catalog/
+# replace the pretty printed GeoJSON copies with minified ones, the aircraft
+# detections only keep the properties the map shows (the detector's pixel,
+# margin and UTM fields are dropped)
+AIRCRAFT_PROPERTIES="id,type,confidence,change,direction,footprint,velocity,tags,band"
+for geojson in data/*.geojson; do
+  case "$geojson" in
+    data/aircraft_detections_*) properties=(--properties "$AIRCRAFT_PROPERTIES") ;;
+    *) properties=() ;;
+  esac
+  python -m custom_handlers.geojson_minify "$geojson" "build/template_catalog/$geojson" "${properties[@]}"
+done
 cp -r styles build/template_catalog/
 cp -r processes build/template_catalog/
 cp -r charts build/template_catalog/
-npx http-server -p 8001 --cors="Authorization,Content-Type" build/template_catalog
\ No newline at end of file
+# precompressed .gz/.br sidecars of the final tree, including the copied data
+python -m build_tools.compress build
+npx http-server -p 8001 -g -b --cors="Authorization,Content-Type" build/template_catalog
\ No newline at end of file
@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.stand_ins import serve, titiler_stand_in
+from custom_handlers.http_cache import CACHE_DIR_ENV
+
+
+@pytest.fixture(autouse=True)
+def http_cache(tmp_path, monkeypatch):
+    """Persistent HTTP cache of the test"""
+    path = tmp_path / "http-cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    return path
+
+
+@pytest.fixture
+def titiler():
+    """Local TiTiler stand-in, ``titiler.url`` is its endpoint"""
+    server = serve(titiler_stand_in())
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,99 @@
+from pystac import Catalog, Collection, Extent, SpatialExtent, TemporalExtent
+
+from benchmarks.stand_ins import cog_bounds
+from custom_handlers import earthdaily_timeseries_handler, titiler_handler
+from custom_handlers.cog_info import RASTER_EXTENSION, CogInfoClient, iter_cog_info
+
+BANDS = [{"data_type": "uint16", "nodata": 0.0}] * 3
+
+
+def make_collection():
+    catalog = Catalog(id="test", description="test")
+    collection = Collection(
+        id="test", description="test",
+        extent=Extent(SpatialExtent([[-180, -90, 180, 90]]), TemporalExtent([[None, None]])),
+    )
+    catalog.add_child(collection)
+    return collection
+
+
+def run_timeseries(endpoint, count, **options):
+    collection = make_collection()
+    endpoint_config = {
+        "EndPoint": endpoint,
+        "S3Bucket": "bucket",
+        "PrefetchCogInfo": True,
+        "TimeEntries": [
+            {"Time": f"2020-01-{index + 1:02d}T00:00:00Z", "S3Key": f"scenes/{index}/RGB.tif"}
+            for index in range(count)
+        ],
+        **options,
+    }
+    earthdaily_timeseries_handler.process(
+        collection, {"id": "test"}, endpoint_config, {"Name": "test"}
+    )
+    return collection
+
+
+def test_prefetched_info_fills_the_items(titiler):
+    collection = run_timeseries(titiler.url, 5)
+    items = sorted(collection.get_items(), key=lambda item: item.datetime)
+    assert [item.bbox for item in items] == [
+        cog_bounds(f"s3://bucket/scenes/{index}/RGB.tif") for index in range(5)
+    ]
+    bands = items[0].assets["rgb_composite"].extra_fields["raster:bands"]
+    assert bands == BANDS
+    # every band and every item has dicts of its own
+    assert len({id(band) for item in items
+                for band in item.assets["rgb_composite"].extra_fields["raster:bands"]}) == 15
+    assert titiler.RequestHandlerClass.requests["info"] == 5
+
+
+def test_cached_info_is_not_requested_again(titiler):
+    run_timeseries(titiler.url, 5, MaxConcurrency=1)
+    collection = run_timeseries(titiler.url, 5)
+    assert titiler.RequestHandlerClass.requests["info"] == 5
+    assert next(collection.get_items()).assets["rgb_composite"].extra_fields["raster:bands"] == BANDS
+
+
+def test_info_without_prefetch_is_not_requested(titiler):
+    hrefs = ["s3://bucket/a.tif", "s3://bucket/b.tif"]
+    entries = list(iter_cog_info({"EndPoint": titiler.url}, hrefs))
+    assert entries == [(href, None) for href in hrefs]
+    assert not titiler.RequestHandlerClass.requests
+
+
+def test_iter_fetch_keeps_the_order_of_repeated_hrefs(titiler):
+    hrefs = [f"s3://bucket/{index % 3}.tif" for index in range(20)]
+    client = CogInfoClient(titiler.url, concurrency=2)
+    try:
+        entries = list(client.iter_fetch(hrefs))
+    finally:
+        client.close()
+    assert [href for href, _ in entries] == hrefs
+    assert [info.bbox for _, info in entries] == [cog_bounds(href) for href in hrefs]
+
+
+def test_unreadable_cog_gives_no_info(titiler):
+    client = CogInfoClient(f"{titiler.url}/missing")
+    try:
+        assert client.fetch("s3://bucket/a.tif") is None
+    finally:
+        client.close()
+
+
+def test_titiler_handler_describes_the_cog_asset(titiler):
+    collection = make_collection()
+    endpoint_config = {
+        "EndPoint": titiler.url,
+        "S3Bucket": "bucket",
+        "S3Key": "scene/RGB.tif",
+        "PrefetchCogInfo": True,
+    }
+    titiler_handler.process(collection, {"id": "test"}, endpoint_config, {"Name": "test"})
+    item = next(collection.get_items())
+    assert item.bbox == cog_bounds("s3://bucket/scene/RGB.tif")
+    assert item.assets["raw_cog"].href == "s3://bucket/scene/RGB.tif"
+    assert item.assets["raw_cog"].extra_fields["raster:bands"] == BANDS
+    assert "raster:bands" not in item.assets["info"].extra_fields
+    assert RASTER_EXTENSION in item.stac_extensions
@@ -0,0 +1,56 @@
+import json
+
+from benchmarks.prewarm_bench import write_items
+from build_tools.prewarm import plan_tiles, prewarm, tiles, xyz_templates, zoom_range
+
+
+def test_prewarm_renders_every_tile_once(titiler, tmp_path):
+    write_items(str(tmp_path / "items"), 3, titiler.url)
+    urls = plan_tiles(str(tmp_path), zoom_range("9-11"))
+    assert urls and len(set(urls)) == len(urls)
+    report = prewarm(urls, workers=8, rate=0)
+    assert report["ok"] == report["tiles"] == len(urls)
+    stand_in = titiler.RequestHandlerClass
+    assert stand_in.requests["tiles"] == len(urls)
+    assert stand_in.rendered == {url.removeprefix(titiler.url) for url in urls}
+
+
+def test_prewarm_keeps_to_the_rate(titiler, tmp_path):
+    write_items(str(tmp_path / "items"), 1, titiler.url)
+    urls = plan_tiles(str(tmp_path), zoom_range("9-12"), max_tiles=20)
+    assert len(urls) == 20
+    report = prewarm(urls, workers=8, rate=100)
+    assert report["ok"] == 20
+    assert report["duration"] >= 19 / 100
+
+
+def test_failed_tiles_are_reported(titiler):
+    report = prewarm([f"{titiler.url}/missing/1/0/0"], rate=0)
+    assert report["ok"] == 0
+    assert report["statuses"] == {"404": 1}
+    assert report["p50_ms"] is None
+
+
+def test_only_titiler_layers_are_planned(tmp_path):
+    collection = {
+        "type": "Collection",
+        "id": "layers",
+        "extent": {"spatial": {"bbox": [[10, 10, 11, 11]]}},
+        "links": [
+            {"rel": "xyz", "href": "https://titiler.example.com/cog/tiles/{z}/{x}/{y}"},
+            {"rel": "xyz", "href": "https://tiles.example.com/{z}/{y}/{x}.png",
+             "roles": ["baselayer"]},
+            {"rel": "xyz", "href": "//tiles.example.com/{z}/{x}/{y}.png"},
+            {"rel": "xyz", "href": "https://titiler.example.com/cog/preview.png"},
+        ],
+    }
+    (tmp_path / "collection.json").write_text(json.dumps(collection))
+    assert list(xyz_templates(str(tmp_path))) == [
+        ("layers", "https://titiler.example.com/cog/tiles/{z}/{x}/{y}", [10, 10, 11, 11])
+    ]
+
+
+def test_tiles_split_at_the_antimeridian():
+    assert sorted(tiles([170, -10, -170, 10], range(1, 2))) == [
+        (1, 0, 0), (1, 0, 1), (1, 1, 0), (1, 1, 1)
+    ]
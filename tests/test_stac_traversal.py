@@ -0,0 +1,55 @@
+import functools
+
+import pytest
+
+from benchmarks.stac_traversal_bench import sequential_items, write_fixture
+from benchmarks.stand_ins import SlowHandler, serve
+from custom_handlers.http_cache import HttpCache
+from custom_handlers.stac_traversal import StacReader, daily_catalog_items
+
+
+@pytest.fixture
+def daily_catalog(tmp_path):
+    """Dates and root href of a daily catalog of 40 days with 3 items per day"""
+    dates = write_fixture(str(tmp_path), 40, 3)
+    server = serve(functools.partial(SlowHandler, directory=str(tmp_path)))
+    yield dates, f"{server.url}/catalog.json"
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_traversal_matches_pystac(daily_catalog):
+    dates, root_href = daily_catalog
+    expected = sequential_items(root_href, dates)
+    items = daily_catalog_items(root_href, dates, concurrency=4)
+    assert [item.id for item in items] == [item.id for item in expected]
+    assert [item.datetime for item in items] == [item.datetime for item in expected]
+
+
+def test_missing_days_are_skipped(daily_catalog):
+    dates, root_href = daily_catalog
+    items = daily_catalog_items(root_href, [dates[0], "2030-01-01", dates[-1]])
+    assert [item.id for item in items] == [
+        f"{date}-{index}" for date in (dates[0], dates[-1]) for index in range(3)
+    ]
+
+
+def test_shared_catalogs_are_requested_once(daily_catalog):
+    dates, root_href = daily_catalog
+    with StacReader(4) as reader:
+        hrefs = [
+            reader.find(root_href, [date[:4], date[:7], date]) for date in dates[:31]
+        ]
+        assert None not in hrefs
+        # root, year, month and the 31 days of January
+        assert reader.requests == 34
+
+
+def test_cached_traversal_gives_the_same_items(daily_catalog):
+    dates, root_href = daily_catalog
+    cache = HttpCache()
+    first = daily_catalog_items(root_href, dates, cache=cache)
+    again = daily_catalog_items(root_href, dates, cache=cache)
+    assert [item.id for item in again] == [item.id for item in first]
+    # every document of the second traversal is revalidated, none downloaded again
+    assert cache.stats["hits"] == cache.stats["misses"] > len(first)
@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+
+from benchmarks.thumbnails_bench import write_catalog
+from build_tools.thumbnails import (
+    THUMBNAIL_DIR,
+    ThumbnailPlanner,
+    materialize_catalog,
+    remote_validator,
+)
+from custom_handlers.http_cache import cached_session
+
+
+def thumbnail_hrefs(items):
+    hrefs = {}
+    for name in sorted(os.listdir(items)):
+        with open(os.path.join(items, name)) as file:
+            hrefs[name] = json.load(file)["assets"]["thumbnail"]["href"]
+    return hrefs
+
+
+def regenerate(root, count, endpoint):
+    """Items of the entry generated again, with the TiTiler urls"""
+    shutil.rmtree(os.path.join(root, "bench"))
+    return write_catalog(root, count, endpoint)
+
+
+def test_thumbnails_are_rendered_once_and_reused(titiler, tmp_path):
+    items = write_catalog(str(tmp_path), 10, titiler.url)
+    report = materialize_catalog(str(tmp_path), workers=4)
+    assert report["rendered"] == report["items_rewritten"] == 10
+    for href in thumbnail_hrefs(items).values():
+        assert href.startswith(f"../../../../{THUMBNAIL_DIR}/")
+        assert os.path.isfile(os.path.normpath(os.path.join(items, href)))
+    again = materialize_catalog(str(tmp_path), workers=4)
+    assert again["reused"] == 10
+    assert again["rendered"] == again["removed"] == again["items_rewritten"] == 0
+    assert titiler.RequestHandlerClass.requests["preview"] == 10
+
+
+def test_rebuilt_items_reuse_the_thumbnails_of_unchanged_cogs(titiler, tmp_path):
+    items = write_catalog(str(tmp_path), 10, titiler.url)
+    materialize_catalog(str(tmp_path), workers=4)
+    expected = thumbnail_hrefs(items)
+    regenerate(str(tmp_path), 10, titiler.url)
+    report = materialize_catalog(str(tmp_path), workers=4)
+    assert report["rendered"] == 0 and report["reused"] == 10
+    assert thumbnail_hrefs(items) == expected
+    assert titiler.RequestHandlerClass.requests["preview"] == 10
+
+
+def test_replaced_cog_gets_a_new_thumbnail(titiler, tmp_path):
+    items = write_catalog(str(tmp_path), 3, titiler.url)
+    materialize_catalog(str(tmp_path), workers=4)
+    previous = thumbnail_hrefs(items)
+    titiler.RequestHandlerClass.etags["/cogs/bucket/scenes/1/RGB.tif"] = '"2"'
+    regenerate(str(tmp_path), 3, titiler.url)
+    report = materialize_catalog(str(tmp_path), workers=4)
+    assert report["rendered"] == 1 and report["reused"] == 2 and report["removed"] == 1
+    current = thumbnail_hrefs(items)
+    changed = [name for name in current if current[name] != previous[name]]
+    assert changed == ["item_1.json"]
+
+
+def test_validators_are_revalidated_through_the_http_cache(titiler):
+    session = cached_session()
+    cog_url = f"{titiler.url}/cogs/bucket/a.tif"
+    assert remote_validator(cog_url, session) == '"1"'
+    assert remote_validator(cog_url, session) == '"1"'
+    assert session.get_adapter(cog_url).cache.stats["hits"] == 1
+    assert remote_validator(f"{titiler.url}/missing.tif", session) is None
+    assert remote_validator("ftp://example.com/a.tif", session) is None
+    session.close()
+
+
+def test_remote_cogs_without_validator_are_keyed_on_the_preview(titiler):
+    planner = ThumbnailPlanner("png")
+    href = f"{titiler.url}/cog/preview.png?url=s3%3A%2F%2Fbucket%2Fa.tif&max_size=512"
+    thumbnail = planner.plan(href)
+    assert thumbnail.preview_url == href
+    assert planner.plan(href) is thumbnail
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from benchmarks.time_dimension_bench import run, time_entries
+from custom_handlers import (
+    timeseries_collection_handler,
+    timeseries_with_xyz_handler,
+    yaml_links_processor,
+)
+from custom_handlers.time_dimension import decode_dates, encode_dates, expand_time_dimension
+
+HANDLERS = [timeseries_collection_handler, timeseries_with_xyz_handler, yaml_links_processor]
+
+
+@pytest.mark.parametrize("handler", HANDLERS, ids=lambda handler: handler.__name__)
+@pytest.mark.parametrize("dated_paths", [True, False], ids=["dated paths", "scene ids"])
+def test_compact_collection_expands_to_the_full_one(handler, dated_paths):
+    entries = time_entries(300, dated_paths)
+    full, _ = run(handler, entries, False)
+    compact, _ = run(handler, entries, True)
+    assert "time_dimension" in compact
+    assert len(json.dumps(compact)) < len(json.dumps(full))
+    assert expand_time_dimension(compact) == full
+
+
+def test_regular_dates_are_written_as_runs():
+    dates = [f"2020-01-{day:02d}T00:00:00Z" for day in range(1, 11)] + [
+        "2020-01-15T00:00:00Z",
+        "2020-02-01T00:00:00Z", "2020-03-01T00:00:00Z", "2020-04-01T00:00:00Z",
+    ]
+    encoded = encode_dates(dates)
+    assert encoded == [
+        {"start": "2020-01-01T00:00:00Z", "step": "P1D", "count": 10},
+        "2020-01-15T00:00:00Z",
+        {"start": "2020-02-01T00:00:00Z", "step": "P1M", "count": 3},
+    ]
+    assert decode_dates(encoded) == dates
+
+
+def test_collection_without_time_dimension_is_unchanged():
+    collection = {"type": "Collection", "id": "plain", "links": []}
+    assert expand_time_dimension(collection) == collection